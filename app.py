@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 import os
 import aws_cdk as cdk
-from cdk.sanders_customer_platform_stack import SandersCustomerPlatformStack
+from cdk.sanders_customer_platform import SandersCustomerPlatform
 
 app = cdk.App()
 
@@ -20,16 +20,14 @@ env_config = {
     }
 }
 
-# Create the main stack
-SandersCustomerPlatformStack(
+# Create the network, data and compute stacks
+SandersCustomerPlatform(
     app,
-    f"SandersCustomerPlatformStack-{environment}",
     environment=environment,
     env=cdk.Environment(
         account=env_config[environment]['account'],
         region=env_config[environment]['region']
-    ),
-    description=f"Sanders Customer Platform Infrastructure - {environment}"
+    )
 )
 
 app.synth()
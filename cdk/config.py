@@ -0,0 +1,259 @@
+"""
+Environment configuration for Sanders Customer Platform
+Defaults live here; per-environment overrides come from the `sanders`
+key in cdk.json context (e.g. {"sanders": {"prod": {"batch": {...}}}})
+"""
+import copy
+
+from constructs import Construct
+from cdk.job_sizes import DEFAULT_JOB_SIZES, DEFAULT_STAGE_SIZES
+
+
+DEFAULT_CONFIG = {
+    "dev": {
+        "network": {
+            "gateway_endpoints": True,      # S3 and DynamoDB gateway endpoints
+            "interface_endpoints": [],      # Any of "ecr.api", "ecr.dkr", "logs", "sts", "batch"
+            "scratch_filesystem": False,    # Shared EFS scratch volume mounted into every job
+            "scratch_retention_days": 3     # Run directories idle this long are deleted nightly
+        },
+        "features_table": {
+            "global_secondary_indexes": [   # Whole-day reads: parallel Query per "<date>#<shard>" key
+                {
+                    "index_name": "date-shard-index",
+                    "partition_key": "date_shard",
+                    "sort_key": "customer_id",
+                    "projection": "ALL",    # "ALL", "KEYS_ONLY" or a list of attributes to include
+                    "shard_count": 16
+                }
+            ]
+        },
+        "dax": {
+            "enabled": False,               # DAX cluster in front of the features table
+            "node_type": "dax.t3.small",
+            "replication_factor": 1
+        },
+        "bulk_import": {
+            "enabled": False,               # Import-from-S3 of the daily snapshot into a dated table
+            "source_prefix": "feature-snapshots/",
+            "input_format": "DYNAMODB_JSON",
+            "input_compression_type": "GZIP",
+            "poll_interval_seconds": 60,
+            "retire_grace_minutes": 15      # The replaced table is deleted this long after the pointer swap
+        },
+        "batch": {
+            "max_vcpus": 16,                # On-demand Fargate cap
+            "fargate_spot_max_vcpus": 16,   # Fargate Spot overflow tier, 0 disables
+            "ec2_spot_max_vcpus": 0,        # EC2 Spot tier on its own queue, 0 disables
+            "ec2_spot_instance_types": ["m6i", "c6i", "r6i", "m5", "c5", "r5"],
+            "ec2_nvme_max_vcpus": 0,        # On-demand EC2 with NVMe instance store for training, 0 disables
+            "ec2_nvme_instance_types": ["r6id", "r5d", "x2iedn"]   # Memory-optimized families with local NVMe
+        },
+        "fair_share": {
+            "enabled": False,               # Fair-share scheduling policy plus a priority queue for the pipeline
+            "share_decay_seconds": 3600,    # Window over which past usage counts against a share
+            "compute_reservation": 25,      # % of max vCPUs held back for shares with no running jobs
+            "shares": {                     # Share identifier -> weight factor; lower weight = larger share
+                "daily": 0.5,
+                "backfill": 2.0,
+                "adhoc": 1.0
+            },
+            "pipeline_share": "daily",      # Share identifier of the orchestrator's jobs
+            "backfill_share": "backfill"    # Share identifier of the backfill state machine's jobs
+        },
+        "logging": {
+            "retention": "ONE_MONTH",       # RetentionDays name for the job log group
+            "mode": "non-blocking",         # awslogs mode; "blocking" stalls stdout on slow ingest
+            "max_buffer_size": "25m"        # In-memory buffer per container in non-blocking mode
+        },
+        "observability": {
+            "enabled": True,                # Dashboard, alarms and Batch job state metrics
+            "execution_sla_minutes": 240,   # Alarm while an orchestrator execution has run longer
+            "queue_wait_sla_minutes": 30,   # Alarm when p90 submit-to-start time exceeds this
+            "throttled_requests_threshold": 0,  # Features table throttle events per 5 minutes
+            "alarm_emails": []              # Email subscriptions on the alarm topic
+        },
+        "image": {
+            "tag": None,                    # Versioned tag (e.g. git SHA); -c image_tag=... at deploy
+            "digest": None,                 # sha256 digest, preferred over the tag; -c image_digest=...
+            "max_image_count": 10,          # Tagged images kept
+            "untagged_expiry_days": 3       # Untagged images (orphaned manifests, SOCI indexes) expire after
+        },
+        "job_sizes": DEFAULT_JOB_SIZES,
+        "stage_sizes": DEFAULT_STAGE_SIZES,
+        "sharding": {
+            "enabled": False,
+            "manifest": "input",            # "input" (array in execution input) or "s3" (prefix listing)
+            "items_path": "$.shards",
+            "manifest_prefix": "shards/",
+            "results_prefix": "shard-results/",
+            "max_concurrency": None         # None = derived from the compute environment's max vCPUs
+        },
+        "array_jobs": {
+            "enabled": False,               # Partitionable stages submit array jobs of size $.array_size
+            "shard_array_size": 10          # Children per shard that shard concurrency is planned for
+        },
+        "backfill": {
+            "enabled": False,               # Backfill state machine running the pipeline over a date range
+            "max_concurrency": None,        # None = dates whose jobs fit in the queue's vCPUs at once
+            "max_dates": 366,
+            "tolerated_failure_percentage": 0,
+            "results_prefix": "backfill-results/",
+            "timeout_hours": 168
+        },
+        "ledger": {
+            "enabled": False                # Run ledger table; completed stages are skipped on resume
+        },
+        "memoization": {
+            "enabled": False,               # Skip stages whose S3 input prefix is unchanged
+            "ttl_days": 7,                  # Fingerprints expire from the memo table after this
+            "partition_field": "partition", # Input/shard item field with a stable partition id for the memo key
+            "stages": {                     # Stage -> input field holding its S3 prefix (shard item when sharded)
+                "feature_extraction": "input_prefix"
+            }
+        },
+        "size_routing": {
+            "enabled": False,
+            "metric": "input_bytes",        # Execution input field compared against tier thresholds
+            "stages": {                     # Ascending tiers; larger inputs fall through to stage_sizes
+                "feature_extraction": [{"max": 1073741824, "size": "2g"}],
+                "model_training": [{"max": 1073741824, "size": "8g"}]
+            }
+        }
+    },
+    "prod": {
+        "network": {
+            "gateway_endpoints": True,
+            "interface_endpoints": ["ecr.api", "ecr.dkr", "logs", "sts", "batch"],
+            "scratch_filesystem": False,
+            "scratch_retention_days": 3
+        },
+        "features_table": {
+            "global_secondary_indexes": [
+                {
+                    "index_name": "date-shard-index",
+                    "partition_key": "date_shard",
+                    "sort_key": "customer_id",
+                    "projection": "ALL",
+                    "shard_count": 16
+                }
+            ]
+        },
+        "dax": {
+            "enabled": False,
+            "node_type": "dax.r5.large",
+            "replication_factor": 3
+        },
+        "bulk_import": {
+            "enabled": False,
+            "source_prefix": "feature-snapshots/",
+            "input_format": "DYNAMODB_JSON",
+            "input_compression_type": "GZIP",
+            "poll_interval_seconds": 60,
+            "retire_grace_minutes": 15
+        },
+        "batch": {
+            "max_vcpus": 16,
+            "fargate_spot_max_vcpus": 32,
+            "ec2_spot_max_vcpus": 0,
+            "ec2_spot_instance_types": ["m6i", "c6i", "r6i", "m5", "c5", "r5"],
+            "ec2_nvme_max_vcpus": 0,
+            "ec2_nvme_instance_types": ["r6id", "r5d", "x2iedn"]
+        },
+        "fair_share": {
+            "enabled": False,
+            "share_decay_seconds": 3600,
+            "compute_reservation": 25,
+            "shares": {
+                "daily": 0.5,
+                "backfill": 2.0,
+                "adhoc": 1.0
+            },
+            "pipeline_share": "daily",
+            "backfill_share": "backfill"
+        },
+        "logging": {
+            "retention": "THREE_MONTHS",
+            "mode": "non-blocking",
+            "max_buffer_size": "25m"
+        },
+        "observability": {
+            "enabled": True,
+            "execution_sla_minutes": 240,
+            "queue_wait_sla_minutes": 30,
+            "throttled_requests_threshold": 0,
+            "alarm_emails": []
+        },
+        "image": {
+            "tag": None,
+            "digest": None,
+            "max_image_count": 10,
+            "untagged_expiry_days": 3
+        },
+        "job_sizes": DEFAULT_JOB_SIZES,
+        "stage_sizes": DEFAULT_STAGE_SIZES,
+        "sharding": {
+            "enabled": False,
+            "manifest": "input",
+            "items_path": "$.shards",
+            "manifest_prefix": "shards/",
+            "results_prefix": "shard-results/",
+            "max_concurrency": None
+        },
+        "array_jobs": {
+            "enabled": False,
+            "shard_array_size": 10
+        },
+        "backfill": {
+            "enabled": False,
+            "max_concurrency": None,
+            "max_dates": 366,
+            "tolerated_failure_percentage": 0,
+            "results_prefix": "backfill-results/",
+            "timeout_hours": 168
+        },
+        "ledger": {
+            "enabled": False
+        },
+        "memoization": {
+            "enabled": False,
+            "ttl_days": 7,
+            "partition_field": "partition",
+            "stages": {
+                "feature_extraction": "input_prefix"
+            }
+        },
+        "size_routing": {
+            "enabled": False,
+            "metric": "input_bytes",
+            "stages": {
+                "feature_extraction": [{"max": 1073741824, "size": "2g"}],
+                "model_training": [{"max": 1073741824, "size": "8g"}]
+            }
+        }
+    }
+}
+
+
+def _deep_merge(base: dict, overrides: dict) -> dict:
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_environment_config(scope: Construct, environment: str) -> dict:
+    """
+    Return the configuration for an environment, with cdk.json context
+    overrides merged on top of the defaults
+    """
+    if environment not in DEFAULT_CONFIG:
+        raise ValueError(
+            f"Unknown environment '{environment}', expected one of {sorted(DEFAULT_CONFIG)}"
+        )
+
+    overrides = (scope.node.try_get_context("sanders") or {}).get(environment, {})
+    return _deep_merge(copy.deepcopy(DEFAULT_CONFIG[environment]), overrides)
@@ -0,0 +1,56 @@
+import os
+
+from aws_cdk import (
+    aws_lambda as lambda_,
+    aws_logs as logs,
+    Duration,
+    RemovalPolicy,
+    Tags
+)
+from constructs import Construct
+
+
+LAMBDA_CODE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "lambda", "backfill_dates")
+
+
+class BackfillDatesFunction(Construct):
+    """
+    Lambda that expands a backfill's start_date/end_date into one pipeline input per date
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        environment: str,
+        max_dates: int = 366,
+        **kwargs
+    ) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        self.log_group = logs.LogGroup(
+            self,
+            f"LogGroup",
+            log_group_name=f"/aws/lambda/sanders-backfill-dates-{environment}",
+            retention=logs.RetentionDays.ONE_MONTH,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
+        self.function = lambda_.Function(
+            self,
+            f"Function",
+            function_name=f"sanders-backfill-dates-{environment}",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            handler="index.handler",
+            code=lambda_.Code.from_asset(LAMBDA_CODE_DIR),
+            timeout=Duration.seconds(30),
+            memory_size=128,
+            log_group=self.log_group,
+            environment={
+                "MAX_DATES": str(max_dates)
+            }
+        )
+
+        # Add tags
+        Tags.of(self.function).add("Environment", environment)
+        Tags.of(self.function).add("Service", "sanders-customer-platform")
@@ -2,10 +2,102 @@ from aws_cdk import (
     aws_batch as batch,
     aws_ec2 as ec2,
     aws_ecs as ecs,
+    aws_logs as logs,
+    Fn,
+    RemovalPolicy,
+    Stack,
     Tags
 )
 from constructs import Construct
-from typing import List
+import re
+from typing import Dict, List, Optional
+from cdk.job_sizes import DEFAULT_JOB_SIZES, JobSize, parse_job_sizes
+
+
+IMAGE_DIGEST = re.compile(r"^sha256:[0-9a-f]{64}$")
+
+# Tags that name whatever was pushed last; the repository is immutable, so they never move
+FLOATING_IMAGE_TAGS = ("latest",)
+
+# Fair-share identifiers: letters, digits and underscores (Batch also allows a trailing *)
+SHARE_IDENTIFIER = re.compile(r"^[A-Za-z0-9_]{1,255}$")
+
+# awslogs delivery modes; non-blocking buffers stdout instead of stalling the job on slow ingest
+LOG_MODES = ("blocking", "non-blocking")
+LOG_BUFFER_SIZE = re.compile(r"^[1-9][0-9]*[kmg]?$")
+
+# Where jobs see the shared scratch file system
+SCRATCH_MOUNT_PATH = "/mnt/scratch"
+
+# Where the NVMe instance store is mounted on the host and in instance_storage jobs
+INSTANCE_STORE_MOUNT_PATH = "/mnt/instance-store"
+
+# Instance families with local NVMe disks: a "d" variant (r6id, r5d, x2iedn, m6id)
+# or a storage-optimized family (i4i, i3en), with or without a size suffix
+NVME_INSTANCE_TYPE = re.compile(r"^(?:[a-z][0-9][a-z]*d[a-z]*|i[0-9][a-z]*)(?:\.[0-9a-z]+)?$")
+
+# Launch template user data (Batch requires MIME multi-part): stripe the instance store
+# disks into one RAID 0 device, format it and mount it before jobs are placed
+INSTANCE_STORE_USER_DATA = f"""MIME-Version: 1.0
+Content-Type: multipart/mixed; boundary="==SANDERS=="
+
+--==SANDERS==
+Content-Type: text/x-shellscript; charset="us-ascii"
+
+#!/bin/bash
+set -euo pipefail
+mount_path={INSTANCE_STORE_MOUNT_PATH}
+devices=$(lsblk -dpno NAME,MODEL | grep 'Amazon EC2 NVMe Instance Storage' | cut -d' ' -f1 || true)
+count=$(echo -n "$devices" | grep -c nvme || true)
+if [ "$count" -eq 0 ]; then
+  echo "No NVMe instance store found" >&2
+  exit 1
+elif [ "$count" -eq 1 ]; then
+  device=$devices
+else
+  command -v mdadm >/dev/null || yum install -y mdadm
+  mdadm --create /dev/md0 --level=0 --raid-devices="$count" $devices --force --run
+  device=/dev/md0
+fi
+mkfs.xfs -f "$device"
+mkdir -p "$mount_path"
+mount -o defaults,noatime "$device" "$mount_path"
+chmod 1777 "$mount_path"
+
+--==SANDERS==--
+"""
+
+# Infrastructure failures are retried: Spot reclamation (EC2 host termination or
+# Fargate Spot interruption, reported in the job's status reason) and transient task
+# start errors (image pull, ENI or secrets setup, reported in the container's reason
+# under a "Task failed to start" status). Anything else, including application
+# errors and attempt timeouts (which have no container reason), is caught by the
+# status reason wildcard and fails the job straight away (Batch allows at most 5 rules)
+JOB_RETRY_STRATEGY = batch.CfnJobDefinition.RetryStrategyProperty(
+    attempts=3,
+    evaluate_on_exit=[
+        batch.CfnJobDefinition.EvaluateOnExitProperty(
+            on_status_reason="Host EC2*",
+            action="RETRY"
+        ),
+        batch.CfnJobDefinition.EvaluateOnExitProperty(
+            on_status_reason="Your Spot Task was interrupted*",
+            action="RETRY"
+        ),
+        batch.CfnJobDefinition.EvaluateOnExitProperty(
+            on_reason="CannotPullContainerError*",
+            action="RETRY"
+        ),
+        batch.CfnJobDefinition.EvaluateOnExitProperty(
+            on_reason="ResourceInitializationError*",
+            action="RETRY"
+        ),
+        batch.CfnJobDefinition.EvaluateOnExitProperty(
+            on_status_reason="*",
+            action="EXIT"
+        )
+    ]
+)
 
 
 class BatchEnvironment(Construct):
@@ -25,11 +117,32 @@ class BatchEnvironment(Construct):
         batch_job_role_arn: str,
         ecr_repository_uri: str,
         environment: str,
+        max_vcpus: int = 16,
+        fargate_spot_max_vcpus: int = 0,
+        ec2_spot_max_vcpus: int = 0,
+        ec2_spot_instance_types: Optional[List[str]] = None,
+        ec2_instance_profile_arn: Optional[str] = None,
+        ec2_nvme_max_vcpus: int = 0,
+        ec2_nvme_instance_types: Optional[List[str]] = None,
+        job_sizes: Optional[Dict[str, JobSize]] = None,
+        job_environment: Optional[Dict[str, str]] = None,
+        scratch_file_system_id: Optional[str] = None,
+        scratch_access_point_id: Optional[str] = None,
+        image_tag: Optional[str] = None,
+        image_digest: Optional[str] = None,
+        fair_share: Optional[dict] = None,
+        logging: Optional[dict] = None,
         **kwargs
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
-        # Create Batch Compute Environment
+        self.max_vcpus = max_vcpus
+        self.fargate_spot_max_vcpus = fargate_spot_max_vcpus
+        self.ec2_spot_max_vcpus = ec2_spot_max_vcpus
+        self.ec2_nvme_max_vcpus = ec2_nvme_max_vcpus
+
+        # Compute environments are attached to the queue in order: on-demand Fargate first,
+        # then Fargate Spot, so bursts beyond the on-demand cap spill onto Spot capacity
         self.compute_environment = batch.CfnComputeEnvironment(
             self,
             f"ComputeEnvironment",
@@ -39,11 +152,75 @@ class BatchEnvironment(Construct):
             service_role=batch_service_role_arn,
             compute_resources=batch.CfnComputeEnvironment.ComputeResourcesProperty(
                 type="FARGATE",
-                maxv_cpus=16,
+                maxv_cpus=max_vcpus,
                 subnets=[subnet.subnet_id for subnet in vpc.private_subnets],
                 security_group_ids=[security_group.security_group_id]
             )
         )
+        self.compute_environments = [self.compute_environment]
+
+        self.fargate_spot_compute_environment = None
+        if fargate_spot_max_vcpus > 0:
+            self.fargate_spot_compute_environment = batch.CfnComputeEnvironment(
+                self,
+                f"FargateSpotComputeEnvironment",
+                compute_environment_name=f"sanders-batch-compute-fargate-spot-{environment}",
+                type="MANAGED",
+                state="ENABLED",
+                service_role=batch_service_role_arn,
+                compute_resources=batch.CfnComputeEnvironment.ComputeResourcesProperty(
+                    type="FARGATE_SPOT",
+                    maxv_cpus=fargate_spot_max_vcpus,
+                    subnets=[subnet.subnet_id for subnet in vpc.private_subnets],
+                    security_group_ids=[security_group.security_group_id]
+                )
+            )
+            self.compute_environments.append(self.fargate_spot_compute_environment)
+
+        # Fair-share scheduling splits queue capacity between workloads by share
+        # identifier (e.g. daily, backfill, adhoc) instead of first-in first-out;
+        # a lower weight factor gets a larger share
+        self.scheduling_policy = None
+        scheduling_policy_arn = None
+        if fair_share and fair_share.get("enabled"):
+            shares = fair_share.get("shares") or {}
+            if not shares:
+                raise ValueError("Fair-share scheduling requires at least one share identifier")
+            for share_identifier, weight_factor in shares.items():
+                if not SHARE_IDENTIFIER.match(share_identifier):
+                    raise ValueError(
+                        f"Share identifier '{share_identifier}' must be letters, digits and underscores"
+                    )
+                if not 0.0001 <= weight_factor <= 999.9999:
+                    raise ValueError(
+                        f"Share '{share_identifier}' has weight factor {weight_factor}, expected 0.0001-999.9999"
+                    )
+
+            self.scheduling_policy = batch.CfnSchedulingPolicy(
+                self,
+                f"SchedulingPolicy",
+                name=f"sanders-fair-share-{environment}",
+                fairshare_policy=batch.CfnSchedulingPolicy.FairsharePolicyProperty(
+                    share_decay_seconds=fair_share.get("share_decay_seconds", 3600),
+                    compute_reservation=fair_share.get("compute_reservation", 0),
+                    share_distribution=[
+                        batch.CfnSchedulingPolicy.ShareAttributesProperty(
+                            share_identifier=share_identifier,
+                            weight_factor=weight_factor
+                        )
+                        for share_identifier, weight_factor in shares.items()
+                    ]
+                )
+            )
+            scheduling_policy_arn = self.scheduling_policy.attr_arn
+
+        compute_environment_order = [
+            batch.CfnJobQueue.ComputeEnvironmentOrderProperty(
+                compute_environment=compute_environment.attr_compute_environment_arn,
+                order=order
+            )
+            for order, compute_environment in enumerate(self.compute_environments, start=1)
+        ]
 
         # Create Job Queue
         self.job_queue = batch.CfnJobQueue(
@@ -52,59 +229,351 @@ class BatchEnvironment(Construct):
             job_queue_name=f"sanders-batch-queue-{environment}",
             priority=1,
             state="ENABLED",
-            compute_environment_order=[
-                batch.CfnJobQueue.ComputeEnvironmentOrderProperty(
-                    compute_environment=self.compute_environment.attr_compute_environment_arn,
-                    order=1
+            scheduling_policy_arn=scheduling_policy_arn,
+            compute_environment_order=compute_environment_order
+        )
+
+        # With fair share, the pipeline gets a higher-priority queue on the same compute
+        # environments; Batch places its jobs before any job waiting in the shared queue
+        self.priority_job_queue = None
+        if self.scheduling_policy is not None:
+            self.priority_job_queue = batch.CfnJobQueue(
+                self,
+                f"PriorityJobQueue",
+                job_queue_name=f"sanders-batch-priority-queue-{environment}",
+                priority=10,
+                state="ENABLED",
+                scheduling_policy_arn=scheduling_policy_arn,
+                compute_environment_order=compute_environment_order
+            )
+
+        # EC2 Spot capacity needs its own queue: Batch does not mix Fargate and EC2
+        # compute environments in one queue, and only EC2 job definitions run on it
+        self.ec2_spot_compute_environment = None
+        self.ec2_job_queue = None
+        if ec2_spot_max_vcpus > 0:
+            if not ec2_instance_profile_arn:
+                raise ValueError("An EC2 Spot compute environment requires ec2_instance_profile_arn")
+
+            self.ec2_spot_compute_environment = batch.CfnComputeEnvironment(
+                self,
+                f"Ec2SpotComputeEnvironment",
+                compute_environment_name=f"sanders-batch-compute-ec2-spot-{environment}",
+                type="MANAGED",
+                state="ENABLED",
+                service_role=batch_service_role_arn,
+                compute_resources=batch.CfnComputeEnvironment.ComputeResourcesProperty(
+                    type="SPOT",
+                    allocation_strategy="SPOT_CAPACITY_OPTIMIZED",
+                    minv_cpus=0,
+                    maxv_cpus=ec2_spot_max_vcpus,
+                    instance_types=ec2_spot_instance_types or ["m6i", "c6i", "r6i", "m5", "c5", "r5"],
+                    instance_role=ec2_instance_profile_arn,
+                    subnets=[subnet.subnet_id for subnet in vpc.private_subnets],
+                    security_group_ids=[security_group.security_group_id]
+                )
+            )
+
+            self.ec2_job_queue = batch.CfnJobQueue(
+                self,
+                f"Ec2JobQueue",
+                job_queue_name=f"sanders-batch-ec2-queue-{environment}",
+                priority=1,
+                state="ENABLED",
+                scheduling_policy_arn=scheduling_policy_arn,
+                compute_environment_order=[
+                    batch.CfnJobQueue.ComputeEnvironmentOrderProperty(
+                        compute_environment=self.ec2_spot_compute_environment.attr_compute_environment_arn,
+                        order=1
+                    )
+                ]
+            )
+
+        # On-demand EC2 with local NVMe disks for heavy training, on a queue of its own so
+        # instance_storage jobs only land on hosts whose launch template mounted the disks
+        self.ec2_nvme_compute_environment = None
+        self.ec2_nvme_launch_template = None
+        self.ec2_nvme_job_queue = None
+        if ec2_nvme_max_vcpus > 0:
+            if not ec2_instance_profile_arn:
+                raise ValueError("An EC2 NVMe compute environment requires ec2_instance_profile_arn")
+            nvme_instance_types = ec2_nvme_instance_types or ["r6id", "r5d", "x2iedn"]
+            for instance_type in nvme_instance_types:
+                if not NVME_INSTANCE_TYPE.match(instance_type):
+                    raise ValueError(
+                        f"Instance type '{instance_type}' has no NVMe instance store; use a 'd' family "
+                        f"such as r6id or a storage-optimized family such as i4i"
+                    )
+
+            self.ec2_nvme_launch_template = ec2.CfnLaunchTemplate(
+                self,
+                f"Ec2NvmeLaunchTemplate",
+                launch_template_name=f"sanders-batch-nvme-{environment}",
+                launch_template_data=ec2.CfnLaunchTemplate.LaunchTemplateDataProperty(
+                    user_data=Fn.base64(INSTANCE_STORE_USER_DATA)
+                )
+            )
+
+            self.ec2_nvme_compute_environment = batch.CfnComputeEnvironment(
+                self,
+                f"Ec2NvmeComputeEnvironment",
+                compute_environment_name=f"sanders-batch-compute-ec2-nvme-{environment}",
+                type="MANAGED",
+                state="ENABLED",
+                service_role=batch_service_role_arn,
+                compute_resources=batch.CfnComputeEnvironment.ComputeResourcesProperty(
+                    type="EC2",
+                    allocation_strategy="BEST_FIT_PROGRESSIVE",
+                    minv_cpus=0,
+                    maxv_cpus=ec2_nvme_max_vcpus,
+                    instance_types=nvme_instance_types,
+                    instance_role=ec2_instance_profile_arn,
+                    launch_template=batch.CfnComputeEnvironment.LaunchTemplateSpecificationProperty(
+                        launch_template_id=self.ec2_nvme_launch_template.ref,
+                        version=self.ec2_nvme_launch_template.attr_latest_version_number
+                    ),
+                    subnets=[subnet.subnet_id for subnet in vpc.private_subnets],
+                    security_group_ids=[security_group.security_group_id]
+                )
+            )
+
+            self.ec2_nvme_job_queue = batch.CfnJobQueue(
+                self,
+                f"Ec2NvmeJobQueue",
+                job_queue_name=f"sanders-batch-nvme-queue-{environment}",
+                priority=1,
+                state="ENABLED",
+                scheduling_policy_arn=scheduling_policy_arn,
+                compute_environment_order=[
+                    batch.CfnJobQueue.ComputeEnvironmentOrderProperty(
+                        compute_environment=self.ec2_nvme_compute_environment.attr_compute_environment_arn,
+                        order=1
+                    )
+                ]
+            )
+
+        # Pin jobs to an image digest when given, so tasks skip tag resolution
+        # and every attempt runs exactly the same image; otherwise to a versioned tag.
+        # Tags are immutable, so a floating tag such as latest is frozen at its first push
+        if image_digest:
+            if not IMAGE_DIGEST.match(image_digest):
+                raise ValueError(f"Image digest '{image_digest}' must look like sha256:<64 hex digits>")
+            self.image = f"{ecr_repository_uri}@{image_digest}"
+        elif image_tag and image_tag not in FLOATING_IMAGE_TAGS:
+            self.image = f"{ecr_repository_uri}:{image_tag}"
+        else:
+            raise ValueError(
+                f"Job definitions need image.digest or a versioned image.tag, got tag {image_tag!r}; "
+                f"deploy with -c image_digest=sha256:... or -c image_tag=<git sha>"
+            )
+
+        # Create one Job Definition per entry in the job size catalog
+        self.job_sizes: Dict[str, JobSize] = job_sizes or parse_job_sizes(DEFAULT_JOB_SIZES)
+        self.job_definitions: Dict[str, batch.CfnJobDefinition] = {}
+
+        if self.ec2_job_queue is None and any(
+            size.platform == "EC2" and not size.instance_storage for size in self.job_sizes.values()
+        ):
+            raise ValueError("EC2 job sizes require an EC2 compute environment (batch.ec2_spot_max_vcpus > 0)")
+        if self.ec2_nvme_job_queue is None and any(size.instance_storage for size in self.job_sizes.values()):
+            raise ValueError(
+                "instance_storage job sizes require the EC2 NVMe compute environment (batch.ec2_nvme_max_vcpus > 0)"
+            )
+
+        # Single jobs see one partition; array jobs override the count
+        # and select theirs with AWS_BATCH_JOB_ARRAY_INDEX
+        container_environment = {"SANDERS_PARTITION_COUNT": "1", **(job_environment or {})}
+
+        # Mount the shared scratch file system through its access point (IAM + TLS)
+        volumes = None
+        mount_points = None
+        if scratch_file_system_id:
+            volumes = [
+                batch.CfnJobDefinition.VolumesProperty(
+                    name="scratch",
+                    efs_volume_configuration=batch.CfnJobDefinition.EfsVolumeConfigurationProperty(
+                        file_system_id=scratch_file_system_id,
+                        transit_encryption="ENABLED",
+                        authorization_config=batch.CfnJobDefinition.AuthorizationConfigProperty(
+                            access_point_id=scratch_access_point_id,
+                            iam="ENABLED"
+                        )
+                    )
+                )
+            ]
+            mount_points = [
+                batch.CfnJobDefinition.MountPointsProperty(
+                    container_path=SCRATCH_MOUNT_PATH,
+                    source_volume="scratch",
+                    read_only=False
                 )
             ]
+            container_environment["SANDERS_SCRATCH_DIR"] = SCRATCH_MOUNT_PATH
+
+        # Job logs go to one retention-managed group instead of the shared /aws/batch/job default;
+        # each size writes under its own stream prefix (<size>/default/<task id>)
+        logging = logging or {}
+        log_mode = logging.get("mode", "non-blocking")
+        if log_mode not in LOG_MODES:
+            raise ValueError(f"Unknown awslogs mode '{log_mode}', expected one of {LOG_MODES}")
+        log_buffer_size = str(logging.get("max_buffer_size", "25m"))
+        if log_mode == "non-blocking" and not LOG_BUFFER_SIZE.match(log_buffer_size):
+            raise ValueError(
+                f"awslogs max_buffer_size '{log_buffer_size}' must be a size such as 512k or 25m"
+            )
+        retention_name = logging.get("retention", "ONE_MONTH")
+        if retention_name not in logs.RetentionDays.__members__:
+            raise ValueError(
+                f"Unknown log retention '{retention_name}', expected a RetentionDays name such as ONE_MONTH"
+            )
+
+        self.log_group = logs.LogGroup(
+            self,
+            f"JobLogGroup",
+            log_group_name=f"/aws/batch/sanders-{environment}",
+            retention=logs.RetentionDays[retention_name],
+            removal_policy=RemovalPolicy.RETAIN if environment == 'prod' else RemovalPolicy.DESTROY
         )
 
-        # Create Job Definitions for different memory sizes
-        self.job_definitions = {}
-        
-        memory_configs = [
-            {"name": "2g", "memory": "2048", "cpu": "0.5"},    # 2GB, 0.5 vCPU (valid Fargate combo)
-            {"name": "8g", "memory": "8192", "cpu": "2"},      # 8GB, 2 vCPU (valid Fargate combo)
-            {"name": "16g", "memory": "16384", "cpu": "4"}     # 16GB, 4 vCPU (valid Fargate combo)
-        ]
+        for size in self.job_sizes.values():
+            is_fargate = size.platform == "FARGATE"
+            log_options = {
+                "awslogs-group": self.log_group.log_group_name,
+                "awslogs-region": Stack.of(self).region,
+                "awslogs-stream-prefix": size.name,
+                "mode": log_mode
+            }
+            if log_mode == "non-blocking":
+                log_options["max-buffer-size"] = log_buffer_size
 
-        for config in memory_configs:
+            # instance_storage sizes bind-mount the host's NVMe RAID at the same path
+            size_environment = container_environment
+            size_volumes = volumes
+            size_mount_points = mount_points
+            if size.instance_storage:
+                size_environment = {**container_environment, "SANDERS_INSTANCE_STORE_DIR": INSTANCE_STORE_MOUNT_PATH}
+                size_volumes = (volumes or []) + [
+                    batch.CfnJobDefinition.VolumesProperty(
+                        name="instance-store",
+                        host=batch.CfnJobDefinition.VolumesHostProperty(source_path=INSTANCE_STORE_MOUNT_PATH)
+                    )
+                ]
+                size_mount_points = (mount_points or []) + [
+                    batch.CfnJobDefinition.MountPointsProperty(
+                        container_path=INSTANCE_STORE_MOUNT_PATH,
+                        source_volume="instance-store",
+                        read_only=False
+                    )
+                ]
             job_def = batch.CfnJobDefinition(
                 self,
-                f"JobDef{config['name'].upper()}",
-                job_definition_name=f"sanders-job-{config['name']}-{environment}",
+                f"JobDef{size.name.upper()}",
+                job_definition_name=f"sanders-job-{size.name}-{environment}",
                 type="container",
-                platform_capabilities=["FARGATE"],
+                platform_capabilities=[size.platform],
                 container_properties=batch.CfnJobDefinition.ContainerPropertiesProperty(
-                    image=f"{ecr_repository_uri}:latest",
+                    image=self.image,
                     execution_role_arn=ecs_task_execution_role_arn,
                     job_role_arn=batch_job_role_arn,
+                    environment=[
+                        batch.CfnJobDefinition.EnvironmentProperty(name=name, value=value)
+                        for name, value in size_environment.items()
+                    ],
                     fargate_platform_configuration=batch.CfnJobDefinition.FargatePlatformConfigurationProperty(
                         platform_version="LATEST"
-                    ),
+                    ) if is_fargate else None,
+                    runtime_platform=batch.CfnJobDefinition.RuntimePlatformProperty(
+                        cpu_architecture=size.cpu_architecture,
+                        operating_system_family="LINUX"
+                    ) if is_fargate else None,
                     resource_requirements=[
                         batch.CfnJobDefinition.ResourceRequirementProperty(
                             type="VCPU",
-                            value=config["cpu"]
+                            value=size.cpu
                         ),
                         batch.CfnJobDefinition.ResourceRequirementProperty(
                             type="MEMORY",
-                            value=config["memory"]
+                            value=size.memory
                         )
                     ],
                     log_configuration=batch.CfnJobDefinition.LogConfigurationProperty(
-                        log_driver="awslogs"
-                    )
+                        log_driver="awslogs",
+                        options=log_options
+                    ),
+                    volumes=size_volumes,
+                    mount_points=size_mount_points,
+                    ephemeral_storage=batch.CfnJobDefinition.EphemeralStorageProperty(
+                        size_in_gib=size.ephemeral_storage
+                    ) if size.ephemeral_storage else None,
+                    linux_parameters=batch.CfnJobDefinition.LinuxParametersProperty(
+                        shared_memory_size=size.shared_memory_size,
+                        tmpfs=[
+                            batch.CfnJobDefinition.TmpfsProperty(
+                                container_path=mount.container_path,
+                                size=mount.size,
+                                mount_options=list(mount.mount_options) or None
+                            )
+                            for mount in size.tmpfs
+                        ] or None
+                    ) if size.shared_memory_size or size.tmpfs else None
+                ),
+                retry_strategy=JOB_RETRY_STRATEGY,
+                timeout=batch.CfnJobDefinition.TimeoutProperty(
+                    attempt_duration_seconds=size.timeout_minutes * 60
                 )
             )
-            self.job_definitions[config['name']] = job_def
+            self.job_definitions[size.name] = job_def
 
         # Add tags
-        Tags.of(self.compute_environment).add("Environment", environment)
+        for compute_environment in self.compute_environments:
+            Tags.of(compute_environment).add("Environment", environment)
         Tags.of(self.job_queue).add("Environment", environment)
+        if self.priority_job_queue is not None:
+            Tags.of(self.priority_job_queue).add("Environment", environment)
+        if self.ec2_job_queue is not None:
+            Tags.of(self.ec2_spot_compute_environment).add("Environment", environment)
+            Tags.of(self.ec2_job_queue).add("Environment", environment)
+        if self.ec2_nvme_job_queue is not None:
+            Tags.of(self.ec2_nvme_launch_template).add("Environment", environment)
+            Tags.of(self.ec2_nvme_compute_environment).add("Environment", environment)
+            Tags.of(self.ec2_nvme_job_queue).add("Environment", environment)
         for job_def in self.job_definitions.values():
             Tags.of(job_def).add("Environment", environment)
+        Tags.of(self.log_group).add("Environment", environment)
+
+    def max_concurrent_jobs(self, size: str) -> int:
+        """Number of jobs of the given size that fit in its queue's capacity at once"""
+        job_size = self.job_sizes[size]
+        if job_size.instance_storage:
+            total_vcpus = self.ec2_nvme_max_vcpus
+        elif job_size.platform == "EC2":
+            total_vcpus = self.ec2_spot_max_vcpus
+        else:
+            total_vcpus = self.fargate_vcpus
+        return max(1, int(total_vcpus // job_size.vcpus))
+
+    @property
+    def fargate_vcpus(self) -> int:
+        """vCPUs across the on-demand and Spot Fargate compute environments"""
+        return self.max_vcpus + self.fargate_spot_max_vcpus
+
+    def queue_arn_for(self, size: str, priority: bool = False) -> str:
+        """Queue that can run jobs of the given size, the priority queue if asked and present"""
+        if self.job_sizes[size].instance_storage:
+            return self.ec2_nvme_queue_arn
+        if self.job_sizes[size].platform == "EC2":
+            return self.ec2_queue_arn
+        if priority and self.priority_job_queue is not None:
+            return self.priority_queue_arn
+        return self.queue_arn
+
+    @property
+    def job_queues(self) -> List[batch.CfnJobQueue]:
+        """Every queue this environment created: the default, priority, EC2 and NVMe queues"""
+        return [
+            queue for queue in (self.job_queue, self.priority_job_queue, self.ec2_job_queue, self.ec2_nvme_job_queue)
+            if queue is not None
+        ]
 
     @property
     def queue_arn(self) -> str:
@@ -113,3 +582,19 @@ class BatchEnvironment(Construct):
     @property
     def queue_name(self) -> str:
         return self.job_queue.job_queue_name
+
+    @property
+    def priority_queue_arn(self) -> Optional[str]:
+        return self.priority_job_queue.attr_job_queue_arn if self.priority_job_queue is not None else None
+
+    @property
+    def priority_queue_name(self) -> Optional[str]:
+        return self.priority_job_queue.job_queue_name if self.priority_job_queue is not None else None
+
+    @property
+    def ec2_queue_arn(self) -> Optional[str]:
+        return self.ec2_job_queue.attr_job_queue_arn if self.ec2_job_queue is not None else None
+
+    @property
+    def ec2_nvme_queue_arn(self) -> Optional[str]:
+        return self.ec2_nvme_job_queue.attr_job_queue_arn if self.ec2_nvme_job_queue is not None else None
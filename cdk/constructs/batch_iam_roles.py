@@ -3,6 +3,7 @@ from aws_cdk import (
     Tags
 )
 from constructs import Construct
+from typing import Optional
 
 
 class BatchIAMRoles(Construct):
@@ -18,6 +19,12 @@ class BatchIAMRoles(Construct):
         s3_bucket_arn: str,
         dynamodb_table_arn: str,
         environment: str,
+        enable_ec2_instance_role: bool = False,
+        dax_cluster_arn: Optional[str] = None,
+        imported_tables_arn: Optional[str] = None,
+        features_table_pointer_arn: Optional[str] = None,
+        scratch_file_system_arn: Optional[str] = None,
+        scratch_access_point_arn: Optional[str] = None,
         **kwargs
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
@@ -87,10 +94,60 @@ class BatchIAMRoles(Construct):
                     "dynamodb:BatchWriteItem",
                     "dynamodb:BatchGetItem"
                 ],
-                resources=[dynamodb_table_arn]
+                resources=[dynamodb_table_arn, f"{dynamodb_table_arn}/index/*"] + (
+                    [imported_tables_arn, f"{imported_tables_arn}/index/*"] if imported_tables_arn else []
+                )
             )
         )
 
+        # Add SSM permissions to resolve the active (bulk imported) features table
+        if features_table_pointer_arn:
+            self.batch_job_role.add_to_policy(
+                iam.PolicyStatement(
+                    effect=iam.Effect.ALLOW,
+                    actions=["ssm:GetParameter"],
+                    resources=[features_table_pointer_arn]
+                )
+            )
+
+        # Add DAX permissions (cached reads and write-through for the features table)
+        if dax_cluster_arn:
+            self.batch_job_role.add_to_policy(
+                iam.PolicyStatement(
+                    effect=iam.Effect.ALLOW,
+                    actions=[
+                        "dax:GetItem",
+                        "dax:BatchGetItem",
+                        "dax:Query",
+                        "dax:Scan",
+                        "dax:PutItem",
+                        "dax:UpdateItem",
+                        "dax:DeleteItem",
+                        "dax:BatchWriteItem",
+                        "dax:ConditionCheckItem"
+                    ],
+                    resources=[dax_cluster_arn]
+                )
+            )
+
+        # Add EFS permissions (scratch file system, only through its access point)
+        if scratch_file_system_arn:
+            self.batch_job_role.add_to_policy(
+                iam.PolicyStatement(
+                    effect=iam.Effect.ALLOW,
+                    actions=[
+                        "elasticfilesystem:ClientMount",
+                        "elasticfilesystem:ClientWrite"
+                    ],
+                    resources=[scratch_file_system_arn],
+                    conditions={
+                        "StringEquals": {
+                            "elasticfilesystem:AccessPointArn": scratch_access_point_arn
+                        }
+                    }
+                )
+            )
+
         # Add CloudWatch Logs permissions
         self.batch_job_role.add_to_policy(
             iam.PolicyStatement(
@@ -104,6 +161,29 @@ class BatchIAMRoles(Construct):
             )
         )
 
+        # EC2 Instance Role (for container instances in EC2 compute environments)
+        self.ec2_instance_role = None
+        self.ec2_instance_profile = None
+        if enable_ec2_instance_role:
+            self.ec2_instance_role = iam.Role(
+                self,
+                f"Ec2InstanceRole",
+                role_name=f"sanders-batch-instance-role-{environment}",
+                assumed_by=iam.ServicePrincipal("ec2.amazonaws.com"),
+                managed_policies=[
+                    iam.ManagedPolicy.from_aws_managed_policy_name(
+                        "service-role/AmazonEC2ContainerServiceforEC2Role"
+                    )
+                ]
+            )
+            self.ec2_instance_profile = iam.CfnInstanceProfile(
+                self,
+                f"Ec2InstanceProfile",
+                instance_profile_name=f"sanders-batch-instance-profile-{environment}",
+                roles=[self.ec2_instance_role.role_name]
+            )
+            Tags.of(self.ec2_instance_role).add("Environment", environment)
+
         # Add tags
         Tags.of(self.batch_service_role).add("Environment", environment)
         Tags.of(self.ecs_task_execution_role).add("Environment", environment)
@@ -120,3 +200,7 @@ class BatchIAMRoles(Construct):
     @property
     def job_role_arn(self) -> str:
         return self.batch_job_role.role_arn
+
+    @property
+    def instance_profile_arn(self) -> Optional[str]:
+        return self.ec2_instance_profile.attr_arn if self.ec2_instance_profile is not None else None
@@ -0,0 +1,111 @@
+from aws_cdk import (
+    aws_dax as dax,
+    aws_ec2 as ec2,
+    aws_iam as iam,
+    Tags
+)
+from constructs import Construct
+
+
+# DAX listens on 9111 when cluster endpoint encryption (TLS) is enabled
+DAX_TLS_PORT = 9111
+
+
+class DAXCluster(Construct):
+    """
+    DynamoDB Accelerator (DAX) cluster construct
+    Caches hot feature reads in front of the DynamoDB table, inside the private subnets
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        vpc: ec2.IVpc,
+        client_security_group: ec2.ISecurityGroup,
+        table_arn: str,
+        environment: str,
+        node_type: str = "dax.t3.small",
+        replication_factor: int = 1,
+        **kwargs
+    ) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        # Service role DAX uses to read and write through to the table
+        self.dax_role = iam.Role(
+            self,
+            f"DAXServiceRole",
+            role_name=f"sanders-dax-service-role-{environment}",
+            assumed_by=iam.ServicePrincipal("dax.amazonaws.com"),
+        )
+        self.dax_role.add_to_policy(
+            iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=[
+                    "dynamodb:GetItem",
+                    "dynamodb:BatchGetItem",
+                    "dynamodb:Query",
+                    "dynamodb:Scan",
+                    "dynamodb:PutItem",
+                    "dynamodb:UpdateItem",
+                    "dynamodb:DeleteItem",
+                    "dynamodb:BatchWriteItem",
+                    "dynamodb:ConditionCheckItem",
+                    "dynamodb:DescribeTable"
+                ],
+                resources=[table_arn, f"{table_arn}/index/*"]
+            )
+        )
+
+        # Only Batch jobs (and anything else in the client security group) may reach the cluster
+        self.security_group = ec2.SecurityGroup(
+            self,
+            f"DAXSecurityGroup",
+            vpc=vpc,
+            description="Security group for the DAX cluster",
+            security_group_name=f"sanders-dax-sg-{environment}",
+            allow_all_outbound=False
+        )
+        self.security_group.add_ingress_rule(
+            client_security_group,
+            ec2.Port.tcp(DAX_TLS_PORT),
+            "DAX TLS from Batch jobs"
+        )
+
+        self.subnet_group = dax.CfnSubnetGroup(
+            self,
+            f"DAXSubnetGroup",
+            subnet_group_name=f"sanders-dax-subnets-{environment}",
+            description="Private subnets for the DAX cluster",
+            subnet_ids=[subnet.subnet_id for subnet in vpc.private_subnets]
+        )
+
+        self.cluster = dax.CfnCluster(
+            self,
+            f"Cluster",
+            cluster_name=f"sanders-dax-{environment}",
+            iam_role_arn=self.dax_role.role_arn,
+            node_type=node_type,
+            replication_factor=replication_factor,
+            subnet_group_name=self.subnet_group.ref,
+            security_group_ids=[self.security_group.security_group_id],
+            cluster_endpoint_encryption_type="TLS",
+            sse_specification=dax.CfnCluster.SSESpecificationProperty(
+                sse_enabled=True
+            )
+        )
+        self.cluster.add_dependency(self.subnet_group)
+
+        # Add tags
+        Tags.of(self.cluster).add("Environment", environment)
+        Tags.of(self.cluster).add("Service", "sanders-customer-platform")
+        Tags.of(self.security_group).add("Environment", environment)
+        Tags.of(self.security_group).add("Service", "sanders-customer-platform")
+
+    @property
+    def cluster_arn(self) -> str:
+        return self.cluster.attr_arn
+
+    @property
+    def cluster_endpoint(self) -> str:
+        return self.cluster.attr_cluster_discovery_endpoint_url
@@ -0,0 +1,294 @@
+from aws_cdk import (
+    aws_iam as iam,
+    aws_s3 as s3,
+    aws_ssm as ssm,
+    aws_stepfunctions as sfn,
+    aws_stepfunctions_tasks as tasks,
+    ArnFormat,
+    Duration,
+    Stack
+)
+from constructs import Construct
+from typing import List, Optional
+
+
+class DynamoDBBulkImport(sfn.StateMachineFragment):
+    """
+    Step Functions fragment that bulk loads a daily feature snapshot
+    Imports s3://<bucket>/<source_prefix><run_date>/ into a new dated table
+    ({table_name}_{run_date}) with DynamoDB import-from-S3, waits for the
+    import to finish, then points the SSM parameter at the new table and,
+    after a grace period for readers that resolved the old pointer, deletes
+    the dated table it pointed at before
+    A re-run for a date whose table already exists skips the import (waiting
+    while an earlier import is still creating it) and goes to the swap; the
+    pointer only moves forward, so a run for a date older than the table it
+    points at leaves the pointer and the newer table alone
+    Requires $.run_date in the state input
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        bucket: s3.IBucket,
+        source_prefix: str,
+        table_name: str,
+        partition_key: str,
+        sort_key: str,
+        table_pointer: ssm.IStringParameter,
+        fail_state: sfn.IChainable,
+        input_format: str = "DYNAMODB_JSON",
+        input_compression_type: str = "GZIP",
+        poll_interval: Duration = Duration.minutes(1),
+        retire_grace_period: Duration = Duration.minutes(15),
+        global_secondary_indexes: Optional[List[dict]] = None
+    ) -> None:
+        super().__init__(scope, construct_id)
+
+        dated_table_name = sfn.JsonPath.format(
+            f"{table_name}_{{}}", sfn.JsonPath.string_at("$.run_date")
+        )
+        dated_table_name_path = "$.featuresTable.name"
+        dated_table_arns = Stack.of(self).format_arn(
+            service="dynamodb",
+            resource="table",
+            resource_name=f"{table_name}_*"
+        )
+
+        key_attributes = [partition_key, sort_key]
+        table_creation_parameters = {
+            "TableName": sfn.JsonPath.string_at(dated_table_name_path),
+            "KeySchema": [
+                {"AttributeName": partition_key, "KeyType": "HASH"},
+                {"AttributeName": sort_key, "KeyType": "RANGE"}
+            ],
+            "BillingMode": "PAY_PER_REQUEST"
+        }
+        if global_secondary_indexes:
+            table_creation_parameters["GlobalSecondaryIndexes"] = global_secondary_indexes
+            for index in global_secondary_indexes:
+                for key in index["KeySchema"]:
+                    if key["AttributeName"] not in key_attributes:
+                        key_attributes.append(key["AttributeName"])
+        table_creation_parameters["AttributeDefinitions"] = [
+            {"AttributeName": name, "AttributeType": "S"} for name in key_attributes
+        ]
+
+        resolve_table_name = sfn.Pass(
+            self,
+            "ResolveFeaturesTableName",
+            parameters={"name": dated_table_name},
+            result_path="$.featuresTable"
+        )
+
+        # A re-run finds the date's table already imported (or still importing)
+        describe_table = tasks.CallAwsService(
+            self,
+            "DescribeFeaturesTable",
+            service="dynamodb",
+            action="describeTable",
+            iam_resources=[dated_table_arns],
+            parameters={"TableName": sfn.JsonPath.string_at(dated_table_name_path)},
+            result_selector={"TableStatus.$": "$.Table.TableStatus"},
+            result_path="$.featuresTable.status"
+        )
+
+        wait_for_table = sfn.Wait(
+            self,
+            "WaitForFeaturesTable",
+            time=sfn.WaitTime.duration(poll_interval)
+        )
+
+        start_import = tasks.CallAwsService(
+            self,
+            "StartFeatureImport",
+            service="dynamodb",
+            action="importTable",
+            iam_resources=[dated_table_arns],
+            parameters={
+                "S3BucketSource": {
+                    "S3Bucket": bucket.bucket_name,
+                    "S3KeyPrefix": sfn.JsonPath.format(
+                        f"{source_prefix}{{}}/", sfn.JsonPath.string_at("$.run_date")
+                    )
+                },
+                "InputFormat": input_format,
+                "InputCompressionType": input_compression_type,
+                "TableCreationParameters": table_creation_parameters
+            },
+            additional_iam_statements=[
+                # ImportTable reads the snapshot as the caller and logs rejected items to CloudWatch
+                iam.PolicyStatement(
+                    actions=["s3:GetObject", "s3:ListBucket"],
+                    resources=[bucket.bucket_arn, bucket.arn_for_objects(f"{source_prefix}*")]
+                ),
+                iam.PolicyStatement(
+                    actions=[
+                        "dynamodb:CreateTable",
+                        "dynamodb:DescribeTable"
+                    ],
+                    resources=[dated_table_arns]
+                ),
+                iam.PolicyStatement(
+                    actions=[
+                        "logs:CreateLogGroup",
+                        "logs:CreateLogStream",
+                        "logs:DescribeLogGroups",
+                        "logs:DescribeLogStreams",
+                        "logs:PutLogEvents",
+                        "logs:PutRetentionPolicy"
+                    ],
+                    resources=[
+                        Stack.of(self).format_arn(
+                            service="logs",
+                            resource="log-group",
+                            resource_name="/aws-dynamodb/*",
+                            arn_format=ArnFormat.COLON_RESOURCE_NAME
+                        )
+                    ]
+                )
+            ],
+            result_selector={
+                "ImportArn.$": "$.ImportTableDescription.ImportArn"
+            },
+            result_path="$.featureImport"
+        )
+
+        wait = sfn.Wait(
+            self,
+            "WaitForFeatureImport",
+            time=sfn.WaitTime.duration(poll_interval)
+        )
+
+        describe_import = tasks.CallAwsService(
+            self,
+            "DescribeFeatureImport",
+            service="dynamodb",
+            action="describeImport",
+            iam_resources=[f"{dated_table_arns}/import/*"],
+            parameters={
+                "ImportArn": sfn.JsonPath.string_at("$.featureImport.ImportArn")
+            },
+            result_selector={
+                "ImportArn.$": "$.ImportTableDescription.ImportArn",
+                "ImportStatus.$": "$.ImportTableDescription.ImportStatus",
+                "TableArn.$": "$.ImportTableDescription.TableArn"
+            },
+            result_path="$.featureImport"
+        )
+
+        read_pointer = tasks.CallAwsService(
+            self,
+            "ReadFeaturesTablePointer",
+            service="ssm",
+            action="getParameter",
+            iam_resources=[table_pointer.parameter_arn],
+            parameters={"Name": table_pointer.parameter_name},
+            result_selector={"name.$": "$.Parameter.Value"},
+            result_path="$.previousFeaturesTable"
+        )
+
+        swap_pointer = tasks.CallAwsService(
+            self,
+            "SwapFeaturesTablePointer",
+            service="ssm",
+            action="putParameter",
+            iam_resources=[table_pointer.parameter_arn],
+            parameters={
+                "Name": table_pointer.parameter_name,
+                "Value": sfn.JsonPath.string_at(dated_table_name_path),
+                "Type": "String",
+                "Overwrite": True
+            },
+            result_path=sfn.JsonPath.DISCARD
+        )
+
+        # Readers that resolved the old pointer keep querying the old table for a while
+        retire_grace = sfn.Wait(
+            self,
+            "WaitBeforeRetiringFeaturesTable",
+            time=sfn.WaitTime.duration(retire_grace_period)
+        )
+
+        # The table the pointer moved away from is deleted after the grace period;
+        # the base table is never deleted
+        delete_previous = tasks.CallAwsService(
+            self,
+            "DeletePreviousFeaturesTable",
+            service="dynamodb",
+            action="deleteTable",
+            iam_resources=[dated_table_arns],
+            parameters={"TableName": sfn.JsonPath.string_at("$.previousFeaturesTable.name")},
+            result_path=sfn.JsonPath.DISCARD
+        )
+
+        done = sfn.Pass(self, "FeatureImportDone")
+
+        table_status = sfn.Choice(self, "FeaturesTableStatus")
+        table_status.when(
+            sfn.Condition.string_equals("$.featuresTable.status.TableStatus", "ACTIVE"),
+            read_pointer
+        )
+        table_status.when(
+            sfn.Condition.string_equals("$.featuresTable.status.TableStatus", "CREATING"),
+            wait_for_table
+        )
+        table_status.otherwise(fail_state)
+
+        import_status = sfn.Choice(self, "FeatureImportStatus")
+        import_status.when(
+            sfn.Condition.string_equals("$.featureImport.ImportStatus", "COMPLETED"),
+            read_pointer
+        )
+        import_status.when(
+            sfn.Condition.string_equals("$.featureImport.ImportStatus", "IN_PROGRESS"),
+            wait
+        )
+        import_status.otherwise(fail_state)
+
+        # Dated names sort by date, and after the base table name, so a run older than
+        # (or the same date as) the table the pointer names leaves both alone
+        newer_table = sfn.Choice(self, "NewerFeaturesTable")
+        newer_table.when(
+            sfn.Condition.string_greater_than_json_path(dated_table_name_path, "$.previousFeaturesTable.name"),
+            swap_pointer
+        )
+        newer_table.otherwise(done)
+
+        retire_previous = sfn.Choice(self, "RetirePreviousFeaturesTable")
+        retire_previous.when(
+            sfn.Condition.string_matches("$.previousFeaturesTable.name", f"{table_name}_*"),
+            retire_grace
+        )
+        retire_previous.otherwise(done)
+
+        resolve_table_name.next(describe_table)
+        describe_table.next(table_status)
+        wait_for_table.next(describe_table)
+        start_import.next(wait)
+        wait.next(describe_import)
+        describe_import.next(import_status)
+        read_pointer.next(newer_table)
+        swap_pointer.next(retire_previous)
+        retire_grace.next(delete_previous)
+        delete_previous.next(done)
+
+        describe_table.add_catch(
+            start_import, errors=["DynamoDb.ResourceNotFoundException"], result_path=sfn.JsonPath.DISCARD
+        )
+        for task in (describe_table, start_import, describe_import, read_pointer, swap_pointer):
+            task.add_catch(fail_state, result_path="$.error")
+        # The new table is live by now; a failed cleanup leaves the old table for manual deletion
+        delete_previous.add_catch(done, result_path="$.previousFeaturesTable.deleteError")
+
+        self._start_state = resolve_table_name
+        self._end_states = [done]
+
+    @property
+    def start_state(self) -> sfn.State:
+        return self._start_state
+
+    @property
+    def end_states(self) -> List[sfn.INextable]:
+        return self._end_states
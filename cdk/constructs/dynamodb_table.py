@@ -4,6 +4,14 @@ from aws_cdk import (
     Tags
 )
 from constructs import Construct
+from typing import List, Optional
+
+
+# GSI projection names accepted in configuration; a list of attribute names means INCLUDE
+_PROJECTION_TYPES = {
+    "ALL": dynamodb.ProjectionType.ALL,
+    "KEYS_ONLY": dynamodb.ProjectionType.KEYS_ONLY
+}
 
 
 class DynamoDBTable(Construct):
@@ -17,12 +25,17 @@ class DynamoDBTable(Construct):
         construct_id: str,
         table_name: str,
         partition_key: str,
-        sort_key: str,
+        sort_key: Optional[str],
         environment: str,
+        global_secondary_indexes: Optional[List[dict]] = None,
+        time_to_live_attribute: Optional[str] = None,
         **kwargs
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        self.partition_key = partition_key
+        self.sort_key = sort_key
+
         # Create DynamoDB table
         self.table = dynamodb.Table(
             self,
@@ -35,12 +48,42 @@ class DynamoDBTable(Construct):
             sort_key=dynamodb.Attribute(
                 name=sort_key,
                 type=dynamodb.AttributeType.STRING
-            ),
+            ) if sort_key else None,
+            time_to_live_attribute=time_to_live_attribute,
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
             removal_policy=RemovalPolicy.RETAIN if environment == 'prod' else RemovalPolicy.DESTROY,
             point_in_time_recovery=True if environment == 'prod' else False,
         )
 
+        # Add global secondary indexes, e.g.
+        # {"index_name": "date-shard-index", "partition_key": "date_shard",
+        #  "sort_key": "customer_id", "projection": "ALL", "shard_count": 16}
+        # With shard_count, writers set the partition key to "<date>#<n>" with
+        # n = hash(customer_id) % shard_count so a day spreads over that many
+        # partitions and readers can Query each shard in parallel
+        self.global_secondary_indexes = global_secondary_indexes or []
+        for index in self.global_secondary_indexes:
+            projection = index.get("projection", "ALL")
+            if isinstance(projection, str) and projection not in _PROJECTION_TYPES:
+                raise ValueError(
+                    f"Index '{index['index_name']}' has projection '{projection}', expected "
+                    f"{sorted(_PROJECTION_TYPES)} or a list of attribute names"
+                )
+            self.table.add_global_secondary_index(
+                index_name=index["index_name"],
+                partition_key=dynamodb.Attribute(
+                    name=index["partition_key"],
+                    type=dynamodb.AttributeType.STRING
+                ),
+                sort_key=dynamodb.Attribute(
+                    name=index["sort_key"],
+                    type=dynamodb.AttributeType.STRING
+                ) if index.get("sort_key") else None,
+                projection_type=_PROJECTION_TYPES[projection] if isinstance(projection, str)
+                else dynamodb.ProjectionType.INCLUDE,
+                non_key_attributes=None if isinstance(projection, str) else list(projection)
+            )
+
         # Add tags
         Tags.of(self.table).add("Environment", environment)
         Tags.of(self.table).add("Service", "sanders-customer-platform")
@@ -52,3 +95,29 @@ class DynamoDBTable(Construct):
     @property
     def table_arn(self) -> str:
         return self.table.table_arn
+
+    @property
+    def index_specifications(self) -> List[dict]:
+        """Global secondary indexes in DynamoDB API shape (as used by ImportTable)"""
+        specifications = []
+        for index in self.global_secondary_indexes:
+            key_schema = [{"AttributeName": index["partition_key"], "KeyType": "HASH"}]
+            if index.get("sort_key"):
+                key_schema.append({"AttributeName": index["sort_key"], "KeyType": "RANGE"})
+            projection = index.get("projection", "ALL")
+            specifications.append({
+                "IndexName": index["index_name"],
+                "KeySchema": key_schema,
+                "Projection": {"ProjectionType": projection} if isinstance(projection, str)
+                else {"ProjectionType": "INCLUDE", "NonKeyAttributes": list(projection)}
+            })
+        return specifications
+
+    @property
+    def shard_counts(self) -> dict:
+        """Write shard count per index name, for indexes that use write sharding"""
+        return {
+            index["index_name"]: index["shard_count"]
+            for index in self.global_secondary_indexes
+            if index.get("shard_count")
+        }
@@ -1,5 +1,6 @@
 from aws_cdk import (
     aws_ecr as ecr,
+    Duration,
     RemovalPolicy,
     Tags
 )
@@ -17,6 +18,8 @@ class ECRRepository(Construct):
         construct_id: str,
         repository_name: str,
         environment: str,
+        max_image_count: int = 10,
+        untagged_expiry_days: int = 3,
         **kwargs
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
@@ -27,15 +30,28 @@ class ECRRepository(Construct):
             f"Repository",
             repository_name=repository_name,
             image_scan_on_push=True,
+            # Tags can never be moved, so a tag or digest pins exactly one image
+            image_tag_mutability=ecr.TagMutability.IMMUTABLE,
             removal_policy=RemovalPolicy.RETAIN if environment == 'prod' else RemovalPolicy.DESTROY,
             empty_on_delete=False if environment == 'prod' else True,
         )
 
         # Add lifecycle policy to manage image retention
+        # Untagged images (orphaned manifests, superseded builds, standalone SOCI indexes)
+        # expire after a few days; ECR keeps images still referenced by a tagged manifest
+        # list, such as the per-architecture manifests of a multi-arch tag
         self.repository.add_lifecycle_rule(
-            description="Keep last 10 images",
-            max_image_count=10,
-            tag_status=ecr.TagStatus.ANY
+            description=f"Expire untagged images after {untagged_expiry_days} days",
+            rule_priority=1,
+            max_image_age=Duration.days(untagged_expiry_days),
+            tag_status=ecr.TagStatus.UNTAGGED
+        )
+        self.repository.add_lifecycle_rule(
+            description=f"Keep last {max_image_count} tagged images",
+            rule_priority=2,
+            max_image_count=max_image_count,
+            tag_status=ecr.TagStatus.TAGGED,
+            tag_pattern_list=["*"]
         )
 
         # Add tags
@@ -0,0 +1,29 @@
+from aws_cdk import (
+    aws_stepfunctions_tasks as tasks
+)
+from constructs import Construct
+from typing import Optional
+
+
+class FairShareBatchSubmitJob(tasks.BatchSubmitJob):
+    """
+    BatchSubmitJob that tags the job with a fair-share identifier
+    The Step Functions task construct has no ShareIdentifier property, so it is
+    added to the rendered task parameters; jobs on a fair-share queue must carry one
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        share_identifier: Optional[str] = None,
+        **kwargs
+    ) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+        self.share_identifier = share_identifier
+
+    def to_state_json(self) -> dict:
+        state = super().to_state_json()
+        if self.share_identifier:
+            state["Parameters"]["ShareIdentifier"] = self.share_identifier
+        return state
@@ -0,0 +1,70 @@
+import os
+
+from aws_cdk import (
+    aws_iam as iam,
+    aws_lambda as lambda_,
+    aws_logs as logs,
+    aws_s3 as s3,
+    Duration,
+    RemovalPolicy,
+    Tags
+)
+from constructs import Construct
+
+
+LAMBDA_CODE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "lambda", "input_fingerprint")
+
+
+class InputFingerprintFunction(Construct):
+    """
+    Lambda that hashes the object listing (key, ETag, size) under an S3 prefix
+    Used by stage memoization to detect unchanged inputs
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        bucket: s3.IBucket,
+        environment: str,
+        ttl_days: int = 7,
+        **kwargs
+    ) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        self.log_group = logs.LogGroup(
+            self,
+            f"LogGroup",
+            log_group_name=f"/aws/lambda/sanders-input-fingerprint-{environment}",
+            retention=logs.RetentionDays.ONE_MONTH,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
+        self.function = lambda_.Function(
+            self,
+            f"Function",
+            function_name=f"sanders-input-fingerprint-{environment}",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            handler="index.handler",
+            code=lambda_.Code.from_asset(LAMBDA_CODE_DIR),
+            timeout=Duration.minutes(5),
+            memory_size=256,
+            log_group=self.log_group,
+            environment={
+                "BUCKET_NAME": bucket.bucket_name,
+                "MEMO_TTL_DAYS": str(ttl_days)
+            }
+        )
+
+        # Listing returns ETags, so no object reads are needed
+        self.function.add_to_role_policy(
+            iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=["s3:ListBucket"],
+                resources=[bucket.bucket_arn]
+            )
+        )
+
+        # Add tags
+        Tags.of(self.function).add("Environment", environment)
+        Tags.of(self.function).add("Service", "sanders-customer-platform")
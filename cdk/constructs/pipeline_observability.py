@@ -0,0 +1,341 @@
+import os
+
+from aws_cdk import (
+    aws_cloudwatch as cloudwatch,
+    aws_cloudwatch_actions as cloudwatch_actions,
+    aws_dynamodb as dynamodb,
+    aws_events as events,
+    aws_events_targets as targets,
+    aws_lambda as lambda_,
+    aws_logs as logs,
+    aws_sns as sns,
+    aws_sns_subscriptions as subscriptions,
+    aws_stepfunctions as sfn,
+    Duration,
+    RemovalPolicy,
+    Tags
+)
+from constructs import Construct
+from typing import Dict, List, Optional
+from cdk.constructs.batch_environment import BatchEnvironment
+
+
+LAMBDA_CODE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "lambda", "batch_job_metrics")
+EXECUTION_AGE_CODE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "lambda", "execution_age")
+
+# Namespace the job metrics Lambda writes its embedded metric format records to
+METRICS_NAMESPACE = "Sanders/Pipeline"
+
+# Job names the orchestrator submits, one dashboard line per stage
+PIPELINE_JOB_NAMES = (
+    "feature-extraction",
+    "feature-extraction-shard",
+    "data-processing",
+    "model-training"
+)
+
+
+class PipelineObservability(Construct):
+    """
+    CloudWatch dashboard and alarms for the pipeline
+    Batch job state changes are turned into submit-to-start, stage run time
+    and state transition metrics by a Lambda fed from an EventBridge rule; the
+    dashboard puts them next to execution time percentiles and features
+    table capacity, and alarms publish to an SNS topic
+    ExecutionTime is only emitted once an execution ends, so a second Lambda
+    reports the age of the oldest running orchestrator execution every five
+    minutes and the SLA alarm watches that instead; overruns alert without
+    stopping the run
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        batch_environment: BatchEnvironment,
+        state_machines: Dict[str, sfn.StateMachine],
+        features_table: dynamodb.ITable,
+        environment: str,
+        execution_sla_minutes: int = 240,
+        queue_wait_sla_minutes: int = 30,
+        throttled_requests_threshold: int = 0,
+        alarm_emails: Optional[List[str]] = None,
+        **kwargs
+    ) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        if execution_sla_minutes < 1 or queue_wait_sla_minutes < 1:
+            raise ValueError("Observability SLAs must be at least one minute")
+
+        self.environment = environment
+        queues = batch_environment.job_queues
+
+        # Job state changes -> embedded metric format records in the function's log group
+        self.log_group = logs.LogGroup(
+            self,
+            f"LogGroup",
+            log_group_name=f"/aws/lambda/sanders-batch-job-metrics-{environment}",
+            retention=logs.RetentionDays.ONE_MONTH,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
+        self.function = lambda_.Function(
+            self,
+            f"Function",
+            function_name=f"sanders-batch-job-metrics-{environment}",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            handler="index.handler",
+            code=lambda_.Code.from_asset(LAMBDA_CODE_DIR),
+            timeout=Duration.seconds(10),
+            memory_size=128,
+            log_group=self.log_group,
+            environment={
+                "ENVIRONMENT": environment
+            }
+        )
+
+        self.job_state_rule = events.Rule(
+            self,
+            f"JobStateChangeRule",
+            rule_name=f"sanders-batch-job-state-{environment}",
+            description="Batch job state changes on the pipeline queues, turned into metrics",
+            event_pattern=events.EventPattern(
+                source=["aws.batch"],
+                detail_type=["Batch Job State Change"],
+                detail={"jobQueue": [queue.attr_job_queue_arn for queue in queues]}
+            ),
+            targets=[targets.LambdaFunction(self.function, retry_attempts=2)]
+        )
+
+        # Alarms notify this topic; subscribe on-call tooling to it
+        self.alarm_topic = sns.Topic(
+            self,
+            f"AlarmTopic",
+            topic_name=f"sanders-pipeline-alarms-{environment}"
+        )
+        for email in alarm_emails or []:
+            self.alarm_topic.add_subscription(subscriptions.EmailSubscription(email))
+
+        self.alarms = []
+        orchestrator = next(iter(state_machines.values()))
+
+        # Running execution age, so a hung run breaches the SLA while it is still running
+        self.execution_age_log_group = logs.LogGroup(
+            self,
+            f"ExecutionAgeLogGroup",
+            log_group_name=f"/aws/lambda/sanders-execution-age-{environment}",
+            retention=logs.RetentionDays.ONE_MONTH,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
+        self.execution_age_function = lambda_.Function(
+            self,
+            f"ExecutionAgeFunction",
+            function_name=f"sanders-execution-age-{environment}",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            handler="index.handler",
+            code=lambda_.Code.from_asset(EXECUTION_AGE_CODE_DIR),
+            timeout=Duration.seconds(30),
+            memory_size=128,
+            log_group=self.execution_age_log_group,
+            environment={
+                "ENVIRONMENT": environment,
+                "STATE_MACHINE_ARN": orchestrator.state_machine_arn
+            }
+        )
+        orchestrator.grant_read(self.execution_age_function)
+
+        self.execution_age_rule = events.Rule(
+            self,
+            f"ExecutionAgeSchedule",
+            rule_name=f"sanders-execution-age-{environment}",
+            description="Reports the age of the oldest running orchestrator execution",
+            schedule=events.Schedule.rate(Duration.minutes(5)),
+            targets=[targets.LambdaFunction(self.execution_age_function, retry_attempts=2)]
+        )
+
+        failed_executions = cloudwatch.MathExpression(
+            expression="failed + timedOut",
+            using_metrics={
+                "failed": orchestrator.metric_failed(statistic="Sum"),
+                "timedOut": orchestrator.metric_timed_out(statistic="Sum")
+            },
+            label="Failed or timed out executions",
+            period=Duration.minutes(5)
+        )
+        self._alarm(
+            "ExecutionFailedAlarm",
+            f"sanders-pipeline-failed-{environment}",
+            "A pipeline execution failed or timed out",
+            failed_executions,
+            threshold=0
+        )
+        self._alarm(
+            "ExecutionOverrunAlarm",
+            f"sanders-pipeline-overrun-{environment}",
+            f"A pipeline execution has been running for more than {execution_sla_minutes} minutes",
+            cloudwatch.Metric(
+                namespace=METRICS_NAMESPACE,
+                metric_name="OldestRunningExecutionMinutes",
+                dimensions_map={"Environment": environment, "StateMachine": orchestrator.state_machine_name},
+                statistic="Maximum",
+                period=Duration.minutes(5)
+            ),
+            threshold=execution_sla_minutes
+        )
+        for queue in queues:
+            self._alarm(
+                f"QueueWaitAlarm{queue.node.id}",
+                f"{queue.job_queue_name}-wait",
+                f"p90 submit-to-start time on {queue.job_queue_name} is above "
+                f"{queue_wait_sla_minutes} minutes",
+                self._job_metric(
+                    "SubmitToStartSeconds", {"JobQueue": queue.job_queue_name}, statistic="p90", period=Duration.minutes(15)
+                ),
+                threshold=queue_wait_sla_minutes * 60
+            )
+        throttled_requests = cloudwatch.MathExpression(
+            expression="readThrottles + writeThrottles",
+            using_metrics={
+                "readThrottles": features_table.metric("ReadThrottleEvents", statistic="Sum"),
+                "writeThrottles": features_table.metric("WriteThrottleEvents", statistic="Sum")
+            },
+            label="Throttled requests",
+            period=Duration.minutes(5)
+        )
+        self._alarm(
+            "FeaturesTableThrottleAlarm",
+            f"sanders-features-throttled-{environment}",
+            "Reads or writes on the features table are being throttled",
+            throttled_requests,
+            threshold=throttled_requests_threshold
+        )
+
+        # Dashboard: executions, stages, queues, table
+        self.dashboard = cloudwatch.Dashboard(
+            self,
+            f"Dashboard",
+            dashboard_name=f"sanders-pipeline-{environment}",
+            default_interval=Duration.days(7)
+        )
+        self.dashboard.add_widgets(
+            cloudwatch.GraphWidget(
+                title="Execution time (p50 / p90 / p99)",
+                left=[
+                    state_machine.metric_time(statistic=statistic, label=f"{name} {statistic}")
+                    for name, state_machine in state_machines.items()
+                    for statistic in ("p50", "p90", "p99")
+                ],
+                left_annotations=[cloudwatch.HorizontalAnnotation(
+                    value=execution_sla_minutes * 60 * 1000, label="SLA"
+                )],
+                width=12
+            ),
+            cloudwatch.GraphWidget(
+                title="Executions",
+                left=[
+                    orchestrator.metric_started(statistic="Sum"),
+                    orchestrator.metric_succeeded(statistic="Sum"),
+                    orchestrator.metric_failed(statistic="Sum"),
+                    orchestrator.metric_timed_out(statistic="Sum")
+                ],
+                width=12
+            )
+        )
+        self.dashboard.add_widgets(
+            cloudwatch.GraphWidget(
+                title="Stage run time (p50 / p90)",
+                left=[
+                    self._job_metric("RunSeconds", {"JobName": job_name}, statistic=statistic,
+                                     label=f"{job_name} {statistic}")
+                    for job_name in PIPELINE_JOB_NAMES
+                    for statistic in ("p50", "p90")
+                ],
+                width=12
+            ),
+            cloudwatch.GraphWidget(
+                title="Submitted to RUNNING (p90)",
+                left=[
+                    self._job_metric("SubmitToStartSeconds", {"JobQueue": queue.job_queue_name}, statistic="p90",
+                                     label=queue.job_queue_name)
+                    for queue in queues
+                ],
+                left_annotations=[cloudwatch.HorizontalAnnotation(
+                    value=queue_wait_sla_minutes * 60, label="SLA"
+                )],
+                width=12
+            )
+        )
+        self.dashboard.add_widgets(
+            cloudwatch.GraphWidget(
+                title="Job state transitions",
+                left=[
+                    self._job_metric("JobStateTransitions", {"JobQueue": queue.job_queue_name, "Status": status},
+                                     statistic="Sum", label=f"{queue.job_queue_name} {status}")
+                    for queue in queues
+                    for status in ("RUNNABLE", "RUNNING", "FAILED")
+                ],
+                width=8
+            ),
+            cloudwatch.GraphWidget(
+                title="Features table consumed capacity",
+                left=[
+                    features_table.metric_consumed_read_capacity_units(),
+                    features_table.metric_consumed_write_capacity_units()
+                ],
+                width=8
+            ),
+            cloudwatch.GraphWidget(
+                title="Features table throttled requests",
+                left=[
+                    features_table.metric("ReadThrottleEvents", statistic="Sum"),
+                    features_table.metric("WriteThrottleEvents", statistic="Sum")
+                ],
+                width=8
+            )
+        )
+        self.dashboard.add_widgets(
+            cloudwatch.AlarmStatusWidget(
+                title="Alarms",
+                alarms=self.alarms,
+                width=24
+            )
+        )
+
+        # Add tags
+        Tags.of(self.function).add("Environment", environment)
+        Tags.of(self.function).add("Service", "sanders-customer-platform")
+        Tags.of(self.execution_age_function).add("Environment", environment)
+        Tags.of(self.execution_age_function).add("Service", "sanders-customer-platform")
+        Tags.of(self.alarm_topic).add("Environment", environment)
+
+    def _job_metric(self, metric_name: str, dimensions: dict, **kwargs) -> cloudwatch.Metric:
+        return cloudwatch.Metric(
+            namespace=METRICS_NAMESPACE,
+            metric_name=metric_name,
+            dimensions_map={"Environment": self.environment, **dimensions},
+            **kwargs
+        )
+
+    def _alarm(
+        self,
+        construct_id: str,
+        alarm_name: str,
+        description: str,
+        metric: cloudwatch.IMetric,
+        threshold: float
+    ) -> cloudwatch.Alarm:
+        alarm = cloudwatch.Alarm(
+            self,
+            construct_id,
+            alarm_name=alarm_name,
+            alarm_description=description,
+            metric=metric,
+            threshold=threshold,
+            evaluation_periods=1,
+            comparison_operator=cloudwatch.ComparisonOperator.GREATER_THAN_THRESHOLD,
+            treat_missing_data=cloudwatch.TreatMissingData.NOT_BREACHING
+        )
+        alarm.add_alarm_action(cloudwatch_actions.SnsAction(self.alarm_topic))
+        self.alarms.append(alarm)
+        return alarm
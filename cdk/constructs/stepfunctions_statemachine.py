@@ -1,14 +1,35 @@
 from aws_cdk import (
+    aws_batch as batch,
+    aws_dynamodb as dynamodb,
     aws_stepfunctions as sfn,
     aws_stepfunctions_tasks as tasks,
     aws_iam as iam,
+    aws_lambda as lambda_,
+    aws_s3 as s3,
+    aws_ssm as ssm,
+    ArnFormat,
     Duration,
+    Stack,
     Tags
 )
 from constructs import Construct
+from typing import Dict, List, Optional, Tuple
+from cdk.job_sizes import DEFAULT_STAGE_SIZES
+from cdk.constructs.dynamodb_bulk_import import DynamoDBBulkImport
+from cdk.constructs.backfill_dates import BackfillDatesFunction
+from cdk.constructs.fair_share_submit_job import FairShareBatchSubmitJob
 import json
 
 
+# SubmitJob API failures (throttling, service errors) are retried with jittered backoff;
+# a job that fails after its own Batch retries surfaces as States.TaskFailed and is not retried
+BATCH_API_ERRORS = [
+    "Batch.AWSBatchException",
+    "Batch.TooManyRequestsException",
+    "Batch.ServerException"
+]
+
+
 class StepFunctionsStateMachine(Construct):
     """
     Step Functions State Machine construct
@@ -20,17 +41,100 @@ class StepFunctionsStateMachine(Construct):
         scope: Construct,
         construct_id: str,
         job_queue_arn: str,
-        job_definitions: dict,
+        job_definitions: Dict[str, batch.CfnJobDefinition],
         environment: str,
+        sharding: Optional[dict] = None,
+        shard_max_concurrency: Optional[int] = None,
+        data_bucket: Optional[s3.IBucket] = None,
+        array_jobs: Optional[dict] = None,
+        stage_sizes: Optional[Dict[str, str]] = None,
+        job_queue_arns: Optional[Dict[str, str]] = None,
+        size_routing: Optional[dict] = None,
+        bulk_import: Optional[dict] = None,
+        features_table_name: Optional[str] = None,
+        features_table_keys: Optional[Tuple[str, str]] = None,
+        features_table_indexes: Optional[List[dict]] = None,
+        features_table_pointer: Optional[ssm.IStringParameter] = None,
+        ledger_table: Optional[dynamodb.ITable] = None,
+        memoization: Optional[dict] = None,
+        memo_table: Optional[dynamodb.ITable] = None,
+        fingerprint_function: Optional[lambda_.IFunction] = None,
+        share_identifier: Optional[str] = None,
+        backfill: Optional[dict] = None,
+        backfill_max_concurrency: Optional[int] = None,
         **kwargs
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        # Each stage picks its job definition by size name; sizes on another
+        # platform (EC2) are submitted to that platform's queue
+        self.stage_sizes = {**DEFAULT_STAGE_SIZES, **(stage_sizes or {})}
+        unknown_sizes = sorted(set(self.stage_sizes.values()) - set(job_definitions))
+        if unknown_sizes:
+            raise ValueError(f"Stage sizes {unknown_sizes} are not in the job size catalog")
+        self.job_definitions = job_definitions
+        self.job_queue_arns = job_queue_arns or {}
+        self.default_job_queue_arn = job_queue_arn
+
+        # On fair-share queues every job is tagged with the workload's share identifier
+        self.share_identifier = share_identifier
+
+        # Stages with routing tiers pick their size from an execution input metric
+        # Example input: {"command": [...], "input_bytes": 52428800}
+        self.size_routing = size_routing if size_routing and size_routing.get("enabled") else None
+        if self.size_routing:
+            routed_sizes = {
+                tier["size"]
+                for tiers in self.size_routing.get("stages", {}).values()
+                for tier in tiers
+            }
+            unknown_sizes = sorted(routed_sizes - set(job_definitions))
+            if unknown_sizes:
+                raise ValueError(f"Size routing tiers {unknown_sizes} are not in the job size catalog")
+
+        # Partitionable stages run as Batch array jobs sized from the execution input
+        # Example input: {"command": [...], "array_size": 500}
+        self.array_size_path = "$.array_size" if array_jobs and array_jobs.get("enabled") else None
+
+        # With a run ledger every stage records its completion under (run_date, stage)
+        # and is skipped when a later execution for the same run_date finds it complete
+        # Example input: {"command": [...], "run_date": "2026-02-07"}; "rerun": true ignores the ledger
+        self.ledger_table = ledger_table
+
+        # Memoized stages fingerprint their S3 input prefix, job definition and command and
+        # reuse the last successful run's outputs for the same stage and partition when the
+        # fingerprint has not changed
+        # Example input: {"command": [...], "input_prefix": "raw/2026-02-07/"}
+        self.memoization = memoization if memoization and memoization.get("enabled") else None
+        self.memo_table = memo_table
+        self.fingerprint_function = fingerprint_function
+        if self.memoization:
+            unknown_stages = sorted(set(self.memoization.get("stages", {})) - set(self.stage_sizes))
+            if unknown_stages:
+                raise ValueError(f"Memoization stages {unknown_stages} are not pipeline stages")
+            if memo_table is None or fingerprint_function is None:
+                raise ValueError("Memoization requires memo_table and fingerprint_function")
+
+        # In backfill mode the pipeline runs once per date of a start_date/end_date range
+        # Example input: {"command": [...], "start_date": "2026-01-01", "end_date": "2026-01-31"}
+        # Each date's run id comes from its input, so it names the date, and its jobs get
+        # the date in SANDERS_RUN_DATE
+        self.backfill = backfill if backfill and backfill.get("enabled") else None
+        if self.backfill and bulk_import and bulk_import.get("enabled"):
+            # Concurrent dates would each swap the features table pointer, leaving it on
+            # whichever import finished last rather than the newest date
+            raise ValueError("Backfill cannot run with bulk_import; load snapshots through the orchestrator")
+        self.run_id_path = "$.run_id" if self.backfill else "$$.Execution.Name"
+        workflow_name = "backfill" if self.backfill else "orchestrator"
+
         # Create IAM role for Step Functions
         self.state_machine_role = iam.Role(
             self,
             f"StateMachineRole",
-            role_name=f"sanders-stepfunctions-role-{environment}",
+            role_name=(
+                f"sanders-stepfunctions-backfill-role-{environment}" if self.backfill
+                else f"sanders-stepfunctions-role-{environment}"
+            ),
             assumed_by=iam.ServicePrincipal("states.amazonaws.com"),
         )
 
@@ -64,43 +168,47 @@ class StepFunctionsStateMachine(Construct):
         # Jobs accept command from input: $.command (array of strings)
         # Example input: {"command": ["jobs/daily_features_tlc.py"]}
         
-        # Job 1: Feature extraction with 8GB
-        job_1 = tasks.BatchSubmitJob(
-            self,
-            "FeatureExtractionJob",
-            job_name="feature-extraction",
-            job_queue_arn=job_queue_arn,
-            job_definition_arn=job_definitions['8g'].ref,
-            container_overrides=tasks.BatchContainerOverrides(
-                command=sfn.JsonPath.list_at("$.command")
-            ),
-            result_path="$.featureJob"
-        )
+        # Job 1: Feature extraction (8GB by default)
+        # In sharded mode it fans out over a shard manifest via a Distributed Map
+        if sharding and sharding.get("enabled"):
+            job_1 = self._sharded_feature_extraction(
+                size=self.stage_sizes["feature_extraction"],
+                sharding=sharding,
+                max_concurrency=sharding.get("max_concurrency") or shard_max_concurrency,
+                data_bucket=data_bucket
+            )
+        else:
+            job_1, _ = self._sized_stage(
+                stage="feature_extraction",
+                state_id="FeatureExtractionJob",
+                job_name="feature-extraction",
+                result_path="$.featureJob",
+                memo_state_id="FeatureExtraction",
+                partitioned=True
+            )
+        job_1, _ = self._checkpointed("feature_extraction", "FeatureExtraction", job_1, "$.featureJob")
 
-        # Job 2: Data processing with 2GB
-        job_2 = tasks.BatchSubmitJob(
-            self,
-            "DataProcessingJob",
+        # Job 2: Data processing (2GB by default)
+        job_2, _ = self._sized_stage(
+            stage="data_processing",
+            state_id="DataProcessingJob",
             job_name="data-processing",
-            job_queue_arn=job_queue_arn,
-            job_definition_arn=job_definitions['2g'].ref,
-            container_overrides=tasks.BatchContainerOverrides(
-                command=sfn.JsonPath.list_at("$.command")
-            ),
-            result_path="$.processingJob"
+            result_path="$.processingJob",
+            memo_state_id="DataProcessing",
+            partitioned=True
         )
+        job_2, _ = self._checkpointed("data_processing", "DataProcessing", job_2, "$.processingJob")
 
-        # Job 3: Model training with 16GB (runs after feature extraction)
-        job_3 = tasks.BatchSubmitJob(
-            self,
-            "ModelTrainingJob",
+        # Job 3: Model training (16GB by default, runs after feature extraction)
+        job_3, training_tasks = self._sized_stage(
+            stage="model_training",
+            state_id="ModelTrainingJob",
             job_name="model-training",
-            job_queue_arn=job_queue_arn,
-            job_definition_arn=job_definitions['16g'].ref,
-            container_overrides=tasks.BatchContainerOverrides(
-                command=sfn.JsonPath.list_at("$.command")
-            ),
-            result_path="$.trainingJob"
+            result_path="$.trainingJob",
+            memo_state_id="ModelTraining"
+        )
+        job_3, training_checkpoint_tasks = self._checkpointed(
+            "model_training", "ModelTraining", job_3, "$.trainingJob"
         )
 
         # Success state
@@ -127,27 +235,627 @@ class StepFunctionsStateMachine(Construct):
         parallel_jobs.branch(job_1)
         parallel_jobs.branch(job_2)
 
-        # Chain: parallel jobs -> training job -> success
-        definition = parallel_jobs.next(job_3).next(succeed)
+        # Chain: parallel jobs -> (bulk feature import) -> training job -> success
+        if bulk_import and bulk_import.get("enabled"):
+            if data_bucket is None or features_table_pointer is None or features_table_keys is None:
+                raise ValueError(
+                    "Bulk import requires data_bucket, features_table_keys and features_table_pointer"
+                )
+            feature_import = DynamoDBBulkImport(
+                self,
+                "FeatureImport",
+                bucket=data_bucket,
+                source_prefix=bulk_import.get("source_prefix", "feature-snapshots/"),
+                table_name=features_table_name,
+                partition_key=features_table_keys[0],
+                sort_key=features_table_keys[1],
+                table_pointer=features_table_pointer,
+                fail_state=fail,
+                input_format=bulk_import.get("input_format", "DYNAMODB_JSON"),
+                input_compression_type=bulk_import.get("input_compression_type", "GZIP"),
+                poll_interval=Duration.seconds(bulk_import.get("poll_interval_seconds", 60)),
+                retire_grace_period=Duration.minutes(bulk_import.get("retire_grace_minutes", 15)),
+                global_secondary_indexes=features_table_indexes
+            )
+            feature_import, import_checkpoint_tasks = self._checkpointed(
+                "feature_import", "FeatureImport", feature_import, "$.featureImport"
+            )
+            training_checkpoint_tasks += import_checkpoint_tasks
+            definition = parallel_jobs.next(feature_import).next(job_3).next(succeed)
+        else:
+            definition = parallel_jobs.next(job_3).next(succeed)
+
+        # Executions that omit array_size run their partitionable stages as single jobs
+        if self.array_size_path:
+            definition = self._default_array_size(definition)
 
         # Add error handling
         parallel_jobs.add_catch(fail, result_path="$.error")
-        job_3.add_catch(fail, result_path="$.error")
+        for training_task in training_tasks + training_checkpoint_tasks:
+            training_task.add_catch(fail, result_path="$.error")
+
+        if self.backfill:
+            if data_bucket is None:
+                raise ValueError("Backfill requires data_bucket for the per-date results")
+            definition = self._backfill_dates(
+                definition,
+                environment=environment,
+                max_concurrency=self.backfill.get("max_concurrency") or backfill_max_concurrency,
+                data_bucket=data_bucket
+            )
 
         # Create State Machine
         self.state_machine = sfn.StateMachine(
             self,
             f"StateMachine",
-            state_machine_name=f"sanders-orchestrator-{environment}",
+            state_machine_name=f"sanders-{workflow_name}-{environment}",
             definition=definition,
             role=self.state_machine_role,
-            timeout=Duration.hours(24)
+            timeout=Duration.hours(self.backfill.get("timeout_hours", 24 * 7) if self.backfill else 24)
         )
 
+        # CDK only grants Distributed Maps in the top-level graph the right to run their
+        # child executions, so the shard map nested in ParallelJobs needs its own grant
+        if sharding and sharding.get("enabled"):
+            self._allow_child_executions(f"sanders-{workflow_name}-{environment}")
+
         # Add tags
         Tags.of(self.state_machine).add("Environment", environment)
         Tags.of(self.state_machine).add("Service", "sanders-customer-platform")
 
+    def _allow_child_executions(self, state_machine_name: str) -> None:
+        """
+        Let the state machine start, describe and stop its own child executions
+        The ARNs are built from the name, since referencing the state machine
+        from its own role's policy would be a circular dependency
+        """
+        stack = Stack.of(self)
+        iam.Policy(
+            self,
+            "ShardMapPolicy",
+            roles=[self.state_machine_role],
+            statements=[
+                iam.PolicyStatement(
+                    effect=iam.Effect.ALLOW,
+                    actions=["states:StartExecution"],
+                    resources=[stack.format_arn(
+                        service="states",
+                        resource="stateMachine",
+                        resource_name=state_machine_name,
+                        arn_format=ArnFormat.COLON_RESOURCE_NAME
+                    )]
+                ),
+                iam.PolicyStatement(
+                    effect=iam.Effect.ALLOW,
+                    actions=["states:DescribeExecution", "states:StopExecution"],
+                    resources=[stack.format_arn(
+                        service="states",
+                        resource="execution",
+                        resource_name=f"{state_machine_name}:*",
+                        arn_format=ArnFormat.COLON_RESOURCE_NAME
+                    )]
+                )
+            ]
+        )
+
+    @staticmethod
+    def _retry_batch_api_errors(task: tasks.BatchSubmitJob) -> tasks.BatchSubmitJob:
+        task.add_retry(
+            errors=BATCH_API_ERRORS,
+            interval=Duration.seconds(10),
+            backoff_rate=2,
+            max_attempts=5,
+            max_delay=Duration.minutes(5),
+            jitter_strategy=sfn.JitterType.FULL
+        )
+        return task
+
+    def _submit_job(
+        self,
+        state_id: str,
+        job_name: str,
+        size: str,
+        result_path: str,
+        partitioned: bool = False
+    ) -> tasks.BatchSubmitJob:
+        return self._retry_batch_api_errors(FairShareBatchSubmitJob(
+            self,
+            state_id,
+            share_identifier=self.share_identifier,
+            job_name=job_name,
+            job_queue_arn=self._queue_arn(size),
+            job_definition_arn=self.job_definitions[size].ref,
+            array_size=self._array_size() if partitioned else None,
+            container_overrides=self._container_overrides(partitioned=partitioned),
+            result_path=result_path
+        ))
+
+    def _sized_stage(
+        self,
+        stage: str,
+        state_id: str,
+        job_name: str,
+        result_path: str,
+        memo_state_id: str,
+        partitioned: bool = False
+    ) -> Tuple[sfn.IChainable, List[sfn.TaskStateBase]]:
+        """
+        Build a stage that runs at its configured size, or, with size routing,
+        a Choice that picks the smallest tier whose threshold covers the
+        execution input metric and falls back to the configured size
+        Memoized stages are fingerprinted after the Choice, with the job
+        definition of the size that runs
+        Returns the chainable stage and every task it can run
+        """
+        def sized(size: str, size_state_id: str, size_memo_state_id: str):
+            submission, submit_tasks = self._partitioned_submit(
+                size_state_id, job_name, size, result_path, partitioned
+            )
+            submission, memo_tasks = self._memoized(stage, size_memo_state_id, submission, result_path, size=size)
+            return submission, submit_tasks + memo_tasks
+
+        default_size = self.stage_sizes[stage]
+        default_stage, default_tasks = sized(default_size, state_id, memo_state_id)
+
+        tiers = (self.size_routing or {}).get("stages", {}).get(stage)
+        if not tiers:
+            return default_stage, default_tasks
+
+        metric_path = f"$.{self.size_routing.get('metric', 'input_bytes')}"
+        stages = {default_size: default_stage}
+        stage_tasks = list(default_tasks)
+        choice = sfn.Choice(self, f"{state_id}Size")
+        for tier in sorted(tiers, key=lambda t: t["max"]):
+            size = tier["size"]
+            if size not in stages:
+                stages[size], size_tasks = sized(
+                    size, f"{state_id}{size.upper()}", f"{memo_state_id}{size.upper()}"
+                )
+                stage_tasks += size_tasks
+            choice.when(
+                sfn.Condition.and_(
+                    sfn.Condition.is_present(metric_path),
+                    sfn.Condition.number_less_than_equals(metric_path, tier["max"])
+                ),
+                stages[size]
+            )
+        choice.otherwise(default_stage)
+
+        return choice.afterwards(), stage_tasks
+
+    def _partitioned_submit(
+        self,
+        state_id: str,
+        job_name: str,
+        size: str,
+        result_path: str,
+        partitioned: bool = False
+    ) -> Tuple[sfn.IChainable, List[tasks.BatchSubmitJob]]:
+        """
+        Submit a partitionable stage as an array job when the execution input
+        asks for at least two partitions, and as a single job otherwise,
+        since Batch rejects array sizes below 2
+        Returns the chainable submission and every task it can submit
+        """
+        if not (partitioned and self.array_size_path):
+            task = self._submit_job(state_id, job_name, size, result_path)
+            return task, [task]
+
+        array_task = self._submit_job(state_id, job_name, size, result_path, partitioned=True)
+        single_task = self._submit_job(f"{state_id}Single", job_name, size, result_path)
+        return self._array_or_single(state_id, array_task, single_task), [array_task, single_task]
+
+    def _array_or_single(
+        self,
+        state_id: str,
+        array_task: sfn.IChainable,
+        single_task: sfn.IChainable
+    ) -> sfn.IChainable:
+        """Choice between the array and single submissions of a partitionable stage"""
+        choice = sfn.Choice(self, f"{state_id}Partitions")
+        choice.when(sfn.Condition.number_greater_than_equals(self.array_size_path, 2), array_task)
+        choice.otherwise(single_task)
+        return choice.afterwards()
+
+    def _memoized(
+        self,
+        stage: str,
+        state_id: str,
+        stage_chain: sfn.IChainable,
+        result_path: str,
+        prefix_field_path: str = "$",
+        size: Optional[str] = None,
+        run_id_path: Optional[str] = None
+    ) -> Tuple[sfn.IChainable, List[sfn.TaskStateBase]]:
+        """
+        Wrap a stage with content-hash memoization: fingerprint its S3 input
+        prefix together with its job definition (of the given size, by default
+        the stage's configured size) and command, skip the stage when the memo
+        table holds the same fingerprint from an earlier successful run,
+        otherwise run it and store the fingerprint with the run id its jobs
+        wrote their outputs under (expiring after ttl_days through the table TTL)
+        The prefix and the optional partition id are read from the configured
+        input fields of the item under prefix_field_path; fingerprints are
+        stored per stage and partition
+        Returns the stage unchanged when the stage is not memoized, plus the
+        memo tasks that need a catch outside a Parallel branch
+        """
+        prefix_field = (self.memoization or {}).get("stages", {}).get(stage)
+        if not prefix_field:
+            return stage_chain, []
+
+        fingerprint_path = f"{result_path}Fingerprint"
+        memo_path = f"{result_path}Memo"
+
+        fingerprint = tasks.LambdaInvoke(
+            self,
+            f"{state_id}Fingerprint",
+            lambda_function=self.fingerprint_function,
+            payload=sfn.TaskInput.from_object({
+                "stage": stage,
+                "prefix": sfn.JsonPath.string_at(f"{prefix_field_path}.{prefix_field}"),
+                "item": sfn.JsonPath.object_at(prefix_field_path),
+                "partition_field": self.memoization.get("partition_field", "partition"),
+                "job_definition": self.job_definitions[size or self.stage_sizes[stage]].ref,
+                "command": sfn.JsonPath.list_at("$.command")
+            }),
+            result_selector={
+                "memo_key.$": "$.Payload.memo_key",
+                "input_hash.$": "$.Payload.input_hash",
+                "object_count.$": "$.Payload.object_count",
+                "expires_at.$": "$.Payload.expires_at"
+            },
+            result_path=fingerprint_path
+        )
+
+        lookup = tasks.DynamoGetItem(
+            self,
+            f"{state_id}MemoLookup",
+            table=self.memo_table,
+            key={
+                "memo_key": tasks.DynamoAttributeValue.from_string(
+                    sfn.JsonPath.string_at(f"{fingerprint_path}.memo_key")
+                )
+            },
+            consistent_read=True,
+            result_path=memo_path
+        )
+
+        record = tasks.DynamoPutItem(
+            self,
+            f"{state_id}MemoRecord",
+            table=self.memo_table,
+            item={
+                "memo_key": tasks.DynamoAttributeValue.from_string(
+                    sfn.JsonPath.string_at(f"{fingerprint_path}.memo_key")
+                ),
+                "input_hash": tasks.DynamoAttributeValue.from_string(
+                    sfn.JsonPath.string_at(f"{fingerprint_path}.input_hash")
+                ),
+                "run_id": tasks.DynamoAttributeValue.from_string(
+                    sfn.JsonPath.string_at(run_id_path or self.run_id_path)
+                ),
+                "expires_at": tasks.DynamoAttributeValue.number_from_string(
+                    sfn.JsonPath.string_at(f"{fingerprint_path}.expires_at")
+                )
+            },
+            result_path=sfn.JsonPath.DISCARD
+        )
+
+        reused = sfn.Pass(
+            self,
+            f"{state_id}Reused",
+            parameters={
+                "memoized": True,
+                "run_id.$": f"{memo_path}.Item.run_id.S"
+            },
+            result_path=result_path
+        )
+
+        # An empty prefix never counts as unchanged input
+        unchanged = sfn.Choice(self, f"{state_id}Unchanged")
+        unchanged.when(
+            sfn.Condition.and_(
+                sfn.Condition.is_present(f"{memo_path}.Item"),
+                sfn.Condition.number_greater_than(f"{fingerprint_path}.object_count", 0),
+                sfn.Condition.string_equals_json_path(
+                    f"{memo_path}.Item.input_hash.S", f"{fingerprint_path}.input_hash"
+                )
+            ),
+            reused
+        )
+        unchanged.otherwise(sfn.Chain.start(stage_chain).next(record))
+
+        fingerprint.next(lookup).next(unchanged)
+        return (
+            sfn.Chain.custom(fingerprint, unchanged.afterwards().end_states, unchanged),
+            [fingerprint, lookup, record]
+        )
+
+    def _checkpointed(
+        self,
+        stage: str,
+        state_id: str,
+        stage_chain: sfn.IChainable,
+        result_path: str
+    ) -> Tuple[sfn.IChainable, List[sfn.TaskStateBase]]:
+        """
+        Wrap a stage with run ledger checks: look up (run_date, stage), skip
+        the stage when it is recorded COMPLETED, otherwise run it and record it
+        Returns the stage unchanged when there is no ledger table, plus the
+        ledger tasks that need a catch outside a Parallel branch
+        """
+        if self.ledger_table is None:
+            return stage_chain, []
+
+        key = {
+            "run_date": tasks.DynamoAttributeValue.from_string(sfn.JsonPath.string_at("$.run_date")),
+            "stage": tasks.DynamoAttributeValue.from_string(stage)
+        }
+        checkpoint_path = f"{result_path}Checkpoint"
+
+        check = tasks.DynamoGetItem(
+            self,
+            f"{state_id}Checkpoint",
+            table=self.ledger_table,
+            key=key,
+            consistent_read=True,
+            result_path=checkpoint_path
+        )
+
+        record = tasks.DynamoPutItem(
+            self,
+            f"{state_id}Record",
+            table=self.ledger_table,
+            item={
+                **key,
+                "status": tasks.DynamoAttributeValue.from_string("COMPLETED"),
+                "run_id": tasks.DynamoAttributeValue.from_string(sfn.JsonPath.string_at(self.run_id_path)),
+                "completed_at": tasks.DynamoAttributeValue.from_string(
+                    sfn.JsonPath.string_at("$$.State.EnteredTime")
+                )
+            },
+            result_path=sfn.JsonPath.DISCARD
+        )
+
+        skipped = sfn.Pass(
+            self,
+            f"{state_id}Skipped",
+            parameters={"skipped": True},
+            result_path=result_path
+        )
+
+        completed = sfn.Choice(self, f"{state_id}Completed")
+        completed.when(
+            sfn.Condition.and_(
+                sfn.Condition.is_present(f"{checkpoint_path}.Item"),
+                sfn.Condition.string_equals(f"{checkpoint_path}.Item.status.S", "COMPLETED"),
+                sfn.Condition.or_(
+                    sfn.Condition.not_(sfn.Condition.is_present("$.rerun")),
+                    sfn.Condition.boolean_equals("$.rerun", False)
+                )
+            ),
+            skipped
+        )
+        completed.otherwise(sfn.Chain.start(stage_chain).next(record))
+
+        check.next(completed)
+        return sfn.Chain.custom(check, completed.afterwards().end_states, completed), [check, record]
+
+    def _queue_arn(self, size: str) -> str:
+        return self.job_queue_arns.get(size, self.default_job_queue_arn)
+
+    def _array_size(self) -> Optional[int]:
+        """Array size token for partitionable stages, or None when array jobs are disabled"""
+        if not self.array_size_path:
+            return None
+        return sfn.JsonPath.number_at(self.array_size_path)
+
+    def _default_array_size(self, pipeline: sfn.IChainable) -> sfn.IChainable:
+        """
+        Default a missing array_size to 1 before the pipeline starts, so the
+        partition Choices and the shard item selector can read it
+        """
+        default = sfn.Pass(
+            self,
+            "DefaultArraySize",
+            result=sfn.Result.from_number(1),
+            result_path=self.array_size_path
+        )
+        choice = sfn.Choice(self, "ArraySizeProvided")
+        choice.when(sfn.Condition.is_present(self.array_size_path), pipeline)
+        choice.otherwise(default.next(pipeline))
+        return choice
+
+    def _container_overrides(
+        self,
+        environment: Optional[dict] = None,
+        partitioned: bool = False,
+        run_id_path: Optional[str] = None
+    ) -> tasks.BatchContainerOverrides:
+        """
+        Container overrides shared by all job submissions
+        SANDERS_RUN_ID identifies the pipeline run (e.g. for its scratch directory),
+        SANDERS_RUN_DATE the date a backfill run covers
+        Array children select their partition with AWS_BATCH_JOB_ARRAY_INDEX
+        out of SANDERS_PARTITION_COUNT partitions
+        """
+        environment = {
+            "SANDERS_RUN_ID": sfn.JsonPath.string_at(run_id_path or self.run_id_path),
+            **(environment or {})
+        }
+        if self.backfill:
+            environment["SANDERS_RUN_DATE"] = sfn.JsonPath.string_at("$.run_date")
+        if partitioned and self.array_size_path:
+            environment["SANDERS_PARTITION_COUNT"] = sfn.JsonPath.format(
+                "{}", sfn.JsonPath.string_at(self.array_size_path)
+            )
+
+        return tasks.BatchContainerOverrides(
+            command=sfn.JsonPath.list_at("$.command"),
+            environment=environment
+        )
+
+    def _sharded_feature_extraction(
+        self,
+        size: str,
+        sharding: dict,
+        max_concurrency: Optional[int],
+        data_bucket: Optional[s3.IBucket]
+    ) -> sfn.DistributedMap:
+        """
+        Fan feature extraction out over customer shards
+        Each shard item is handed to its job as JSON in SANDERS_SHARD, e.g.
+        {"customer_id_start": "0000", "customer_id_end": "4999"} for input
+        manifests or {"Key": "shards/part-0001.json", ...} for S3 listings
+        """
+        manifest = sharding.get("manifest", "input")
+        if manifest not in ("input", "s3"):
+            raise ValueError(f"Unsupported shard manifest '{manifest}', expected 'input' or 's3'")
+        if data_bucket is None:
+            raise ValueError("Sharding requires data_bucket for the per-shard results")
+        if manifest == "s3" and (self.memoization or {}).get("stages", {}).get("feature_extraction"):
+            raise ValueError(
+                "Memoizing sharded feature extraction requires an input shard manifest "
+                "whose items carry the shard's input prefix"
+            )
+
+        def submit_shard(state_id: str, partitioned: bool) -> tasks.BatchSubmitJob:
+            return self._retry_batch_api_errors(FairShareBatchSubmitJob(
+                self,
+                state_id,
+                share_identifier=self.share_identifier,
+                job_name="feature-extraction-shard",
+                job_queue_arn=self._queue_arn(size),
+                job_definition_arn=self.job_definitions[size].ref,
+                array_size=self._array_size() if partitioned else None,
+                container_overrides=self._container_overrides(
+                    environment={
+                        "SANDERS_SHARD": sfn.JsonPath.json_to_string(sfn.JsonPath.object_at("$.shard"))
+                    },
+                    partitioned=partitioned,
+                    run_id_path="$.run_id"
+                ),
+                result_selector={
+                    "JobId.$": "$.JobId",
+                    "JobName.$": "$.JobName",
+                    "Status.$": "$.Status"
+                },
+                result_path="$.job"
+            ))
+
+        if self.array_size_path:
+            shard_job = self._array_or_single(
+                "FeatureExtractionShardJob",
+                submit_shard("FeatureExtractionShardJob", partitioned=True),
+                submit_shard("FeatureExtractionShardJobSingle", partitioned=False)
+            )
+        else:
+            shard_job = submit_shard("FeatureExtractionShardJob", partitioned=False)
+
+        # Shards run as child executions, so the parent's run id is passed down explicitly
+        item_selector = {
+            "command.$": "$.command",
+            "shard.$": "$$.Map.Item.Value",
+            "run_id.$": self.run_id_path
+        }
+        if self.array_size_path:
+            item_selector["array_size.$"] = self.array_size_path
+        if self.backfill:
+            item_selector["run_date.$"] = "$.run_date"
+
+        if manifest == "s3":
+            items = dict(item_reader=sfn.S3ObjectsItemReader(
+                bucket=data_bucket,
+                prefix=sharding.get("manifest_prefix", "shards/")
+            ))
+        else:
+            items = dict(items_path=sharding.get("items_path", "$.shards"))
+
+        # Per-shard results grow with the manifest and can exceed the state payload limit,
+        # so they are written to S3 and $.featureJob holds the result manifest location
+        shard_map = sfn.DistributedMap(
+            self,
+            "FeatureExtractionShards",
+            item_selector=item_selector,
+            max_concurrency=max_concurrency,
+            result_writer=sfn.ResultWriter(
+                bucket=data_bucket,
+                prefix=sharding.get("results_prefix", "shard-results/")
+            ),
+            result_path="$.featureJob",
+            **items
+        )
+
+        # Memoized shards read their partition id and input prefix from the shard item, e.g.
+        # {"partition": "shard=0000", "input_prefix": "raw/2026-02-07/shard=0000/"}
+        shard_chain, _ = self._memoized(
+            "feature_extraction", "FeatureExtractionShard", shard_job, "$.job",
+            prefix_field_path="$.shard", size=size, run_id_path="$.run_id"
+        )
+        shard_map.item_processor(shard_chain)
+        return shard_map
+
+    def _backfill_dates(
+        self,
+        pipeline: sfn.IChainable,
+        environment: str,
+        max_concurrency: Optional[int],
+        data_bucket: s3.IBucket
+    ) -> sfn.IChainable:
+        """
+        Run the pipeline once per date from start_date to end_date as child
+        executions of a Distributed Map, at most max_concurrency dates at once
+        Per-date outputs are written to S3 so long ranges stay under the
+        state payload limit
+        """
+        dates_function = BackfillDatesFunction(
+            self,
+            "BackfillDatesFunction",
+            environment=environment,
+            max_dates=self.backfill.get("max_dates", 366)
+        )
+
+        backfill_fail = sfn.Fail(
+            self,
+            "BackfillFailState",
+            cause="Backfill failed",
+            error="BackfillFailed"
+        )
+
+        expand_dates = tasks.LambdaInvoke(
+            self,
+            "BackfillDates",
+            lambda_function=dates_function.function,
+            payload=sfn.TaskInput.from_object({
+                "input": sfn.JsonPath.entire_payload,
+                "execution": sfn.JsonPath.string_at("$$.Execution.Name")
+            }),
+            result_selector={"runs.$": "$.Payload.runs"},
+            result_path="$.backfill"
+        )
+
+        date_map = sfn.DistributedMap(
+            self,
+            "BackfillRuns",
+            items_path="$.backfill.runs",
+            max_concurrency=max_concurrency,
+            tolerated_failure_percentage=self.backfill.get("tolerated_failure_percentage", 0),
+            result_writer=sfn.ResultWriter(
+                bucket=data_bucket,
+                prefix=self.backfill.get("results_prefix", "backfill-results/")
+            ),
+            result_path="$.backfillResults"
+        )
+        date_map.item_processor(pipeline)
+
+        for task in (expand_dates, date_map):
+            task.add_catch(backfill_fail, result_path="$.error")
+
+        return expand_dates.next(date_map).next(
+            sfn.Succeed(self, "BackfillSucceeded", comment="Every date in the range completed")
+        )
+
     @property
     def state_machine_arn(self) -> str:
         return self.state_machine.state_machine_arn
@@ -1,8 +1,31 @@
+import os
+
 from aws_cdk import (
     aws_ec2 as ec2,
+    aws_efs as efs,
+    aws_events as events,
+    aws_events_targets as targets,
+    aws_lambda as lambda_,
+    aws_logs as logs,
+    Duration,
+    RemovalPolicy,
     Tags
 )
 from constructs import Construct
+from typing import List, Optional
+
+
+SCRATCH_SWEEPER_CODE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "lambda", "scratch_sweeper")
+
+
+# Interface endpoint names accepted in configuration
+INTERFACE_ENDPOINT_SERVICES = {
+    "ecr.api": ec2.InterfaceVpcEndpointAwsService.ECR,
+    "ecr.dkr": ec2.InterfaceVpcEndpointAwsService.ECR_DOCKER,
+    "logs": ec2.InterfaceVpcEndpointAwsService.CLOUDWATCH_LOGS,
+    "sts": ec2.InterfaceVpcEndpointAwsService.STS,
+    "batch": ec2.InterfaceVpcEndpointAwsService.BATCH
+}
 
 
 class VPCNetwork(Construct):
@@ -16,6 +39,10 @@ class VPCNetwork(Construct):
         scope: Construct,
         construct_id: str,
         environment: str,
+        gateway_endpoints: bool = True,
+        interface_endpoints: Optional[List[str]] = None,
+        scratch_filesystem: bool = False,
+        scratch_retention_days: int = 3,
         **kwargs
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
@@ -53,6 +80,108 @@ class VPCNetwork(Construct):
             allow_all_outbound=True
         )
 
+        # Gateway endpoints keep S3 and DynamoDB traffic off the NAT gateway (no hourly or per-GB charge)
+        if gateway_endpoints:
+            self.vpc.add_gateway_endpoint(
+                "S3Endpoint",
+                service=ec2.GatewayVpcEndpointAwsService.S3,
+                subnets=[ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS)]
+            )
+            self.vpc.add_gateway_endpoint(
+                "DynamoDBEndpoint",
+                service=ec2.GatewayVpcEndpointAwsService.DYNAMODB,
+                subnets=[ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS)]
+            )
+
+        # Interface endpoints for image pulls, logs and AWS APIs called from the private subnets
+        self.interface_endpoints = {}
+        for name in interface_endpoints or []:
+            if name not in INTERFACE_ENDPOINT_SERVICES:
+                raise ValueError(
+                    f"Unknown interface endpoint '{name}', expected one of {sorted(INTERFACE_ENDPOINT_SERVICES)}"
+                )
+            self.interface_endpoints[name] = self.vpc.add_interface_endpoint(
+                f"{name.replace('.', '-').title().replace('-', '')}Endpoint",
+                service=INTERFACE_ENDPOINT_SERVICES[name],
+                subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+                private_dns_enabled=True
+            )
+
+        # Shared scratch file system for passing intermediate artifacts between pipeline stages
+        # Holds only reproducible data, so it is always destroyed with the stack
+        self.scratch_file_system = None
+        self.scratch_access_point = None
+        self.scratch_sweeper = None
+        if scratch_filesystem:
+            # Runs last at most a day (the execution timeout), so an idle run directory is finished
+            if scratch_retention_days < 2:
+                raise ValueError("scratch_retention_days must be at least 2 to outlast a running execution")
+            self.scratch_file_system = efs.FileSystem(
+                self,
+                f"ScratchFileSystem",
+                vpc=self.vpc,
+                file_system_name=f"sanders-scratch-{environment}",
+                vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+                throughput_mode=efs.ThroughputMode.ELASTIC,
+                performance_mode=efs.PerformanceMode.GENERAL_PURPOSE,
+                encrypted=True,
+                # Cheaper storage tier for files not read for a week; this only moves them,
+                # deletion is the scratch sweeper's job
+                lifecycle_policy=efs.LifecyclePolicy.AFTER_7_DAYS,
+                removal_policy=RemovalPolicy.DESTROY
+            )
+            self.scratch_file_system.connections.allow_default_port_from(
+                self.batch_security_group,
+                "NFS from Batch jobs"
+            )
+
+            # Jobs write under /scratch/<run id>/ so concurrent executions do not collide
+            self.scratch_access_point = self.scratch_file_system.add_access_point(
+                f"ScratchAccessPoint",
+                path="/scratch",
+                posix_user=efs.PosixUser(uid="1000", gid="1000"),
+                create_acl=efs.Acl(owner_uid="1000", owner_gid="1000", permissions="770")
+            )
+
+            # Nightly sweep deleting run directories idle for scratch_retention_days
+            self.scratch_sweeper = lambda_.Function(
+                self,
+                f"ScratchSweeper",
+                function_name=f"sanders-scratch-sweeper-{environment}",
+                runtime=lambda_.Runtime.PYTHON_3_12,
+                handler="index.handler",
+                code=lambda_.Code.from_asset(SCRATCH_SWEEPER_CODE_DIR),
+                timeout=Duration.minutes(15),
+                memory_size=256,
+                vpc=self.vpc,
+                vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+                filesystem=lambda_.FileSystem.from_efs_access_point(self.scratch_access_point, "/mnt/scratch"),
+                log_group=logs.LogGroup(
+                    self,
+                    f"ScratchSweeperLogGroup",
+                    log_group_name=f"/aws/lambda/sanders-scratch-sweeper-{environment}",
+                    retention=logs.RetentionDays.ONE_MONTH,
+                    removal_policy=RemovalPolicy.DESTROY
+                ),
+                environment={
+                    "SCRATCH_DIR": "/mnt/scratch",
+                    "RETENTION_DAYS": str(scratch_retention_days)
+                }
+            )
+            events.Rule(
+                self,
+                f"ScratchSweeperSchedule",
+                rule_name=f"sanders-scratch-sweeper-{environment}",
+                description="Deletes idle run directories from the scratch file system",
+                schedule=events.Schedule.cron(minute="0", hour="3"),
+                targets=[targets.LambdaFunction(self.scratch_sweeper, retry_attempts=2)]
+            )
+
+            Tags.of(self.scratch_file_system).add("Environment", environment)
+            Tags.of(self.scratch_file_system).add("Service", "sanders-customer-platform")
+            Tags.of(self.scratch_sweeper).add("Environment", environment)
+            Tags.of(self.scratch_sweeper).add("Service", "sanders-customer-platform")
+
         # Add tags
         Tags.of(self.vpc).add("Environment", environment)
         Tags.of(self.vpc).add("Service", "sanders-customer-platform")
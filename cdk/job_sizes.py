@@ -0,0 +1,202 @@
+"""
+Job size catalog for Sanders Customer Platform Batch jobs
+Sizes come from the `job_sizes` entry of the environment configuration and
+are validated at synth time so an illegal Fargate combination never reaches
+CloudFormation
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+
+# Legal Fargate memory values (MiB) for each vCPU value
+FARGATE_MEMORY_BY_CPU = {
+    "0.25": [512, 1024, 2048],
+    "0.5": list(range(1024, 4096 + 1, 1024)),
+    "1": list(range(2048, 8192 + 1, 1024)),
+    "2": list(range(4096, 16384 + 1, 1024)),
+    "4": list(range(8192, 30720 + 1, 1024)),
+    "8": list(range(16384, 61440 + 1, 4096)),
+    "16": list(range(32768, 122880 + 1, 8192)),
+}
+
+PLATFORMS = ("FARGATE", "EC2")
+
+# Fargate runtime platforms; ARM64 runs on Graviton
+CPU_ARCHITECTURES = ("X86_64", "ARM64")
+
+# Fargate ephemeral storage range (GiB); 20 GiB is included free when unset
+FARGATE_EPHEMERAL_STORAGE_GIB = (21, 200)
+
+# Attempt duration for sizes that do not set timeout_minutes; Batch's minimum is 60 seconds
+DEFAULT_TIMEOUT_MINUTES = 120
+
+# Catalog used when the environment configuration does not provide one
+DEFAULT_JOB_SIZES = {
+    "2g": {"cpu": "0.5", "memory": "2048", "timeout_minutes": 60},     # 2GB, 0.5 vCPU
+    "8g": {"cpu": "2", "memory": "8192", "ephemeral_storage": 50, "timeout_minutes": 120},      # 8GB, 2 vCPU, 50 GiB disk
+    "16g": {"cpu": "4", "memory": "16384", "ephemeral_storage": 100, "timeout_minutes": 240}    # 16GB, 4 vCPU, 100 GiB disk
+}
+
+# Sizes added to the catalog when the NVMe instance store tier is enabled (batch.ec2_nvme_max_vcpus);
+# 16 vCPU / ~117 GiB fits a memory-optimized 4xlarge (r6id, r5d) after the ECS agent's reservation
+DEFAULT_INSTANCE_STORAGE_JOB_SIZES = {
+    "training-nvme": {"cpu": "16", "memory": "120000", "platform": "EC2", "instance_storage": True,
+                      "timeout_minutes": 480}
+}
+
+# Job size each pipeline stage runs with when the configuration does not say
+DEFAULT_STAGE_SIZES = {
+    "feature_extraction": "8g",
+    "data_processing": "2g",
+    "model_training": "16g"
+}
+
+_SIZE_NAME = re.compile(r"^[a-z0-9][a-z0-9-]*$")
+
+
+@dataclass(frozen=True)
+class TmpfsMount:
+    """A memory-backed mount inside the container (EC2 only)"""
+    container_path: str
+    size: int
+    mount_options: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class JobSize:
+    """A validated vCPU/memory combination for one Batch job definition"""
+    name: str
+    cpu: str
+    memory: str
+    platform: str = "FARGATE"
+    cpu_architecture: str = "X86_64"                # Fargate only; EC2 follows the instance types
+    ephemeral_storage: Optional[int] = None         # GiB of task storage (Fargate only)
+    shared_memory_size: Optional[int] = None        # MiB for /dev/shm (EC2 only)
+    tmpfs: Tuple[TmpfsMount, ...] = ()              # EC2 only
+    instance_storage: bool = False                  # Mount the host's NVMe instance store (EC2 only)
+    timeout_minutes: int = DEFAULT_TIMEOUT_MINUTES  # Per-attempt limit; Batch terminates the job after it
+
+    @property
+    def vcpus(self) -> float:
+        return float(self.cpu)
+
+    @property
+    def memory_mib(self) -> int:
+        return int(self.memory)
+
+
+def _validate(size: JobSize) -> None:
+    if not _SIZE_NAME.match(size.name):
+        raise ValueError(
+            f"Job size name '{size.name}' must be lowercase letters, digits and dashes"
+        )
+    if size.platform not in PLATFORMS:
+        raise ValueError(
+            f"Job size '{size.name}' has unknown platform '{size.platform}', expected one of {PLATFORMS}"
+        )
+
+    if not isinstance(size.timeout_minutes, int) or size.timeout_minutes < 1:
+        raise ValueError(
+            f"Job size '{size.name}' has timeout_minutes {size.timeout_minutes!r}, expected a whole number >= 1"
+        )
+
+    if size.cpu_architecture not in CPU_ARCHITECTURES:
+        raise ValueError(
+            f"Job size '{size.name}' has unknown cpu_architecture '{size.cpu_architecture}', "
+            f"expected one of {CPU_ARCHITECTURES}"
+        )
+
+    if size.platform == "FARGATE":
+        legal_memory = FARGATE_MEMORY_BY_CPU.get(size.cpu)
+        if legal_memory is None:
+            raise ValueError(
+                f"Job size '{size.name}' has cpu {size.cpu}, Fargate supports {list(FARGATE_MEMORY_BY_CPU)}"
+            )
+        if not size.memory.isdigit() or int(size.memory) not in legal_memory:
+            raise ValueError(
+                f"Job size '{size.name}' has memory {size.memory} MiB, Fargate supports "
+                f"{legal_memory[0]}-{legal_memory[-1]} MiB in steps of "
+                f"{legal_memory[1] - legal_memory[0]} MiB for {size.cpu} vCPU"
+            )
+        # Batch does not apply linux_parameters shared memory or tmpfs on Fargate
+        if size.shared_memory_size is not None or size.tmpfs:
+            raise ValueError(
+                f"Job size '{size.name}' sets shared memory or tmpfs, which Batch only supports on EC2; "
+                f"use ephemeral_storage on Fargate"
+            )
+        if size.instance_storage:
+            raise ValueError(
+                f"Job size '{size.name}' sets instance_storage, which needs an EC2 host; "
+                f"add \"platform\": \"EC2\""
+            )
+        if size.ephemeral_storage is not None:
+            low, high = FARGATE_EPHEMERAL_STORAGE_GIB
+            if not low <= size.ephemeral_storage <= high:
+                raise ValueError(
+                    f"Job size '{size.name}' has ephemeral_storage {size.ephemeral_storage} GiB, "
+                    f"Fargate supports {low}-{high} GiB"
+                )
+    else:
+        if size.cpu_architecture != "X86_64":
+            raise ValueError(
+                f"Job size '{size.name}' sets cpu_architecture, which only applies on Fargate; "
+                f"EC2 jobs run on the architecture of the compute environment's instance types"
+            )
+        if size.ephemeral_storage is not None:
+            raise ValueError(
+                f"Job size '{size.name}' sets ephemeral_storage, which only applies on Fargate"
+            )
+        reserved_mib = (size.shared_memory_size or 0) + sum(mount.size for mount in size.tmpfs)
+        if size.memory.isdigit() and reserved_mib >= int(size.memory):
+            raise ValueError(
+                f"Job size '{size.name}' reserves {reserved_mib} MiB for shared memory and tmpfs, "
+                f"more than its {size.memory} MiB of memory"
+            )
+        if not size.cpu.isdigit() or int(size.cpu) < 1:
+            raise ValueError(f"Job size '{size.name}' must request a whole number of vCPUs on EC2")
+        if not size.memory.isdigit() or int(size.memory) < 4:
+            raise ValueError(f"Job size '{size.name}' must request at least 4 MiB of memory on EC2")
+
+
+def parse_job_sizes(catalog: Dict[str, Optional[dict]]) -> Dict[str, JobSize]:
+    """
+    Build the validated job size map from a catalog such as
+    {"8g": {"cpu": "2", "memory": "8192", "ephemeral_storage": 50, "cpu_architecture": "ARM64",
+            "timeout_minutes": 90},
+     "r16": {"cpu": "4", "memory": "30000", "platform": "EC2",
+             "linux_parameters": {"shared_memory_size": 2048,
+                                  "tmpfs": [{"container_path": "/shuffle", "size": 8192}]}},
+     "r32-nvme": {"cpu": "8", "memory": "60000", "platform": "EC2", "instance_storage": true}}
+    Entries set to null (e.g. in cdk.json context) drop a default size
+    """
+    job_sizes = {}
+    for name, entry in catalog.items():
+        if entry is None:
+            continue
+        linux_parameters = entry.get("linux_parameters") or {}
+        size = JobSize(
+            name=name,
+            cpu=str(entry["cpu"]),
+            memory=str(entry["memory"]),
+            platform=entry.get("platform", "FARGATE"),
+            cpu_architecture=entry.get("cpu_architecture", "X86_64"),
+            ephemeral_storage=entry.get("ephemeral_storage"),
+            timeout_minutes=entry.get("timeout_minutes", DEFAULT_TIMEOUT_MINUTES),
+            instance_storage=bool(entry.get("instance_storage", False)),
+            shared_memory_size=linux_parameters.get("shared_memory_size"),
+            tmpfs=tuple(
+                TmpfsMount(
+                    container_path=mount["container_path"],
+                    size=int(mount["size"]),
+                    mount_options=tuple(mount.get("mount_options", ()))
+                )
+                for mount in linux_parameters.get("tmpfs", [])
+            )
+        )
+        _validate(size)
+        job_sizes[name] = size
+
+    if not job_sizes:
+        raise ValueError("The job size catalog must define at least one size")
+    return job_sizes
@@ -0,0 +1,42 @@
+"""
+Expand a backfill request into one pipeline input per date
+Event: {"input": {"start_date": "2026-01-01", "end_date": "2026-01-31",
+                  "command": [...], "input_prefix": "raw/{run_date}/"},
+        "execution": "<backfill execution name>"}
+Every run gets the remaining input fields, with "{run_date}" in top-level
+string values and in string list items (e.g. command arguments) replaced
+by its date, plus run_date and a run_id that includes the date
+"""
+import datetime
+import os
+
+
+def _substitute(value, run_date):
+    if isinstance(value, str):
+        return value.replace("{run_date}", run_date)
+    if isinstance(value, list):
+        return [_substitute(item, run_date) if isinstance(item, str) else item for item in value]
+    return value
+
+
+def handler(event, context):
+    max_dates = int(os.environ.get("MAX_DATES", "366"))
+    request = dict(event["input"])
+    start = datetime.date.fromisoformat(request.pop("start_date"))
+    end = datetime.date.fromisoformat(request.pop("end_date"))
+    if end < start:
+        raise ValueError(f"end_date {end} is before start_date {start}")
+
+    day_count = (end - start).days + 1
+    if day_count > max_dates:
+        raise ValueError(f"Backfill covers {day_count} dates, more than the limit of {max_dates}")
+
+    runs = []
+    for offset in range(day_count):
+        run_date = (start + datetime.timedelta(days=offset)).isoformat()
+        run = {key: _substitute(value, run_date) for key, value in request.items()}
+        run["run_date"] = run_date
+        run["run_id"] = f"{event['execution']}-{run_date}"
+        runs.append(run)
+
+    return {"runs": runs}
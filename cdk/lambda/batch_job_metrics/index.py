@@ -0,0 +1,66 @@
+"""
+Turn Batch job state change events into CloudWatch metrics
+Prints CloudWatch embedded metric format (EMF) records, so the metrics are
+extracted from this function's log group without PutMetricData calls:
+- JobStateTransitions (Count) per queue and status
+- SubmitToStartSeconds, created to started (SUBMITTED through RUNNABLE and STARTING),
+  per queue and per job name, once a job is RUNNING
+- RunSeconds, started to stopped, per job name for top-level jobs that finished
+Array children only report submit-to-start; their parent's run time covers the stage
+Event: EventBridge "Batch Job State Change" with the job in "detail"
+"""
+import json
+import os
+import time
+
+
+NAMESPACE = "Sanders/Pipeline"
+
+
+def _name(arn):
+    # arn:aws:batch:<region>:<account>:job-queue/<name> or job-definition/<name>:<revision>
+    return arn.rsplit("/", 1)[-1].split(":", 1)[0]
+
+
+def _emit(dimensions, metrics, units):
+    print(json.dumps({
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": NAMESPACE,
+                "Dimensions": [list(dimensions)],
+                "Metrics": [{"Name": name, "Unit": units[name]} for name in metrics]
+            }]
+        },
+        **dimensions,
+        **metrics
+    }))
+
+
+def handler(event, context):
+    environment = os.environ["ENVIRONMENT"]
+    job = event["detail"]
+    status = job["status"]
+    queue = _name(job["jobQueue"])
+    job_name = job["jobName"]
+    is_array_child = "index" in (job.get("arrayProperties") or {})
+
+    _emit({"Environment": environment, "JobQueue": queue, "Status": status},
+          {"JobStateTransitions": 1}, {"JobStateTransitions": "Count"})
+
+    created_at = job.get("createdAt")
+    started_at = job.get("startedAt")
+    stopped_at = job.get("stoppedAt")
+
+    if status == "RUNNING" and created_at and started_at:
+        wait = max(0, started_at - created_at) / 1000
+        _emit({"Environment": environment, "JobQueue": queue},
+              {"SubmitToStartSeconds": wait}, {"SubmitToStartSeconds": "Seconds"})
+        _emit({"Environment": environment, "JobName": job_name},
+              {"SubmitToStartSeconds": wait}, {"SubmitToStartSeconds": "Seconds"})
+
+    if status in ("SUCCEEDED", "FAILED") and started_at and stopped_at and not is_array_child:
+        _emit({"Environment": environment, "JobName": job_name},
+              {"RunSeconds": max(0, stopped_at - started_at) / 1000}, {"RunSeconds": "Seconds"})
+
+    return {"queue": queue, "job_name": job_name, "status": status}
@@ -0,0 +1,51 @@
+"""
+Report how long the oldest running pipeline execution has been running
+Step Functions only publishes ExecutionTime once an execution ends, so a hung
+run stays invisible to it; this function runs on a schedule and prints a
+CloudWatch embedded metric format (EMF) record instead:
+- OldestRunningExecutionMinutes per state machine, 0 when nothing is running
+Event: EventBridge scheduled event (ignored)
+"""
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import boto3
+
+
+NAMESPACE = "Sanders/Pipeline"
+
+stepfunctions = boto3.client("stepfunctions")
+
+
+def handler(event, context):
+    state_machine_arn = os.environ["STATE_MACHINE_ARN"]
+    state_machine = state_machine_arn.rsplit(":", 1)[-1]
+    now = datetime.now(timezone.utc)
+
+    oldest = None
+    paginator = stepfunctions.get_paginator("list_executions")
+    for page in paginator.paginate(stateMachineArn=state_machine_arn, statusFilter="RUNNING"):
+        for execution in page["executions"]:
+            if oldest is None or execution["startDate"] < oldest["startDate"]:
+                oldest = execution
+
+    minutes = (now - oldest["startDate"]).total_seconds() / 60 if oldest else 0
+
+    dimensions = {"Environment": os.environ["ENVIRONMENT"], "StateMachine": state_machine}
+    print(json.dumps({
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": NAMESPACE,
+                "Dimensions": [list(dimensions)],
+                "Metrics": [{"Name": "OldestRunningExecutionMinutes", "Unit": "None"}]
+            }]
+        },
+        **dimensions,
+        "OldestRunningExecutionMinutes": minutes,
+        "OldestRunningExecution": oldest["name"] if oldest else None
+    }))
+
+    return {"state_machine": state_machine, "oldest_running_minutes": minutes}
@@ -0,0 +1,51 @@
+"""
+Fingerprint an S3 input prefix for stage memoization
+Hashes the job definition and command that would process the input, then
+the key (relative to the prefix), ETag and size of every object under it;
+listing order is lexicographic, so the hash is stable. The memo key names
+the stage and the item's partition, not the prefix, so a dated prefix
+(raw/2026-02-08/shard=0000/) holding the same objects as the day before
+matches the earlier run. Returns the memo key and expiry the workflow
+stores next to the hash
+Event: {"stage": "feature_extraction", "prefix": "raw/2026-02-07/shard=0000/",
+        "item": {"partition": "shard=0000", ...}, "partition_field": "partition",
+        "job_definition": "<job definition ARN>", "command": [...]}
+"""
+import hashlib
+import json
+import os
+import time
+
+import boto3
+
+
+s3 = boto3.client("s3")
+
+
+def handler(event, context):
+    bucket = os.environ["BUCKET_NAME"]
+    ttl_seconds = int(os.environ.get("MEMO_TTL_DAYS", "7")) * 86400
+    stage = event["stage"]
+    prefix = event["prefix"]
+    partition = (event.get("item") or {}).get(event.get("partition_field", "partition"))
+
+    # A new image (new job definition revision) or command invalidates earlier outputs
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        {"job_definition": event.get("job_definition"), "command": event.get("command")}, sort_keys=True
+    ).encode() + b"\n")
+
+    object_count = 0
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            relative_key = obj["Key"][len(prefix):]
+            digest.update(f"{relative_key}\0{obj['ETag']}\0{obj['Size']}\n".encode())
+            object_count += 1
+
+    return {
+        "memo_key": f"{stage}#{partition}" if partition is not None else stage,
+        "input_hash": digest.hexdigest(),
+        "object_count": object_count,
+        "expires_at": str(int(time.time()) + ttl_seconds)
+    }
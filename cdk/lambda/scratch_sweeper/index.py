@@ -0,0 +1,43 @@
+"""
+Delete run directories from the shared scratch file system once they go idle
+Jobs write under <scratch>/<SANDERS_RUN_ID>/; a run directory whose newest
+file is older than RETENTION_DAYS belongs to a finished (or abandoned) run
+and is removed, so the volume does not grow without bound
+Event: EventBridge scheduled event (ignored)
+"""
+import os
+import shutil
+import time
+
+
+def _modified_since(path, cutoff):
+    """True when the directory or anything below it was modified after cutoff"""
+    if os.lstat(path).st_mtime > cutoff:
+        return True
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            try:
+                if os.lstat(os.path.join(root, name)).st_mtime > cutoff:
+                    return True
+            except FileNotFoundError:
+                continue
+    return False
+
+
+def handler(event, context):
+    scratch_dir = os.environ["SCRATCH_DIR"]
+    cutoff = time.time() - float(os.environ["RETENTION_DAYS"]) * 86400
+
+    removed = []
+    kept = 0
+    for entry in os.scandir(scratch_dir):
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        if _modified_since(entry.path, cutoff):
+            kept += 1
+            continue
+        shutil.rmtree(entry.path, ignore_errors=True)
+        removed.append(entry.name)
+
+    print(f"Removed {len(removed)} idle run directories, kept {kept}: {removed}")
+    return {"removed": removed, "kept": kept}
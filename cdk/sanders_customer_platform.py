@@ -0,0 +1,56 @@
+"""
+Composition of the Sanders Customer Platform stacks for one environment
+Network -> Data -> Compute, wired with explicit cross-stack references so
+each stack can be diffed and deployed on its own (e.g. `cdk deploy
+SandersComputeStack-dev`) or all together with `cdk deploy --all --concurrency 3`
+"""
+from typing import Optional
+
+import aws_cdk as cdk
+from constructs import Construct
+from cdk.stacks.network_stack import NetworkStack
+from cdk.stacks.data_stack import DataStack
+from cdk.stacks.compute_stack import ComputeStack
+
+
+class SandersCustomerPlatform:
+    """
+    Creates the network, data and compute stacks for an environment
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        environment: str,
+        env: Optional[cdk.Environment] = None
+    ) -> None:
+        self.network = NetworkStack(
+            scope,
+            f"SandersNetworkStack-{environment}",
+            environment=environment,
+            env=env,
+            description=f"Sanders Customer Platform Network - {environment}"
+        )
+
+        self.data = DataStack(
+            scope,
+            f"SandersDataStack-{environment}",
+            environment=environment,
+            vpc_network=self.network.vpc_network,
+            env=env,
+            description=f"Sanders Customer Platform Data - {environment}"
+        )
+
+        self.compute = ComputeStack(
+            scope,
+            f"SandersComputeStack-{environment}",
+            environment=environment,
+            network=self.network,
+            data=self.data,
+            env=env,
+            description=f"Sanders Customer Platform Compute - {environment}"
+        )
+
+    @property
+    def stacks(self) -> list:
+        return [self.network, self.data, self.compute]
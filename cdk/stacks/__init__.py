@@ -0,0 +1 @@
+# Stacks Package
@@ -0,0 +1,282 @@
+from aws_cdk import (
+    Stack,
+    CfnOutput,
+    Tags
+)
+from constructs import Construct
+from cdk.config import load_environment_config
+from cdk.job_sizes import DEFAULT_INSTANCE_STORAGE_JOB_SIZES, DEFAULT_STAGE_SIZES, parse_job_sizes
+from cdk.constructs.batch_iam_roles import BatchIAMRoles
+from cdk.constructs.batch_environment import BatchEnvironment
+from cdk.constructs.input_fingerprint import InputFingerprintFunction
+from cdk.constructs.pipeline_observability import PipelineObservability
+from cdk.constructs.stepfunctions_statemachine import StepFunctionsStateMachine
+from cdk.stacks.network_stack import NetworkStack
+from cdk.stacks.data_stack import DataStack
+
+
+class ComputeStack(Stack):
+    """
+    Compute stack for Sanders Customer Platform Infrastructure
+    IAM roles, Batch compute environments, queues, job definitions and the
+    Step Functions workflow; the stack that changes most often, so workflow
+    changes deploy without touching the network or data stacks
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        environment: str,
+        network: NetworkStack,
+        data: DataStack,
+        **kwargs
+    ) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        config = load_environment_config(self, environment)
+
+        # Add stack-level tags
+        Tags.of(self).add("Project", "sanders-customer-platform")
+        Tags.of(self).add("Environment", environment)
+        Tags.of(self).add("ManagedBy", "CDK")
+
+        vpc_network = network.vpc_network
+        dynamodb_table = data.dynamodb_table
+        features_table_pointer = data.features_table_pointer
+
+        # 1. Create IAM Roles for Batch
+        batch_iam_roles = BatchIAMRoles(
+            self,
+            "BatchIAMRoles",
+            s3_bucket_arn=data.s3_bucket.bucket_arn,
+            dynamodb_table_arn=dynamodb_table.table_arn,
+            environment=environment,
+            enable_ec2_instance_role=(
+                config["batch"]["ec2_spot_max_vcpus"] > 0 or config["batch"]["ec2_nvme_max_vcpus"] > 0
+            ),
+            dax_cluster_arn=data.dax_cluster.cluster_arn if data.dax_cluster else None,
+            imported_tables_arn=f"{dynamodb_table.table_arn}_*" if features_table_pointer else None,
+            features_table_pointer_arn=features_table_pointer.parameter_arn if features_table_pointer else None,
+            scratch_file_system_arn=(
+                vpc_network.scratch_file_system.file_system_arn if vpc_network.scratch_file_system else None
+            ),
+            scratch_access_point_arn=(
+                vpc_network.scratch_access_point.access_point_arn if vpc_network.scratch_access_point else None
+            )
+        )
+
+        # The NVMe tier brings its training size unless the catalog overrides or drops it
+        job_sizes = config["job_sizes"]
+        if config["batch"]["ec2_nvme_max_vcpus"] > 0:
+            job_sizes = {**DEFAULT_INSTANCE_STORAGE_JOB_SIZES, **job_sizes}
+
+        # 2. Create Batch Environment, Queue, and Job Definitions
+        self.batch_environment = BatchEnvironment(
+            self,
+            "BatchEnvironment",
+            vpc=vpc_network.vpc,
+            security_group=vpc_network.batch_security_group,
+            batch_service_role_arn=batch_iam_roles.service_role_arn,
+            ecs_task_execution_role_arn=batch_iam_roles.task_execution_role_arn,
+            batch_job_role_arn=batch_iam_roles.job_role_arn,
+            ecr_repository_uri=data.ecr_repository.repository_uri,
+            environment=environment,
+            max_vcpus=config["batch"]["max_vcpus"],
+            fargate_spot_max_vcpus=config["batch"]["fargate_spot_max_vcpus"],
+            ec2_spot_max_vcpus=config["batch"]["ec2_spot_max_vcpus"],
+            ec2_spot_instance_types=config["batch"]["ec2_spot_instance_types"],
+            ec2_instance_profile_arn=batch_iam_roles.instance_profile_arn,
+            ec2_nvme_max_vcpus=config["batch"]["ec2_nvme_max_vcpus"],
+            ec2_nvme_instance_types=config["batch"]["ec2_nvme_instance_types"],
+            job_sizes=parse_job_sizes(job_sizes),
+            job_environment={
+                f"SANDERS_GSI_SHARDS_{index_name.upper().replace('-', '_')}": str(shard_count)
+                for index_name, shard_count in dynamodb_table.shard_counts.items()
+            },
+            scratch_file_system_id=(
+                vpc_network.scratch_file_system.file_system_id if vpc_network.scratch_file_system else None
+            ),
+            scratch_access_point_id=(
+                vpc_network.scratch_access_point.access_point_id if vpc_network.scratch_access_point else None
+            ),
+            image_tag=self.node.try_get_context("image_tag") or config["image"]["tag"],
+            image_digest=self.node.try_get_context("image_digest") or config["image"]["digest"],
+            fair_share=config["fair_share"],
+            logging=config["logging"]
+        )
+        batch_environment = self.batch_environment
+
+        # With fair share each workflow tags its jobs with its own share identifier
+        fair_share = config["fair_share"]
+        pipeline_share = None
+        backfill_share = None
+        if fair_share["enabled"]:
+            pipeline_share = fair_share["pipeline_share"]
+            backfill_share = fair_share["backfill_share"] if config["backfill"]["enabled"] else None
+            for share_identifier in filter(None, (pipeline_share, backfill_share)):
+                if share_identifier not in fair_share["shares"]:
+                    raise ValueError(
+                        f"Share '{share_identifier}' is not one of the fair-share identifiers "
+                        f"{sorted(fair_share['shares'])}"
+                    )
+
+        # 3. Input fingerprint Lambda for memoized stages
+        fingerprint_function = None
+        if config["memoization"]["enabled"]:
+            fingerprint_function = InputFingerprintFunction(
+                self,
+                "InputFingerprint",
+                bucket=data.s3_bucket.bucket,
+                environment=environment,
+                ttl_days=config["memoization"]["ttl_days"]
+            ).function
+
+        # In sharded array runs each shard fans out into array_size children, so the shards
+        # that run at once are planned for shard_array_size children each
+        shard_max_concurrency = batch_environment.max_concurrent_jobs(config["stage_sizes"]["feature_extraction"])
+        if config["array_jobs"]["enabled"]:
+            shard_array_size = config["array_jobs"]["shard_array_size"]
+            if not 2 <= shard_array_size <= 10000:
+                raise ValueError(f"array_jobs.shard_array_size must be between 2 and 10000, got {shard_array_size}")
+            shard_max_concurrency = max(1, shard_max_concurrency // shard_array_size)
+
+        # Pipeline definition shared by the daily orchestrator and the backfill workflow
+        pipeline = dict(
+            job_definitions=batch_environment.job_definitions,
+            environment=environment,
+            sharding=config["sharding"],
+            shard_max_concurrency=shard_max_concurrency,
+            data_bucket=data.s3_bucket.bucket,
+            array_jobs=config["array_jobs"],
+            stage_sizes=config["stage_sizes"],
+            size_routing=config["size_routing"],
+            bulk_import=config["bulk_import"],
+            features_table_name=data.features_table_name,
+            features_table_keys=(dynamodb_table.partition_key, dynamodb_table.sort_key),
+            features_table_indexes=dynamodb_table.index_specifications,
+            features_table_pointer=features_table_pointer,
+            ledger_table=data.ledger_table.table if data.ledger_table else None,
+            memoization=config["memoization"],
+            memo_table=data.memo_table.table if data.memo_table else None,
+            fingerprint_function=fingerprint_function
+        )
+
+        # 4. Create Step Functions State Machine (priority queue when fair share is on)
+        self.stepfunctions = StepFunctionsStateMachine(
+            self,
+            "StepFunctions",
+            job_queue_arn=batch_environment.priority_queue_arn or batch_environment.queue_arn,
+            job_queue_arns={
+                size: batch_environment.queue_arn_for(size, priority=True)
+                for size in batch_environment.job_sizes
+            },
+            share_identifier=pipeline_share,
+            **pipeline
+        )
+
+        # 5. Create the backfill State Machine (optional), one pipeline run per date on the shared queue
+        # A run peaks with extraction and processing side by side, or with training alone
+        self.backfill_stepfunctions = None
+        if config["backfill"]["enabled"]:
+            stage_vcpus = {
+                stage: batch_environment.job_sizes[size].vcpus
+                for stage, size in {**DEFAULT_STAGE_SIZES, **config["stage_sizes"]}.items()
+            }
+            run_vcpus = max(
+                stage_vcpus["feature_extraction"] + stage_vcpus["data_processing"],
+                stage_vcpus["model_training"]
+            )
+            self.backfill_stepfunctions = StepFunctionsStateMachine(
+                self,
+                "BackfillStepFunctions",
+                job_queue_arn=batch_environment.queue_arn,
+                job_queue_arns={
+                    size: batch_environment.queue_arn_for(size)
+                    for size in batch_environment.job_sizes
+                },
+                share_identifier=backfill_share,
+                backfill=config["backfill"],
+                backfill_max_concurrency=max(1, int(batch_environment.fargate_vcpus // run_vcpus)),
+                **pipeline
+            )
+
+        # 6. Dashboard, alarms and Batch job state metrics
+        self.observability = None
+        observability = config["observability"]
+        if observability["enabled"]:
+            state_machines = {"orchestrator": self.stepfunctions.state_machine}
+            if self.backfill_stepfunctions is not None:
+                state_machines["backfill"] = self.backfill_stepfunctions.state_machine
+            self.observability = PipelineObservability(
+                self,
+                "Observability",
+                batch_environment=batch_environment,
+                state_machines=state_machines,
+                features_table=dynamodb_table.table,
+                environment=environment,
+                execution_sla_minutes=observability["execution_sla_minutes"],
+                queue_wait_sla_minutes=observability["queue_wait_sla_minutes"],
+                throttled_requests_threshold=observability["throttled_requests_threshold"],
+                alarm_emails=observability["alarm_emails"]
+            )
+
+        # ===== Outputs =====
+
+        CfnOutput(
+            self,
+            "BatchJobQueueName",
+            value=batch_environment.queue_name,
+            description="AWS Batch Job Queue",
+            export_name=f"sanders-batch-queue-{environment}"
+        )
+
+        if batch_environment.priority_job_queue is not None:
+            CfnOutput(
+                self,
+                "BatchPriorityJobQueueName",
+                value=batch_environment.priority_queue_name,
+                description="AWS Batch priority job queue used by the pipeline",
+                export_name=f"sanders-batch-priority-queue-{environment}"
+            )
+
+        CfnOutput(
+            self,
+            "StepFunctionsStateMachineARN",
+            value=self.stepfunctions.state_machine_arn,
+            description="Step Functions State Machine ARN",
+            export_name=f"sanders-stepfunctions-arn-{environment}"
+        )
+
+        CfnOutput(
+            self,
+            "StepFunctionsStateMachineName",
+            value=self.stepfunctions.state_machine_name,
+            description="Step Functions State Machine Name",
+            export_name=f"sanders-stepfunctions-name-{environment}"
+        )
+
+        if self.backfill_stepfunctions is not None:
+            CfnOutput(
+                self,
+                "BackfillStateMachineARN",
+                value=self.backfill_stepfunctions.state_machine_arn,
+                description="Step Functions backfill State Machine ARN",
+                export_name=f"sanders-backfill-arn-{environment}"
+            )
+
+        if self.observability is not None:
+            CfnOutput(
+                self,
+                "PipelineDashboardName",
+                value=self.observability.dashboard.dashboard_name,
+                description="CloudWatch dashboard for the pipeline"
+            )
+
+            CfnOutput(
+                self,
+                "PipelineAlarmTopicARN",
+                value=self.observability.alarm_topic.topic_arn,
+                description="SNS topic the pipeline alarms publish to",
+                export_name=f"sanders-pipeline-alarms-{environment}"
+            )
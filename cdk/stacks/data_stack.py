@@ -0,0 +1,191 @@
+from aws_cdk import (
+    aws_ssm as ssm,
+    custom_resources as cr,
+    Stack,
+    CfnOutput,
+    Tags
+)
+from constructs import Construct
+from cdk.config import load_environment_config
+from cdk.constructs.s3_bucket import S3Bucket
+from cdk.constructs.dynamodb_table import DynamoDBTable
+from cdk.constructs.ecr_repository import ECRRepository
+from cdk.constructs.dax_cluster import DAXCluster
+from cdk.constructs.vpc_network import VPCNetwork
+
+
+class DataStack(Stack):
+    """
+    Data stack for Sanders Customer Platform Infrastructure
+    Bucket, features table, table pointer, ECR repository and the optional
+    DAX cluster; everything stateful the compute stack reads and writes
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        environment: str,
+        vpc_network: VPCNetwork,
+        **kwargs
+    ) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        config = load_environment_config(self, environment)
+
+        # Add stack-level tags
+        Tags.of(self).add("Project", "sanders-customer-platform")
+        Tags.of(self).add("Environment", environment)
+        Tags.of(self).add("ManagedBy", "CDK")
+
+        # 1. Create S3 Bucket
+        self.s3_bucket = S3Bucket(
+            self,
+            "S3Bucket",
+            bucket_name=f"sanders-customer-platform-{environment}",
+            environment=environment
+        )
+
+        # 2. Create DynamoDB Table
+        self.features_table_name = f"sanders_daily_customer_features_{environment}"
+        self.dynamodb_table = DynamoDBTable(
+            self,
+            "DynamoDBTable",
+            table_name=self.features_table_name,
+            partition_key="customer_id",
+            sort_key="date",
+            environment=environment,
+            global_secondary_indexes=config["features_table"]["global_secondary_indexes"]
+        )
+
+        # 2b. Pointer to the active features table, swapped by the bulk import stage
+        # The workflow owns its value, so the parameter is created once outside the template
+        # (pointing at the base table) and never reset by a later deploy
+        self.features_table_pointer = None
+        if config["bulk_import"]["enabled"]:
+            pointer_name = f"/sanders/{environment}/features-table"
+            self.features_table_pointer = ssm.StringParameter.from_string_parameter_name(
+                self,
+                "FeaturesTablePointer",
+                pointer_name
+            )
+            self.features_table_pointer_init = cr.AwsCustomResource(
+                self,
+                "FeaturesTablePointerInit",
+                on_create=cr.AwsSdkCall(
+                    service="SSM",
+                    action="putParameter",
+                    parameters={
+                        "Name": pointer_name,
+                        "Value": self.dynamodb_table.table_name,
+                        "Type": "String",
+                        "Overwrite": False,
+                        "Description": "Name of the active (latest imported) customer features table"
+                    },
+                    physical_resource_id=cr.PhysicalResourceId.of(pointer_name),
+                    ignore_error_codes_matching="ParameterAlreadyExists"
+                ),
+                on_delete=None if environment == 'prod' else cr.AwsSdkCall(
+                    service="SSM",
+                    action="deleteParameter",
+                    parameters={"Name": pointer_name},
+                    ignore_error_codes_matching="ParameterNotFound"
+                ),
+                policy=cr.AwsCustomResourcePolicy.from_sdk_calls(
+                    resources=[self.features_table_pointer.parameter_arn]
+                ),
+                install_latest_aws_sdk=False
+            )
+
+        # 2c. Run ledger, keyed by run date and stage, for checkpoint-and-resume
+        self.ledger_table = None
+        if config["ledger"]["enabled"]:
+            self.ledger_table = DynamoDBTable(
+                self,
+                "RunLedgerTable",
+                table_name=f"sanders_run_ledger_{environment}",
+                partition_key="run_date",
+                sort_key="stage",
+                environment=environment
+            )
+
+        # 2d. Input fingerprints of memoized stages, evicted through TTL
+        self.memo_table = None
+        if config["memoization"]["enabled"]:
+            self.memo_table = DynamoDBTable(
+                self,
+                "StageMemoTable",
+                table_name=f"sanders_stage_memo_{environment}",
+                partition_key="memo_key",
+                sort_key=None,
+                environment=environment,
+                time_to_live_attribute="expires_at"
+            )
+
+        # 3. Create ECR Repository
+        self.ecr_repository = ECRRepository(
+            self,
+            "ECRRepository",
+            repository_name=f"sanders-customer-platform-{environment}",
+            environment=environment,
+            max_image_count=config["image"]["max_image_count"],
+            untagged_expiry_days=config["image"]["untagged_expiry_days"]
+        )
+
+        # 4. Create DAX Cluster (optional)
+        self.dax_cluster = None
+        if config["dax"]["enabled"]:
+            self.dax_cluster = DAXCluster(
+                self,
+                "DAXCluster",
+                vpc=vpc_network.vpc,
+                client_security_group=vpc_network.batch_security_group,
+                table_arn=self.dynamodb_table.table_arn,
+                environment=environment,
+                node_type=config["dax"]["node_type"],
+                replication_factor=config["dax"]["replication_factor"]
+            )
+
+        # ===== Outputs =====
+
+        CfnOutput(
+            self,
+            "S3BucketName",
+            value=self.s3_bucket.bucket_name,
+            description="S3 Bucket for data storage",
+            export_name=f"sanders-s3-bucket-{environment}"
+        )
+
+        CfnOutput(
+            self,
+            "DynamoDBTableName",
+            value=self.dynamodb_table.table_name,
+            description="DynamoDB table for customer features",
+            export_name=f"sanders-dynamodb-table-{environment}"
+        )
+
+        CfnOutput(
+            self,
+            "ECRRepositoryURI",
+            value=self.ecr_repository.repository_uri,
+            description="ECR repository URI for Docker images",
+            export_name=f"sanders-ecr-uri-{environment}"
+        )
+
+        if self.ledger_table is not None:
+            CfnOutput(
+                self,
+                "RunLedgerTableName",
+                value=self.ledger_table.table_name,
+                description="DynamoDB table recording completed pipeline stages per run date",
+                export_name=f"sanders-run-ledger-{environment}"
+            )
+
+        if self.dax_cluster is not None:
+            CfnOutput(
+                self,
+                "DAXClusterEndpoint",
+                value=self.dax_cluster.cluster_endpoint,
+                description="DAX cluster discovery endpoint for cached feature reads",
+                export_name=f"sanders-dax-endpoint-{environment}"
+            )
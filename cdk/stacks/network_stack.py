@@ -0,0 +1,53 @@
+from aws_cdk import (
+    Stack,
+    CfnOutput,
+    Tags
+)
+from constructs import Construct
+from cdk.config import load_environment_config
+from cdk.constructs.vpc_network import VPCNetwork
+
+
+class NetworkStack(Stack):
+    """
+    Network stack for Sanders Customer Platform Infrastructure
+    VPC, NAT gateway, VPC endpoints and the optional EFS scratch volume;
+    changes rarely and is deployed first
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        environment: str,
+        **kwargs
+    ) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        config = load_environment_config(self, environment)
+
+        # Add stack-level tags
+        Tags.of(self).add("Project", "sanders-customer-platform")
+        Tags.of(self).add("Environment", environment)
+        Tags.of(self).add("ManagedBy", "CDK")
+
+        # 1. Create VPC and Network
+        self.vpc_network = VPCNetwork(
+            self,
+            "VPCNetwork",
+            environment=environment,
+            gateway_endpoints=config["network"]["gateway_endpoints"],
+            interface_endpoints=config["network"]["interface_endpoints"],
+            scratch_filesystem=config["network"]["scratch_filesystem"],
+            scratch_retention_days=config["network"]["scratch_retention_days"]
+        )
+
+        # ===== Outputs =====
+
+        CfnOutput(
+            self,
+            "VPCId",
+            value=self.vpc_network.vpc_id,
+            description="VPC ID",
+            export_name=f"sanders-vpc-id-{environment}"
+        )
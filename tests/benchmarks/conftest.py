@@ -0,0 +1,32 @@
+"""
+Collects synth benchmark measurements and reports them after the run
+Set SANDERS_BENCHMARK_OUTPUT to a file path to also write them as JSON
+(e.g. to compare against the main branch in CI)
+"""
+import json
+import os
+import pytest
+
+
+_RESULTS = []
+
+
+@pytest.fixture(scope="session")
+def benchmark_results():
+    """List that benchmark tests append one measurement dict to"""
+    return _RESULTS
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _RESULTS:
+        return
+    terminalreporter.section("sanders synth benchmarks")
+    for result in _RESULTS:
+        terminalreporter.write_line(
+            "  ".join(f"{key}={value}" for key, value in result.items())
+        )
+
+    output = os.environ.get("SANDERS_BENCHMARK_OUTPUT")
+    if output:
+        with open(output, "w") as handle:
+            json.dump(_RESULTS, handle, indent=2)
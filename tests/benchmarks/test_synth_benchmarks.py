@@ -0,0 +1,92 @@
+"""
+Synth benchmarks for Sanders Customer Platform
+Times app construction and synthesis per environment and checks each stack
+template against CloudFormation limits, so regressions show up before deploy
+Budgets can be tightened or relaxed per machine with
+SANDERS_CONSTRUCT_BUDGET_SECONDS and SANDERS_SYNTH_BUDGET_SECONDS
+"""
+import json
+import os
+import time
+import pytest
+import aws_cdk as cdk
+from typing import Optional
+from cdk.sanders_customer_platform import SandersCustomerPlatform
+
+
+CONSTRUCT_BUDGET_SECONDS = float(os.environ.get("SANDERS_CONSTRUCT_BUDGET_SECONDS", "10"))
+SYNTH_BUDGET_SECONDS = float(os.environ.get("SANDERS_SYNTH_BUDGET_SECONDS", "20"))
+
+# CloudFormation limits for templates uploaded through the bootstrap bucket
+MAX_TEMPLATE_BYTES = 1024 * 1024
+MAX_RESOURCES = 500
+MAX_OUTPUTS = 200
+
+# Every optional feature switched on, for the largest templates we can produce
+# (bulk import is left off: it cannot be combined with backfill, the larger of the two)
+ALL_FEATURES = {
+    "network": {"scratch_filesystem": True},
+    "dax": {"enabled": True},
+    "batch": {"ec2_spot_max_vcpus": 64, "ec2_nvme_max_vcpus": 64},
+    "sharding": {"enabled": True},
+    "array_jobs": {"enabled": True},
+    "fair_share": {"enabled": True},
+    "backfill": {"enabled": True},
+    "ledger": {"enabled": True},
+    "memoization": {"enabled": True, "stages": {"feature_extraction": "input_prefix", "model_training": "features_prefix"}},
+    "size_routing": {"enabled": True}
+}
+
+
+def _app(context: Optional[dict] = None) -> cdk.App:
+    """App with the given context and the pinned image tag synth requires"""
+    return cdk.App(context={"image_tag": "test-build", **(context or {})})
+
+
+@pytest.mark.parametrize("profile", ["default", "all-features"])
+@pytest.mark.parametrize("environment", ["dev", "prod"])
+def test_synth_benchmark(environment, profile, benchmark_results):
+    """Time construction and synthesis, and record template size per stack"""
+    context = {"sanders": {environment: ALL_FEATURES}} if profile == "all-features" else None
+
+    start = time.perf_counter()
+    app = _app(context)
+    platform = SandersCustomerPlatform(app, environment=environment)
+    construct_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assembly = app.synth()
+    synth_seconds = time.perf_counter() - start
+
+    benchmark_results.append({
+        "environment": environment,
+        "profile": profile,
+        "stack": "(app)",
+        "construct_s": round(construct_seconds, 3),
+        "synth_s": round(synth_seconds, 3)
+    })
+
+    for stack in platform.stacks:
+        template = assembly.get_stack_by_name(stack.stack_name).template
+        template_bytes = len(json.dumps(template, separators=(",", ":")))
+        resource_count = len(template.get("Resources", {}))
+        output_count = len(template.get("Outputs", {}))
+        benchmark_results.append({
+            "environment": environment,
+            "profile": profile,
+            "stack": stack.stack_name,
+            "template_bytes": template_bytes,
+            "resources": resource_count,
+            "outputs": output_count
+        })
+
+        assert template_bytes < MAX_TEMPLATE_BYTES, f"{stack.stack_name} template is {template_bytes} bytes"
+        assert resource_count < MAX_RESOURCES, f"{stack.stack_name} has {resource_count} resources"
+        assert output_count < MAX_OUTPUTS, f"{stack.stack_name} has {output_count} outputs"
+
+    assert construct_seconds < CONSTRUCT_BUDGET_SECONDS, (
+        f"Constructing {environment} ({profile}) took {construct_seconds:.2f}s (budget {CONSTRUCT_BUDGET_SECONDS}s)"
+    )
+    assert synth_seconds < SYNTH_BUDGET_SECONDS, (
+        f"Synthesizing {environment} ({profile}) took {synth_seconds:.2f}s (budget {SYNTH_BUDGET_SECONDS}s)"
+    )
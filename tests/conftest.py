@@ -0,0 +1,53 @@
+"""
+Shared fixtures for the Sanders Customer Platform tests
+Synthesizing the app through JSII dominates test time, so the default
+configuration of each environment is built and synthesized once per session;
+tests that need context overrides still build their own app
+"""
+import pytest
+import aws_cdk as cdk
+from aws_cdk.assertions import Template
+from cdk.sanders_customer_platform import SandersCustomerPlatform
+
+
+# Synth requires a pinned image, so test apps deploy a fixed versioned tag
+IMAGE_TAG = "test-build"
+
+
+def _synthesize(environment: str):
+    app = cdk.App(context={"image_tag": IMAGE_TAG})
+    platform = SandersCustomerPlatform(app, environment=environment)
+    templates = {
+        "network": Template.from_stack(platform.network),
+        "data": Template.from_stack(platform.data),
+        "compute": Template.from_stack(platform.compute)
+    }
+    return platform, templates
+
+
+@pytest.fixture(scope="session")
+def dev_synth():
+    return _synthesize("dev")
+
+
+@pytest.fixture(scope="session")
+def prod_synth():
+    return _synthesize("prod")
+
+
+@pytest.fixture(scope="session")
+def dev_platform(dev_synth):
+    """SandersCustomerPlatform for dev with the default configuration"""
+    return dev_synth[0]
+
+
+@pytest.fixture(scope="session")
+def dev_templates(dev_synth):
+    """Templates of the default dev stacks, keyed by "network", "data" and "compute" """
+    return dev_synth[1]
+
+
+@pytest.fixture(scope="session")
+def prod_templates(prod_synth):
+    """Templates of the default prod stacks, keyed by "network", "data" and "compute" """
+    return prod_synth[1]
@@ -0,0 +1,68 @@
+"""
+Tests for the synth-time capacity estimator, including the daily-run capacity gate
+"""
+import pytest
+import aws_cdk as cdk
+from typing import Optional
+from aws_cdk.assertions import Template
+from cdk.sanders_customer_platform import SandersCustomerPlatform
+from tools.capacity_estimator import CapacityEstimator
+
+
+# Per-job runtimes (seconds) of a typical daily run
+DAILY_PROFILE = {"stages": {"feature-extraction": 1800, "data-processing": 600, "model-training": 3600}}
+
+
+def _app(context: Optional[dict] = None) -> cdk.App:
+    """App with the given context and the pinned image tag synth requires"""
+    return cdk.App(context={"image_tag": "test-build", **(context or {})})
+
+
+def test_daily_run_fits_at_16_vcpus(prod_templates):
+    """Gate: the daily run must finish within 2 hours on 16 vCPUs"""
+    estimate = CapacityEstimator(prod_templates["compute"].to_json(), max_vcpus=16).estimate(DAILY_PROFILE)
+
+    assert estimate.fits(2 * 3600), estimate.format_report()
+
+
+def test_estimate_follows_the_dag(dev_templates):
+    """Test wall clock, peak vCPU and cost of Parallel(extraction, processing) -> training"""
+    estimate = CapacityEstimator(dev_templates["compute"].to_json()).estimate(DAILY_PROFILE)
+
+    assert estimate.status == "SUCCEEDED"
+    assert estimate.wall_clock_seconds == 1800 + 3600
+    assert estimate.peak_vcpus == 4
+    assert estimate.queue_delay_seconds == 0
+    assert estimate.vcpu_hours == pytest.approx(2 * 0.5 + 0.5 * 600 / 3600 + 4 * 1.0)
+    assert estimate.cost > 0
+    assert [step.state for step in estimate.critical_path if step.type == "Task"] == [
+        "FeatureExtractionJob", "ModelTrainingJob"
+    ]
+
+
+def test_estimate_queues_shards_beyond_the_cap():
+    """Test that sharded array jobs wait for capacity once they exceed the vCPU cap"""
+    app = _app({"sanders": {"dev": {
+        "sharding": {"enabled": True},
+        "array_jobs": {"enabled": True, "shard_array_size": 4}
+    }}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute).to_json()
+    profile = {"stages": {"feature-extraction-shard": 600, "data-processing": 600, "model-training": 1800}}
+    execution_input = {"shards": [{"input_prefix": f"raw/{shard}/"} for shard in range(8)], "array_size": 4}
+
+    uncapped = CapacityEstimator(template).estimate(profile, execution_input)
+    capped = CapacityEstimator(template, max_vcpus=16).estimate(profile, execution_input)
+
+    # 8 shards x 4 children x 2 vCPU = 64 vCPU of extraction, 4 shards (32 vCPU) at a time
+    assert uncapped.peak_vcpus == 32
+    assert capped.peak_vcpus == 16
+    assert capped.queue_delay_seconds > uncapped.queue_delay_seconds
+    assert capped.wall_clock_seconds > uncapped.wall_clock_seconds
+
+
+def test_estimate_requires_every_stage_runtime(dev_templates):
+    """Test that a profile missing a Batch stage is rejected"""
+    estimator = CapacityEstimator(dev_templates["compute"].to_json())
+    with pytest.raises(ValueError):
+        estimator.estimate({"stages": {"feature-extraction": 1800}})
@@ -1,34 +1,30 @@
 """
-Unit tests for Sanders Customer Platform Stack
+Unit tests for Sanders Customer Platform stacks
 """
+import json
+import pytest
 import aws_cdk as cdk
-from aws_cdk.assertions import Template
-from cdk.sanders_customer_platform_stack import SandersCustomerPlatformStack
+from typing import Optional
+from aws_cdk.assertions import Match, Template
+from cdk.sanders_customer_platform import SandersCustomerPlatform
 
 
-def test_s3_bucket_created():
+def _app(context: Optional[dict] = None) -> cdk.App:
+    """App with the given context and the pinned image tag synth requires"""
+    return cdk.App(context={"image_tag": "test-build", **(context or {})})
+
+
+def test_s3_bucket_created(dev_templates):
     """Test that S3 bucket is created"""
-    app = cdk.App()
-    stack = SandersCustomerPlatformStack(
-        app,
-        "TestStack",
-        environment="dev"
-    )
-    template = Template.from_stack(stack)
+    template = dev_templates["data"]
     
     # Assert S3 bucket exists
     template.resource_count_is("AWS::S3::Bucket", 1)
 
 
-def test_dynamodb_table_created():
+def test_dynamodb_table_created(dev_templates):
     """Test that DynamoDB table is created with correct attributes"""
-    app = cdk.App()
-    stack = SandersCustomerPlatformStack(
-        app,
-        "TestStack",
-        environment="dev"
-    )
-    template = Template.from_stack(stack)
+    template = dev_templates["data"]
     
     # Assert DynamoDB table exists
     template.resource_count_is("AWS::DynamoDB::Table", 1)
@@ -43,74 +39,1017 @@ def test_dynamodb_table_created():
     })
 
 
-def test_ecr_repository_created():
+def test_date_shard_index_created(dev_templates):
+    """Test that the features table has the write-sharded date index by default"""
+    template = dev_templates["data"]
+
+    template.has_resource_properties("AWS::DynamoDB::Table", {
+        "GlobalSecondaryIndexes": [{
+            "IndexName": "date-shard-index",
+            "KeySchema": [
+                {"AttributeName": "date_shard", "KeyType": "HASH"},
+                {"AttributeName": "customer_id", "KeyType": "RANGE"}
+            ],
+            "Projection": {"ProjectionType": "ALL"}
+        }]
+    })
+    dev_templates["compute"].has_resource_properties("AWS::Batch::JobDefinition", {
+        "ContainerProperties": Match.object_like({
+            "Environment": Match.array_with([
+                {"Name": "SANDERS_GSI_SHARDS_DATE_SHARD_INDEX", "Value": "16"}
+            ])
+        })
+    })
+
+
+def test_global_secondary_indexes_from_context():
+    """Test that indexes and their projection come from context"""
+    app = _app({"sanders": {"dev": {"features_table": {"global_secondary_indexes": [
+        {"index_name": "date-index", "partition_key": "date", "projection": ["feature_1"]}
+    ]}}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.data)
+
+    template.has_resource_properties("AWS::DynamoDB::Table", {
+        "GlobalSecondaryIndexes": [{
+            "IndexName": "date-index",
+            "KeySchema": [{"AttributeName": "date", "KeyType": "HASH"}],
+            "Projection": {"ProjectionType": "INCLUDE", "NonKeyAttributes": ["feature_1"]}
+        }]
+    })
+
+
+def test_ecr_repository_created(dev_templates):
     """Test that ECR repository is created"""
-    app = cdk.App()
-    stack = SandersCustomerPlatformStack(
-        app,
-        "TestStack",
-        environment="dev"
-    )
-    template = Template.from_stack(stack)
+    template = dev_templates["data"]
     
     # Assert ECR repository exists
     template.resource_count_is("AWS::ECR::Repository", 1)
+    template.has_resource_properties("AWS::ECR::Repository", {
+        "ImageTagMutability": "IMMUTABLE"
+    })
+
+    # Untagged images expire by age ahead of the tagged count rule
+    repository = next(iter(template.find_resources("AWS::ECR::Repository").values()))
+    rules = json.loads(repository["Properties"]["LifecyclePolicy"]["LifecyclePolicyText"])["rules"]
+    assert [(rule["rulePriority"], rule["selection"]["tagStatus"]) for rule in rules] == [
+        (1, "untagged"), (2, "tagged")
+    ]
+    assert rules[0]["selection"]["countType"] == "sinceImagePushed"
+    assert rules[0]["selection"]["countNumber"] == 3
+
 
+def test_job_definitions_pinned_to_image_digest():
+    """Test that an image digest from context pins every job definition"""
+    digest = "sha256:" + "ab" * 32
+    app = _app({"image_digest": digest})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
 
-def test_vpc_created():
+    template.all_resources_properties("AWS::Batch::JobDefinition", {
+        "ContainerProperties": Match.object_like({
+            "Image": {"Fn::Join": ["", Match.array_with([f"@{digest}"])]}
+        })
+    })
+
+
+@pytest.mark.parametrize("context", [
+    {},                         # no tag or digest
+    {"image_tag": "latest"},    # frozen at its first push in an immutable repository
+])
+def test_unpinned_image_rejected(context):
+    """Test that job definitions must be pinned to a digest or a versioned tag"""
+    app = cdk.App(context=context)
+    with pytest.raises(ValueError):
+        SandersCustomerPlatform(app, environment="dev")
+
+
+def test_vpc_created(dev_templates):
     """Test that VPC is created"""
-    app = cdk.App()
-    stack = SandersCustomerPlatformStack(
-        app,
-        "TestStack",
-        environment="dev"
-    )
-    template = Template.from_stack(stack)
+    template = dev_templates["network"]
     
     # Assert VPC exists
     template.resource_count_is("AWS::EC2::VPC", 1)
 
 
-def test_batch_resources_created():
+def test_vpc_endpoints_per_environment(dev_templates, prod_templates):
+    """Test that dev gets gateway endpoints only and prod adds interface endpoints"""
+    dev_template = dev_templates["network"]
+    prod_template = prod_templates["network"]
+
+    dev_template.resource_count_is("AWS::EC2::VPCEndpoint", 2)
+    dev_template.has_resource_properties("AWS::EC2::VPCEndpoint", {
+        "VpcEndpointType": "Gateway",
+        "ServiceName": Match.object_like({"Fn::Join": ["", Match.array_with([".dynamodb"])]})
+    })
+
+    # 2 gateway + ecr.api, ecr.dkr, logs, sts, batch
+    prod_template.resource_count_is("AWS::EC2::VPCEndpoint", 7)
+    prod_template.has_resource_properties("AWS::EC2::VPCEndpoint", {
+        "VpcEndpointType": "Interface",
+        "PrivateDnsEnabled": True
+    })
+
+
+def test_batch_resources_created(dev_templates):
     """Test that Batch compute environment and queue are created"""
-    app = cdk.App()
-    stack = SandersCustomerPlatformStack(
-        app,
-        "TestStack",
-        environment="dev"
-    )
-    template = Template.from_stack(stack)
+    template = dev_templates["compute"]
     
-    # Assert Batch resources exist
-    template.resource_count_is("AWS::Batch::ComputeEnvironment", 1)
+    # Assert Batch resources exist (on-demand Fargate + Fargate Spot)
+    template.resource_count_is("AWS::Batch::ComputeEnvironment", 2)
     template.resource_count_is("AWS::Batch::JobQueue", 1)
     # 3 job definitions (2g, 8g, 16g)
     template.resource_count_is("AWS::Batch::JobDefinition", 3)
 
 
-def test_stepfunctions_created():
+def test_stepfunctions_created(dev_templates):
     """Test that Step Functions state machine is created"""
-    app = cdk.App()
-    stack = SandersCustomerPlatformStack(
-        app,
-        "TestStack",
-        environment="dev"
-    )
-    template = Template.from_stack(stack)
+    template = dev_templates["compute"]
     
     # Assert State Machine exists
     template.resource_count_is("AWS::StepFunctions::StateMachine", 1)
 
 
-def test_iam_roles_created():
+def test_stacks_split_by_lifecycle(dev_platform, dev_templates):
+    """Test that network, data and compute resources land in separate, ordered stacks"""
+    platform = dev_platform
+    network = dev_templates["network"]
+    data = dev_templates["data"]
+    compute = dev_templates["compute"]
+
+    network.resource_count_is("AWS::EC2::VPC", 1)
+    network.resource_count_is("AWS::StepFunctions::StateMachine", 0)
+    data.resource_count_is("AWS::DynamoDB::Table", 1)
+    data.resource_count_is("AWS::Batch::JobDefinition", 0)
+    compute.resource_count_is("AWS::EC2::VPC", 0)
+    compute.resource_count_is("AWS::DynamoDB::Table", 0)
+
+    # Compute reads the VPC, table and repository through exports, so it deploys last;
+    # without DAX the data stack has no network references and deploys in parallel
+    dependencies = [stack.stack_name for stack in platform.compute.dependencies]
+    assert sorted(dependencies) == sorted([platform.network.stack_name, platform.data.stack_name])
+    assert platform.data.dependencies == []
+    assert "Fn::ImportValue" in json.dumps(compute.to_json())
+
+
+def test_iam_roles_created(dev_templates):
     """Test that IAM roles are created for Batch"""
-    app = cdk.App()
-    stack = SandersCustomerPlatformStack(
-        app,
-        "TestStack",
-        environment="dev"
-    )
-    template = Template.from_stack(stack)
+    template = dev_templates["compute"]
     
-    # Assert IAM roles exist (3 for Batch + 1 for Step Functions)
-    template.resource_count_is("AWS::IAM::Role", 4)
+    # Assert IAM roles exist (3 for Batch + 1 for Step Functions + the job metrics and execution age Lambdas)
+    template.resource_count_is("AWS::IAM::Role", 6)
+
+
+def _state_machine_definition(template: Template) -> dict:
+    """Render the state machine's DefinitionString with tokens replaced by placeholders"""
+    state_machine = next(iter(template.find_resources("AWS::StepFunctions::StateMachine").values()))
+    definition = state_machine["Properties"]["DefinitionString"]
+    if isinstance(definition, dict) and "Fn::Join" in definition:
+        separator, parts = definition["Fn::Join"]
+        definition = separator.join(
+            part if isinstance(part, str) else "TOKEN" for part in parts
+        )
+    return json.loads(definition)
+
+
+def test_sharded_feature_extraction():
+    """Test that sharded mode fans feature extraction out through a Distributed Map"""
+    app = _app({"sanders": {"dev": {"sharding": {"enabled": True}}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    definition = _state_machine_definition(template)
+    feature_branch = definition["States"]["ParallelJobs"]["Branches"][0]
+    shard_map = feature_branch["States"]["FeatureExtractionShards"]
+
+    assert shard_map["Type"] == "Map"
+    assert shard_map["ItemProcessor"]["ProcessorConfig"]["Mode"] == "DISTRIBUTED"
+    assert shard_map["ItemsPath"] == "$.shards"
+    # Per-shard results go to S3 so large manifests stay under the state payload limit
+    assert shard_map["ResultWriter"]["Parameters"]["Prefix"] == "shard-results/"
+    assert "ResultSelector" not in shard_map
+    # (16 on-demand + 16 Fargate Spot vCPUs) / 2 vCPUs per 8g job
+    assert shard_map["MaxConcurrency"] == 16
+
+
+@pytest.mark.parametrize("manifest", ["input", "s3"])
+def test_sharded_orchestrator_runs_child_executions(manifest):
+    """Test that the orchestrator role may start and manage the shard map's child executions"""
+    app = _app({"sanders": {"dev": {"sharding": {"enabled": True, "manifest": manifest}}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    policy = template.find_resources("AWS::IAM::Policy", {
+        "Properties": {"Roles": [{"Ref": Match.string_like_regexp("StepFunctionsStateMachineRole")}]}
+    })
+    statements = [
+        statement
+        for resource in policy.values()
+        for statement in resource["Properties"]["PolicyDocument"]["Statement"]
+    ]
+    actions = {
+        action: json.dumps(statement["Resource"])
+        for statement in statements
+        for action in (statement["Action"] if isinstance(statement["Action"], list) else [statement["Action"]])
+    }
+    assert ":stateMachine:sanders-orchestrator-dev" in actions["states:StartExecution"]
+    for action in ("states:DescribeExecution", "states:StopExecution"):
+        assert ":execution:sanders-orchestrator-dev:*" in actions[action]
+
+
+def test_sharded_array_jobs_concurrency():
+    """Test that sharded array runs only start as many shards as their children fit in the queue"""
+    app = _app({"sanders": {"dev": {
+        "sharding": {"enabled": True},
+        "array_jobs": {"enabled": True, "shard_array_size": 4}
+    }}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    definition = _state_machine_definition(template)
+    shard_map = definition["States"]["ParallelJobs"]["Branches"][0]["States"]["FeatureExtractionShards"]
+    # 16 concurrent 8g jobs / 4 children per shard
+    assert shard_map["MaxConcurrency"] == 4
+
+
+def test_array_jobs_wired_to_execution_input():
+    """Test that array mode sizes partitionable jobs from the execution input"""
+    app = _app({"sanders": {"dev": {"array_jobs": {"enabled": True}}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    definition = _state_machine_definition(template)
+    branches = definition["States"]["ParallelJobs"]["Branches"]
+    feature_job = branches[0]["States"]["FeatureExtractionJob"]
+    processing_job = branches[1]["States"]["DataProcessingJob"]
+    training_job = definition["States"]["ModelTrainingJob"]
+
+    for job in (feature_job, processing_job):
+        assert job["Parameters"]["ArrayProperties"] == {"Size.$": "$.array_size"}
+        assert {
+            "Name": "SANDERS_PARTITION_COUNT",
+            "Value.$": "States.Format('{}', $.array_size)"
+        } in job["Parameters"]["ContainerOverrides"]["Environment"]
+    assert "ArrayProperties" not in training_job["Parameters"]
+
+
+def test_array_jobs_fall_back_to_single_job():
+    """Test that executions without an array size of at least 2 submit single jobs"""
+    app = _app({"sanders": {"dev": {"array_jobs": {"enabled": True}}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    definition = _state_machine_definition(template)
+    assert definition["StartAt"] == "ArraySizeProvided"
+    provided = definition["States"]["ArraySizeProvided"]
+    assert provided["Choices"] == [{"Variable": "$.array_size", "IsPresent": True, "Next": "ParallelJobs"}]
+    assert provided["Default"] == "DefaultArraySize"
+    assert definition["States"]["DefaultArraySize"]["Result"] == 1
+
+    feature_states = definition["States"]["ParallelJobs"]["Branches"][0]["States"]
+    partitions = feature_states["FeatureExtractionJobPartitions"]
+    assert partitions["Choices"] == [
+        {"Variable": "$.array_size", "NumericGreaterThanEquals": 2, "Next": "FeatureExtractionJob"}
+    ]
+    assert partitions["Default"] == "FeatureExtractionJobSingle"
+
+    single_job = feature_states["FeatureExtractionJobSingle"]["Parameters"]
+    assert "ArrayProperties" not in single_job
+    assert "SANDERS_PARTITION_COUNT" not in [
+        variable["Name"] for variable in single_job["ContainerOverrides"]["Environment"]
+    ]
+
+
+def test_spot_tiers_ordered_in_queues():
+    """Test that Spot compute environments back the queues after on-demand capacity"""
+    app = _app({"sanders": {"dev": {"batch": {"ec2_spot_max_vcpus": 64}}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    template.has_resource_properties("AWS::Batch::ComputeEnvironment", {
+        "ComputeEnvironmentName": "sanders-batch-compute-fargate-spot-dev",
+        "ComputeResources": Match.object_like({"Type": "FARGATE_SPOT", "MaxvCpus": 16})
+    })
+    template.has_resource_properties("AWS::Batch::ComputeEnvironment", {
+        "ComputeResources": Match.object_like({"Type": "SPOT", "MaxvCpus": 64})
+    })
+    template.has_resource_properties("AWS::Batch::JobQueue", {
+        "JobQueueName": "sanders-batch-queue-dev",
+        "ComputeEnvironmentOrder": [
+            {"ComputeEnvironment": Match.any_value(), "Order": 1},
+            {"ComputeEnvironment": Match.any_value(), "Order": 2}
+        ]
+    })
+    template.has_resource_properties("AWS::Batch::JobQueue", {
+        "JobQueueName": "sanders-batch-ec2-queue-dev"
+    })
+    template.all_resources_properties("AWS::Batch::JobDefinition", {
+        "RetryStrategy": Match.object_like({
+            "EvaluateOnExit": Match.array_with([
+                {"OnStatusReason": "Your Spot Task was interrupted*", "Action": "RETRY"}
+            ])
+        })
+    })
+
+
+def test_job_sizes_from_context():
+    """Test that the job size catalog and stage sizes come from context"""
+    app = _app({"sanders": {"dev": {
+        "job_sizes": {"4g": {"cpu": "1", "memory": "4096"}, "30g": {"cpu": "4", "memory": "30720"}},
+        "stage_sizes": {"data_processing": "4g", "model_training": "30g"}
+    }}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    # Default 2g/8g/16g plus the two context sizes
+    template.resource_count_is("AWS::Batch::JobDefinition", 5)
+    template.has_resource_properties("AWS::Batch::JobDefinition", {
+        "JobDefinitionName": "sanders-job-30g-dev",
+        "ContainerProperties": Match.object_like({
+            "ResourceRequirements": [
+                {"Type": "VCPU", "Value": "4"},
+                {"Type": "MEMORY", "Value": "30720"}
+            ]
+        })
+    })
+
+    job_def_ids = {
+        job_def["Properties"]["JobDefinitionName"]: logical_id
+        for logical_id, job_def in template.find_resources("AWS::Batch::JobDefinition").items()
+    }
+    state_machine = next(iter(template.find_resources("AWS::StepFunctions::StateMachine").values()))
+    refs = json.dumps(state_machine["Properties"]["DefinitionString"])
+    assert job_def_ids["sanders-job-30g-dev"] in refs
+    assert job_def_ids["sanders-job-4g-dev"] in refs
+
+
+def test_job_timeouts_and_retries(dev_templates):
+    """Test that every job definition has an attempt timeout and that Batch submissions retry API errors"""
+    template = dev_templates["compute"]
+
+    template.has_resource_properties("AWS::Batch::JobDefinition", {
+        "JobDefinitionName": "sanders-job-16g-dev",
+        "Timeout": {"AttemptDurationSeconds": 14400}
+    })
+    template.all_resources_properties("AWS::Batch::JobDefinition", {
+        "Timeout": {"AttemptDurationSeconds": Match.any_value()},
+        "RetryStrategy": Match.object_like({
+            "EvaluateOnExit": [
+                {"OnStatusReason": "Host EC2*", "Action": "RETRY"},
+                {"OnStatusReason": "Your Spot Task was interrupted*", "Action": "RETRY"},
+                {"OnReason": "CannotPullContainerError*", "Action": "RETRY"},
+                {"OnReason": "ResourceInitializationError*", "Action": "RETRY"},
+                {"OnStatusReason": "*", "Action": "EXIT"}
+            ]
+        })
+    })
+
+    definition = _state_machine_definition(template)
+    retry = definition["States"]["ModelTrainingJob"]["Retry"]
+    assert retry[0]["ErrorEquals"] == [
+        "Batch.AWSBatchException", "Batch.TooManyRequestsException", "Batch.ServerException"
+    ]
+    assert retry[0]["BackoffRate"] == 2
+    assert retry[0]["JitterStrategy"] == "FULL"
+
+
+def test_job_logs_non_blocking(dev_templates, prod_templates):
+    """Test that jobs log non-blocking to a retention-managed group with a stream prefix per size"""
+    template = dev_templates["compute"]
+
+    template.has_resource_properties("AWS::Logs::LogGroup", {
+        "LogGroupName": "/aws/batch/sanders-dev",
+        "RetentionInDays": 30
+    })
+    template.has_resource_properties("AWS::Batch::JobDefinition", {
+        "JobDefinitionName": "sanders-job-8g-dev",
+        "ContainerProperties": Match.object_like({
+            "LogConfiguration": {
+                "LogDriver": "awslogs",
+                "Options": {
+                    "awslogs-group": Match.any_value(),
+                    "awslogs-region": Match.any_value(),
+                    "awslogs-stream-prefix": "8g",
+                    "mode": "non-blocking",
+                    "max-buffer-size": "25m"
+                }
+            }
+        })
+    })
+    prod_templates["compute"].has_resource("AWS::Logs::LogGroup", {
+        "Properties": Match.object_like({"LogGroupName": "/aws/batch/sanders-prod", "RetentionInDays": 90}),
+        "DeletionPolicy": "Retain"
+    })
+
+
+@pytest.mark.parametrize("logging", [
+    {"mode": "async"},
+    {"max_buffer_size": "25 MB"},
+    {"retention": "FOREVER_AND_A_DAY"},
+])
+def test_illegal_job_logging_rejected(logging):
+    """Test that unknown awslogs settings fail at synth time"""
+    app = _app({"sanders": {"dev": {"logging": logging}}})
+    with pytest.raises(ValueError):
+        SandersCustomerPlatform(app, environment="dev")
+
+
+def test_pipeline_observability(dev_templates):
+    """Test the dashboard, SLA alarms and the Batch job state rule feeding the metrics Lambda"""
+    template = dev_templates["compute"]
+
+    template.has_resource_properties("AWS::CloudWatch::Dashboard", {
+        "DashboardName": "sanders-pipeline-dev"
+    })
+    template.has_resource_properties("AWS::Events::Rule", {
+        "Name": "sanders-batch-job-state-dev",
+        "EventPattern": {
+            "source": ["aws.batch"],
+            "detail-type": ["Batch Job State Change"],
+            "detail": {"jobQueue": [Match.any_value()]}
+        },
+        "Targets": [Match.object_like({"Arn": Match.any_value()})]
+    })
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "FunctionName": "sanders-batch-job-metrics-dev",
+        "Environment": {"Variables": {"ENVIRONMENT": "dev"}}
+    })
+    template.has_resource_properties("AWS::CloudWatch::Alarm", {
+        "AlarmName": "sanders-pipeline-failed-dev",
+        "Threshold": 0,
+        "AlarmActions": [Match.any_value()]
+    })
+    # A hung run breaches the SLA while still running, without the execution timeout stopping it
+    template.has_resource_properties("AWS::Events::Rule", {
+        "Name": "sanders-execution-age-dev",
+        "ScheduleExpression": "rate(5 minutes)"
+    })
+    template.has_resource_properties("AWS::CloudWatch::Alarm", {
+        "AlarmName": "sanders-pipeline-overrun-dev",
+        "Namespace": "Sanders/Pipeline",
+        "MetricName": "OldestRunningExecutionMinutes",
+        "Statistic": "Maximum",
+        "Threshold": 240
+    })
+    assert _state_machine_definition(template)["TimeoutSeconds"] == 24 * 60 * 60
+    template.has_resource_properties("AWS::CloudWatch::Alarm", {
+        "AlarmName": "sanders-batch-queue-dev-wait",
+        "Namespace": "Sanders/Pipeline",
+        "MetricName": "SubmitToStartSeconds",
+        "ExtendedStatistic": "p90",
+        "Threshold": 1800
+    })
+    # Failed executions, overrun, submit-to-start (one queue) and features table throttling
+    template.resource_count_is("AWS::CloudWatch::Alarm", 4)
+
+
+@pytest.mark.parametrize("job_size", [
+    {"cpu": "2", "memory": "2048"},      # below the 2 vCPU minimum of 4096
+    {"cpu": "3", "memory": "8192"},      # not a Fargate vCPU value
+    {"cpu": "8", "memory": "18432"},     # 8 vCPU memory steps are 4096
+    {"cpu": "2", "memory": "8192", "ephemeral_storage": 250},   # above the 200 GiB limit
+    {"cpu": "2", "memory": "8192", "linux_parameters": {"shared_memory_size": 1024}},   # EC2 only
+    {"cpu": "2", "memory": "8192", "cpu_architecture": "ARM"},  # not a Fargate runtime platform
+    {"cpu": "2", "memory": "8192", "timeout_minutes": 0},       # attempts need at least a minute
+    {"cpu": "2", "memory": "8192", "instance_storage": True},   # EC2 only
+])
+def test_illegal_fargate_job_size_rejected(job_size):
+    """Test that illegal Fargate CPU/memory combinations fail at synth time"""
+    app = _app({"sanders": {"dev": {"job_sizes": {"bad": job_size}}}})
+    with pytest.raises(ValueError):
+        SandersCustomerPlatform(app, environment="dev")
+
+
+def test_size_routing_choice():
+    """Test that size routing picks the job size from the execution input"""
+    app = _app({"sanders": {"dev": {"size_routing": {
+        "enabled": True,
+        "metric": "row_count",
+        "stages": {"model_training": [{"max": 1000000, "size": "2g"}, {"max": 50000000, "size": "8g"}]}
+    }}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    definition = _state_machine_definition(template)
+    assert definition["States"]["ParallelJobs"]["Next"] == "ModelTrainingJobSize"
+    choice = definition["States"]["ModelTrainingJobSize"]
+    assert [c["Next"] for c in choice["Choices"]] == ["ModelTrainingJob2G", "ModelTrainingJob8G"]
+    assert choice["Choices"][0]["And"][1] == {
+        "Variable": "$.row_count",
+        "NumericLessThanEquals": 1000000
+    }
+    assert choice["Default"] == "ModelTrainingJob"
+
+    # Every tier converges on success and fails through the catch
+    for state_id in ("ModelTrainingJob", "ModelTrainingJob2G", "ModelTrainingJob8G"):
+        assert definition["States"][state_id]["Next"] == "SuccessState"
+        assert definition["States"][state_id]["Catch"][0]["Next"] == "FailState"
+
+
+def test_dax_cluster_optional():
+    """Test that the DAX cluster is created on request with job grants and an endpoint output"""
+    app = _app({"sanders": {"dev": {"dax": {"enabled": True}}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.data)
+
+    template.resource_count_is("AWS::DAX::Cluster", 1)
+    template.has_resource_properties("AWS::DAX::Cluster", {
+        "ClusterName": "sanders-dax-dev",
+        "ClusterEndpointEncryptionType": "TLS",
+        "SSESpecification": {"SSEEnabled": True}
+    })
+    template.has_resource_properties("AWS::EC2::SecurityGroupIngress", {
+        "IpProtocol": "tcp",
+        "FromPort": 9111,
+        "ToPort": 9111
+    })
+    Template.from_stack(platform.compute).has_resource_properties("AWS::IAM::Policy", {
+        "PolicyDocument": {
+            "Statement": Match.array_with([
+                Match.object_like({"Action": Match.array_with(["dax:GetItem", "dax:BatchGetItem"])})
+            ])
+        }
+    })
+    template.has_output("DAXClusterEndpoint", {})
+
+
+def test_dax_cluster_disabled_by_default(dev_templates):
+    """Test that no DAX cluster is created unless enabled"""
+    template = dev_templates["data"]
+
+    template.resource_count_is("AWS::DAX::Cluster", 0)
+
+
+def test_bulk_import_stage():
+    """Test that bulk import runs import-from-S3 and swaps the table pointer before training"""
+    app = _app({"sanders": {"dev": {"bulk_import": {"enabled": True}}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    # The pointer is created once outside the template, so deploys never reset it
+    data_template = Template.from_stack(platform.data)
+    data_template.resource_count_is("AWS::SSM::Parameter", 0)
+    pointer_init = next(iter(data_template.find_resources("Custom::AWS").values()))
+    create_call = "".join(
+        part for part in pointer_init["Properties"]["Create"]["Fn::Join"][1] if isinstance(part, str)
+    )
+    assert '"action":"putParameter"' in create_call
+    assert '"Overwrite":false' in create_call
+
+    definition = _state_machine_definition(template)
+    states = definition["States"]
+    assert states["ParallelJobs"]["Next"] == "ResolveFeaturesTableName"
+    assert states["ResolveFeaturesTableName"]["Parameters"]["name.$"] == (
+        "States.Format('sanders_daily_customer_features_dev_{}', $.run_date)"
+    )
+    # A re-run whose dated table exists skips the import; a missing table starts it
+    assert states["DescribeFeaturesTable"]["Catch"][0] == {
+        "ErrorEquals": ["DynamoDb.ResourceNotFoundException"],
+        "ResultPath": None,
+        "Next": "StartFeatureImport"
+    }
+    assert states["FeaturesTableStatus"]["Choices"][0]["Next"] == "ReadFeaturesTablePointer"
+    assert states["StartFeatureImport"]["Resource"].endswith(":states:::aws-sdk:dynamodb:importTable")
+    assert states["StartFeatureImport"]["Parameters"]["TableCreationParameters"]["TableName.$"] == (
+        "$.featuresTable.name"
+    )
+    assert states["FeatureImportStatus"]["Default"] == "FailState"
+    assert states["FeatureImportStatus"]["Choices"][0]["Next"] == "ReadFeaturesTablePointer"
+    # The pointer only moves forward: a re-run of an older date leaves it and the newer table alone
+    assert states["ReadFeaturesTablePointer"]["Next"] == "NewerFeaturesTable"
+    assert states["NewerFeaturesTable"]["Choices"] == [{
+        "Variable": "$.featuresTable.name",
+        "StringGreaterThanPath": "$.previousFeaturesTable.name",
+        "Next": "SwapFeaturesTablePointer"
+    }]
+    assert states["NewerFeaturesTable"]["Default"] == "FeatureImportDone"
+    # The dated table the pointer moved away from is deleted after a grace period, never the base table
+    assert states["SwapFeaturesTablePointer"]["Next"] == "RetirePreviousFeaturesTable"
+    retire = states["RetirePreviousFeaturesTable"]
+    assert retire["Choices"][0]["Next"] == "WaitBeforeRetiringFeaturesTable"
+    assert retire["Default"] == "FeatureImportDone"
+    assert states["WaitBeforeRetiringFeaturesTable"] == {
+        "Type": "Wait", "Seconds": 15 * 60, "Next": "DeletePreviousFeaturesTable"
+    }
+    assert states["DeletePreviousFeaturesTable"]["Resource"].endswith(":states:::aws-sdk:dynamodb:deleteTable")
+    assert states["FeatureImportDone"]["Next"] == "ModelTrainingJob"
+    # Dated tables carry the same indexes as the base table
+    index_names = [
+        index["IndexName"]
+        for index in states["StartFeatureImport"]["Parameters"]["TableCreationParameters"]["GlobalSecondaryIndexes"]
+    ]
+    assert index_names == ["date-shard-index"]
+
+
+def test_scratch_filesystem_mounted_into_jobs():
+    """Test that the EFS scratch volume is mounted into every job definition"""
+    app = _app({"sanders": {"dev": {"network": {"scratch_filesystem": True}}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.network)
+
+    template.has_resource_properties("AWS::EFS::FileSystem", {
+        "ThroughputMode": "elastic",
+        "Encrypted": True
+    })
+    template.has_resource_properties("AWS::EFS::AccessPoint", {
+        "RootDirectory": Match.object_like({"Path": "/scratch"})
+    })
+    template.has_resource_properties("AWS::EC2::SecurityGroupIngress", {
+        "FromPort": 2049,
+        "ToPort": 2049
+    })
+    # Infrequent Access only moves files; a nightly sweeper deletes idle run directories
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "FunctionName": "sanders-scratch-sweeper-dev",
+        "FileSystemConfigs": [Match.object_like({"LocalMountPath": "/mnt/scratch"})],
+        "Environment": {"Variables": {"SCRATCH_DIR": "/mnt/scratch", "RETENTION_DAYS": "3"}}
+    })
+    template.has_resource_properties("AWS::Events::Rule", {
+        "Name": "sanders-scratch-sweeper-dev",
+        "ScheduleExpression": "cron(0 3 * * ? *)"
+    })
+    compute_template = Template.from_stack(platform.compute)
+    compute_template.all_resources_properties("AWS::Batch::JobDefinition", {
+        "ContainerProperties": Match.object_like({
+            "Volumes": [Match.object_like({
+                "Name": "scratch",
+                "EfsVolumeConfiguration": Match.object_like({
+                    "TransitEncryption": "ENABLED",
+                    "AuthorizationConfig": Match.object_like({"Iam": "ENABLED"})
+                })
+            })],
+            "MountPoints": [{"ContainerPath": "/mnt/scratch", "SourceVolume": "scratch", "ReadOnly": False}]
+        })
+    })
+
+    training_job = _state_machine_definition(compute_template)["States"]["ModelTrainingJob"]
+    assert {"Name": "SANDERS_RUN_ID", "Value.$": "$$.Execution.Name"} in (
+        training_job["Parameters"]["ContainerOverrides"]["Environment"]
+    )
+
+
+def test_graviton_job_size():
+    """Test that ARM64 job sizes run on the Graviton Fargate runtime platform"""
+    app = _app({"sanders": {"dev": {"job_sizes": {
+        "8g-arm": {"cpu": "2", "memory": "8192", "cpu_architecture": "ARM64"}
+    }}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    template.has_resource_properties("AWS::Batch::JobDefinition", {
+        "JobDefinitionName": "sanders-job-8g-arm-dev",
+        "ContainerProperties": Match.object_like({
+            "RuntimePlatform": {"CpuArchitecture": "ARM64", "OperatingSystemFamily": "LINUX"}
+        })
+    })
+    template.has_resource_properties("AWS::Batch::JobDefinition", {
+        "JobDefinitionName": "sanders-job-8g-dev",
+        "ContainerProperties": Match.object_like({
+            "RuntimePlatform": {"CpuArchitecture": "X86_64", "OperatingSystemFamily": "LINUX"}
+        })
+    })
+
+
+def test_job_storage_settings():
+    """Test that ephemeral storage (Fargate) and tmpfs/shared memory (EC2) reach the job definitions"""
+    app = _app({"sanders": {"dev": {
+        "batch": {"ec2_spot_max_vcpus": 64},
+        "job_sizes": {"r8": {
+            "cpu": "2",
+            "memory": "16000",
+            "platform": "EC2",
+            "linux_parameters": {
+                "shared_memory_size": 2048,
+                "tmpfs": [{"container_path": "/shuffle", "size": 4096, "mount_options": ["noexec"]}]
+            }
+        }}
+    }}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    template.has_resource_properties("AWS::Batch::JobDefinition", {
+        "JobDefinitionName": "sanders-job-16g-dev",
+        "ContainerProperties": Match.object_like({"EphemeralStorage": {"SizeInGiB": 100}})
+    })
+    template.has_resource_properties("AWS::Batch::JobDefinition", {
+        "JobDefinitionName": "sanders-job-r8-dev",
+        "PlatformCapabilities": ["EC2"],
+        "ContainerProperties": Match.object_like({
+            "LinuxParameters": {
+                "SharedMemorySize": 2048,
+                "Tmpfs": [{"ContainerPath": "/shuffle", "Size": 4096, "MountOptions": ["noexec"]}]
+            }
+        })
+    })
+
+
+def test_ec2_nvme_training_tier():
+    """Test that the NVMe tier mounts instance storage and training can target its job definition"""
+    app = _app({"sanders": {"dev": {
+        "batch": {"ec2_nvme_max_vcpus": 64},
+        "stage_sizes": {"model_training": "training-nvme"}
+    }}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    template.has_resource_properties("AWS::Batch::ComputeEnvironment", {
+        "ComputeEnvironmentName": "sanders-batch-compute-ec2-nvme-dev",
+        "ComputeResources": Match.object_like({
+            "Type": "EC2",
+            "AllocationStrategy": "BEST_FIT_PROGRESSIVE",
+            "MaxvCpus": 64,
+            "InstanceTypes": ["r6id", "r5d", "x2iedn"],
+            "LaunchTemplate": Match.object_like({"LaunchTemplateId": Match.any_value()})
+        })
+    })
+    template.resource_count_is("AWS::EC2::LaunchTemplate", 1)
+    template.resource_count_is("AWS::IAM::InstanceProfile", 1)
+    template.has_resource_properties("AWS::Batch::JobDefinition", {
+        "JobDefinitionName": "sanders-job-training-nvme-dev",
+        "PlatformCapabilities": ["EC2"],
+        "ContainerProperties": Match.object_like({
+            "Volumes": [{"Name": "instance-store", "Host": {"SourcePath": "/mnt/instance-store"}}],
+            "MountPoints": [{
+                "ContainerPath": "/mnt/instance-store", "SourceVolume": "instance-store", "ReadOnly": False
+            }],
+            "Environment": Match.array_with([{"Name": "SANDERS_INSTANCE_STORE_DIR", "Value": "/mnt/instance-store"}])
+        })
+    })
+
+    queues = template.find_resources("AWS::Batch::JobQueue", {
+        "Properties": {"JobQueueName": "sanders-batch-nvme-queue-dev"}
+    })
+    assert len(queues) == 1
+    state_machine = next(iter(template.find_resources("AWS::StepFunctions::StateMachine").values()))
+    assert {"Fn::GetAtt": [next(iter(queues)), "JobQueueArn"]} in state_machine["Properties"]["DefinitionString"]["Fn::Join"][1]
+
+
+@pytest.mark.parametrize("batch_config", [
+    {"ec2_nvme_max_vcpus": 64, "ec2_nvme_instance_types": ["r6i"]},    # no instance store
+    {"ec2_nvme_max_vcpus": 0},                                          # training-nvme below needs the tier
+])
+def test_illegal_ec2_nvme_tier_rejected(batch_config):
+    """Test that instance types without NVMe disks, or instance storage sizes without the tier, fail"""
+    app = _app({"sanders": {"dev": {
+        "batch": batch_config,
+        "job_sizes": {"training-nvme": {"cpu": "16", "memory": "120000", "platform": "EC2", "instance_storage": True}}
+    }}})
+    with pytest.raises(ValueError):
+        SandersCustomerPlatform(app, environment="dev")
+
+
+def test_run_ledger_checkpoints():
+    """Test that the run ledger gates every stage and records its completion"""
+    app = _app({"sanders": {"dev": {"ledger": {"enabled": True}, "bulk_import": {"enabled": True}}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    Template.from_stack(platform.data).has_resource_properties("AWS::DynamoDB::Table", {
+        "TableName": "sanders_run_ledger_dev",
+        "KeySchema": [
+            {"AttributeName": "run_date", "KeyType": "HASH"},
+            {"AttributeName": "stage", "KeyType": "RANGE"}
+        ]
+    })
+
+    states = _state_machine_definition(template)["States"]
+    branches = states["ParallelJobs"]["Branches"]
+    assert branches[0]["StartAt"] == "FeatureExtractionCheckpoint"
+    assert branches[1]["StartAt"] == "DataProcessingCheckpoint"
+    assert states["ParallelJobs"]["Next"] == "FeatureImportCheckpoint"
+    assert states["FeatureImportRecord"]["Next"] == "ModelTrainingCheckpoint"
+
+    check = states["ModelTrainingCheckpoint"]
+    assert check["Resource"].endswith(":states:::dynamodb:getItem")
+    assert check["Parameters"]["Key"] == {"run_date": {"S.$": "$.run_date"}, "stage": {"S": "model_training"}}
+    assert check["Parameters"]["ConsistentRead"] is True
+
+    completed = states["ModelTrainingCompleted"]
+    assert completed["Choices"][0]["Next"] == "ModelTrainingSkipped"
+    assert completed["Default"] == "ModelTrainingJob"
+    assert states["ModelTrainingJob"]["Next"] == "ModelTrainingRecord"
+    assert states["ModelTrainingRecord"]["Parameters"]["Item"]["status"] == {"S": "COMPLETED"}
+    for state_id in ("ModelTrainingSkipped", "ModelTrainingRecord"):
+        assert states[state_id]["Next"] == "SuccessState"
+    for state_id in ("ModelTrainingCheckpoint", "ModelTrainingRecord"):
+        assert states[state_id]["Catch"][0]["Next"] == "FailState"
+    assert states["ModelTrainingRecord"]["Parameters"]["Item"]["run_id"] == {"S.$": "$$.Execution.Name"}
+
+
+def test_backfill_ledger_records_run_id():
+    """Test that backfill dates record the run id their jobs ran under, not the child execution name"""
+    app = _app({"sanders": {"dev": {"ledger": {"enabled": True}, "backfill": {"enabled": True}}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    state_machines = template.find_resources("AWS::StepFunctions::StateMachine", {
+        "Properties": {"StateMachineName": "sanders-backfill-dev"}
+    })
+    definition = json.loads("".join(
+        part if isinstance(part, str) else "TOKEN"
+        for part in next(iter(state_machines.values()))["Properties"]["DefinitionString"]["Fn::Join"][1]
+    ))
+    date_map = next(state for state in definition["States"].values() if "ItemProcessor" in state)
+    record = date_map["ItemProcessor"]["States"]["ModelTrainingRecord"]
+    assert record["Parameters"]["Item"]["run_id"] == {"S.$": "$.run_id"}
+
+
+def test_stage_memoization():
+    """Test that memoized stages fingerprint their input and reuse matching results"""
+    app = _app({"sanders": {"dev": {"memoization": {
+        "enabled": True,
+        "stages": {"feature_extraction": "input_prefix", "model_training": "features_prefix"}
+    }}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    Template.from_stack(platform.data).has_resource_properties("AWS::DynamoDB::Table", {
+        "TableName": "sanders_stage_memo_dev",
+        "KeySchema": [{"AttributeName": "memo_key", "KeyType": "HASH"}],
+        "TimeToLiveSpecification": {"AttributeName": "expires_at", "Enabled": True}
+    })
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "FunctionName": "sanders-input-fingerprint-dev",
+        "Runtime": "python3.12"
+    })
+
+    states = _state_machine_definition(template)["States"]
+    feature_branch = states["ParallelJobs"]["Branches"][0]
+    assert feature_branch["StartAt"] == "FeatureExtractionFingerprint"
+    assert states["ParallelJobs"]["Branches"][1]["StartAt"] == "DataProcessingJob"
+
+    assert states["ParallelJobs"]["Next"] == "ModelTrainingFingerprint"
+    # Keyed by stage and partition; the job definition revision and command are hashed with the input
+    assert states["ModelTrainingFingerprint"]["Parameters"]["Payload"] == {
+        "stage": "model_training",
+        "prefix.$": "$.features_prefix",
+        "item.$": "$",
+        "partition_field": "partition",
+        "job_definition": "TOKEN",
+        "command.$": "$.command"
+    }
+    unchanged = states["ModelTrainingUnchanged"]
+    assert unchanged["Choices"][0]["Next"] == "ModelTrainingReused"
+    assert {
+        "Variable": "$.trainingJobMemo.Item.input_hash.S",
+        "StringEqualsPath": "$.trainingJobFingerprint.input_hash"
+    } in unchanged["Choices"][0]["And"]
+    assert unchanged["Default"] == "ModelTrainingJob"
+    assert states["ModelTrainingJob"]["Next"] == "ModelTrainingMemoRecord"
+    assert states["ModelTrainingMemoRecord"]["Parameters"]["Item"]["expires_at"] == {
+        "N.$": "$.trainingJobFingerprint.expires_at"
+    }
+    # Reused stages point at the run id the recorded jobs wrote their outputs under
+    assert states["ModelTrainingMemoRecord"]["Parameters"]["Item"]["run_id"] == {"S.$": "$$.Execution.Name"}
+    for state_id in ("ModelTrainingFingerprint", "ModelTrainingMemoLookup", "ModelTrainingMemoRecord"):
+        assert states[state_id]["Catch"][0]["Next"] == "FailState"
+
+
+def test_sharded_stage_memoization():
+    """Test that sharded feature extraction memoizes each shard on its own input prefix"""
+    app = _app({"sanders": {"dev": {
+        "sharding": {"enabled": True},
+        "memoization": {"enabled": True}
+    }}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    feature_branch = _state_machine_definition(template)["States"]["ParallelJobs"]["Branches"][0]
+    processor = feature_branch["States"]["FeatureExtractionShards"]["ItemProcessor"]
+    assert processor["StartAt"] == "FeatureExtractionShardFingerprint"
+    assert processor["States"]["FeatureExtractionShardFingerprint"]["Parameters"]["Payload"]["prefix.$"] == (
+        "$.shard.input_prefix"
+    )
+    assert processor["States"]["FeatureExtractionShardJob"]["Next"] == "FeatureExtractionShardMemoRecord"
+    # Shards run as child executions, so they record the parent's run id from the shard item
+    assert processor["States"]["FeatureExtractionShardMemoRecord"]["Parameters"]["Item"]["run_id"] == {
+        "S.$": "$.run_id"
+    }
+
+
+def test_memoization_fingerprints_routed_size():
+    """Test that size-routed stages hash the job definition of the tier that runs"""
+    app = _app({"sanders": {"dev": {
+        "size_routing": {"enabled": True, "stages": {"feature_extraction": [{"max": 1024, "size": "2g"}]}},
+        "memoization": {"enabled": True}
+    }}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    template_json = template.to_json()
+    state_machine = next(iter(template.find_resources("AWS::StepFunctions::StateMachine").values()))
+    parts = state_machine["Properties"]["DefinitionString"]["Fn::Join"][1]
+    definitions = {
+        resource_id: resource["Properties"]["JobDefinitionName"]
+        for resource_id, resource in template_json["Resources"].items()
+        if resource["Type"] == "AWS::Batch::JobDefinition"
+    }
+
+    def job_definition_after(marker: str) -> str:
+        """Job definition name referenced in the payload of the named fingerprint state"""
+        start = next(index for index, part in enumerate(parts) if isinstance(part, str) and marker in part)
+        return next(
+            definitions[part["Ref"]] for part in parts[start:]
+            if isinstance(part, dict) and part.get("Ref") in definitions
+        )
+
+    states = _state_machine_definition(template)["States"]["ParallelJobs"]["Branches"][0]["States"]
+    assert states["FeatureExtractionJobSize"]["Choices"][0]["Next"] == "FeatureExtraction2GFingerprint"
+    assert states["FeatureExtractionJobSize"]["Default"] == "FeatureExtractionFingerprint"
+    assert job_definition_after('"FeatureExtraction2GFingerprint":').endswith("-2g-dev")
+    assert job_definition_after('"FeatureExtractionFingerprint":').endswith("-8g-dev")
+
+
+def test_fair_share_scheduling():
+    """Test that fair share adds a scheduling policy, a priority queue and share-tagged jobs"""
+    app = _app({"sanders": {"dev": {"fair_share": {"enabled": True}, "sharding": {"enabled": True}}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    template.has_resource_properties("AWS::Batch::SchedulingPolicy", {
+        "Name": "sanders-fair-share-dev",
+        "FairsharePolicy": Match.object_like({
+            "ShareDistribution": Match.array_with([
+                {"ShareIdentifier": "daily", "WeightFactor": 0.5},
+                {"ShareIdentifier": "backfill", "WeightFactor": 2}
+            ])
+        })
+    })
+    template.resource_count_is("AWS::Batch::JobQueue", 2)
+    template.all_resources_properties("AWS::Batch::JobQueue", {
+        "SchedulingPolicyArn": Match.any_value()
+    })
+    template.has_resource_properties("AWS::Batch::JobQueue", {
+        "JobQueueName": "sanders-batch-priority-queue-dev",
+        "Priority": 10
+    })
+
+    states = _state_machine_definition(template)["States"]
+    branches = states["ParallelJobs"]["Branches"]
+    processor = branches[0]["States"]["FeatureExtractionShards"]["ItemProcessor"]
+    for job in (
+        processor["States"]["FeatureExtractionShardJob"],
+        branches[1]["States"]["DataProcessingJob"],
+        states["ModelTrainingJob"]
+    ):
+        assert job["Parameters"]["ShareIdentifier"] == "daily"
+
+
+def test_fair_share_rejects_unknown_pipeline_share():
+    """Test that the pipeline share must be one of the policy's share identifiers"""
+    app = _app({"sanders": {"dev": {"fair_share": {"enabled": True, "pipeline_share": "nightly"}}}})
+    with pytest.raises(ValueError):
+        SandersCustomerPlatform(app, environment="dev")
+
+
+def test_backfill_state_machine():
+    """Test that backfill runs the pipeline per date with concurrency bounded by the queue's vCPUs"""
+    app = _app({"sanders": {"dev": {
+        "backfill": {"enabled": True},
+        "fair_share": {"enabled": True}
+    }}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    template = Template.from_stack(platform.compute)
+
+    template.resource_count_is("AWS::StepFunctions::StateMachine", 2)
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "FunctionName": "sanders-backfill-dates-dev"
+    })
+    template.has_output("BackfillStateMachineARN", {})
+
+    backfill = next(
+        resource for resource in template.find_resources("AWS::StepFunctions::StateMachine").values()
+        if resource["Properties"]["StateMachineName"] == "sanders-backfill-dev"
+    )
+    definition_template = Template.from_json({"Resources": {"Backfill": backfill}})
+    states = _state_machine_definition(definition_template)["States"]
+    assert states["BackfillDates"]["Next"] == "BackfillRuns"
+
+    date_map = states["BackfillRuns"]
+    assert date_map["ItemsPath"] == "$.backfill.runs"
+    # 16 on-demand + 16 Fargate Spot vCPUs / 4 vCPUs (16g training, or 8g + 2g side by side)
+    assert date_map["MaxConcurrency"] == 8
+    assert date_map["ResultWriter"]["Parameters"]["Prefix"] == "backfill-results/"
+
+    pipeline = date_map["ItemProcessor"]["States"]
+    training_job = pipeline["ModelTrainingJob"]
+    assert training_job["Parameters"]["ShareIdentifier"] == "backfill"
+    # Every per-date job learns the date its run covers
+    branch_jobs = [
+        state for branch in pipeline["ParallelJobs"]["Branches"] for state in branch["States"].values()
+    ]
+    assert len(branch_jobs) == 2
+    for job in [training_job] + branch_jobs:
+        environment = job["Parameters"]["ContainerOverrides"]["Environment"]
+        assert {"Name": "SANDERS_RUN_ID", "Value.$": "$.run_id"} in environment
+        assert {"Name": "SANDERS_RUN_DATE", "Value.$": "$.run_date"} in environment
+
+
+def test_backfill_with_bulk_import_rejected():
+    """Test that backfill refuses bulk import, whose concurrent dates would race on the table pointer"""
+    app = _app({"sanders": {"dev": {
+        "backfill": {"enabled": True},
+        "bulk_import": {"enabled": True}
+    }}})
+    with pytest.raises(ValueError):
+        SandersCustomerPlatform(app, environment="dev")
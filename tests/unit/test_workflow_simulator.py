@@ -0,0 +1,89 @@
+"""
+Tests for the local workflow simulator against the synthesized dev state machine
+"""
+import sys
+import pytest
+import aws_cdk as cdk
+from aws_cdk.assertions import Template
+from cdk.sanders_customer_platform import SandersCustomerPlatform
+from tools.workflow_simulator import StatesError, WorkflowSimulator, evaluate_rule
+
+
+def _command(code: str) -> list:
+    return [sys.executable, "-c", code]
+
+
+def test_simulated_pipeline_succeeds(dev_templates):
+    """Test that the default DAG runs every stage and the critical path ends with training"""
+    simulator = WorkflowSimulator(dev_templates["compute"].to_json(), max_vcpus=8)
+    result = simulator.run({"command": _command("import time; time.sleep(0.1)")})
+
+    assert result.status == "SUCCEEDED", result.format_report()
+    assert {"FeatureExtractionJob", "DataProcessingJob", "ModelTrainingJob"} <= {
+        step.state for step in result.steps
+    }
+    critical = [step.state for step in result.critical_path]
+    assert critical[0] == "ParallelJobs"
+    assert critical[-2:] == ["ModelTrainingJob", "SuccessState"]
+    assert result.output["trainingJob"]["Status"] == "SUCCEEDED"
+
+
+def test_simulated_jobs_contend_for_vcpus(dev_templates):
+    """Test that parallel stages queue when the local pool cannot fit both job definitions"""
+    simulator = WorkflowSimulator(dev_templates["compute"].to_json(), max_vcpus=2)
+    result = simulator.run({"command": _command("import time; time.sleep(0.3)")})
+
+    parallel_jobs = [step for step in result.steps if step.state in ("FeatureExtractionJob", "DataProcessingJob")]
+    assert {step.vcpus for step in parallel_jobs} == {2.0, 0.5}
+    assert max(step.queue_wait for step in parallel_jobs) >= 0.2
+
+
+def test_simulated_job_failure_is_caught(dev_templates):
+    """Test that a failing command is caught by the Parallel state and ends in FailState"""
+    simulator = WorkflowSimulator(dev_templates["compute"].to_json(), max_vcpus=8)
+    result = simulator.run({"command": _command("raise SystemExit(3)")})
+
+    assert result.status == "FAILED"
+    assert result.error == "JobFailed"
+    assert result.steps[-1].state == "FailState"
+    assert "ModelTrainingJob" not in {step.state for step in result.steps}
+
+
+def test_choice_on_missing_variable_fails():
+    """Test that a Choice rule on a missing variable fails with States.Runtime, as in Step Functions"""
+    rule = {"Variable": "$.array_size", "NumericGreaterThanEquals": 2, "Next": "ArrayJob"}
+    with pytest.raises(StatesError) as error:
+        evaluate_rule(rule, {"command": []}, {})
+    assert error.value.error == "States.Runtime"
+
+    guarded = {"And": [{"Variable": "$.array_size", "IsPresent": True}, rule]}
+    assert evaluate_rule(guarded, {"command": []}, {}) is False
+
+
+def test_simulated_array_jobs_without_array_size():
+    """Test that array mode runs single jobs when the execution input has no array size"""
+    app = cdk.App(context={"image_tag": "test-build", "sanders": {"dev": {"array_jobs": {"enabled": True}}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    simulator = WorkflowSimulator(Template.from_stack(platform.compute).to_json(), max_vcpus=8)
+    result = simulator.run({"command": _command("pass")})
+
+    assert result.status == "SUCCEEDED", result.format_report()
+    states = {step.state for step in result.steps}
+    assert {"DefaultArraySize", "FeatureExtractionJobSingle", "DataProcessingJobSingle"} <= states
+    assert "FeatureExtractionJob" not in states
+
+
+def test_simulated_bulk_import():
+    """Test that the bulk import stage runs end to end on the default SDK stubs"""
+    app = cdk.App(context={"image_tag": "test-build", "sanders": {"dev": {"bulk_import": {"enabled": True}}}})
+    platform = SandersCustomerPlatform(app, environment="dev")
+    simulator = WorkflowSimulator(Template.from_stack(platform.compute).to_json(), max_vcpus=8)
+    result = simulator.run({"command": _command("pass"), "run_date": "2026-02-07"})
+
+    assert result.status == "SUCCEEDED", result.format_report()
+    states = [step.state for step in result.steps]
+    assert states.index("StartFeatureImport") < states.index("SwapFeaturesTablePointer") < (
+        states.index("ModelTrainingJob")
+    )
+    assert "DeletePreviousFeaturesTable" not in states
+    assert result.output["featuresTable"]["name"] == "sanders_daily_customer_features_dev_2026-02-07"
@@ -0,0 +1,576 @@
+"""
+Synth-time capacity and critical-path estimator for the Sanders Customer Platform pipeline
+Walks the synthesized state machine in virtual time with a runtime profile
+per stage, scheduling every Batch job against the vCPUs of the compute
+environments behind its queue (in queue order, first fit in submission
+order), and reports the expected wall clock, peak vCPU, queueing delay,
+vCPU-hours and Fargate cost; no AWS access and no processes are needed, e.g.
+
+    python -m tools.capacity_estimator --environment prod --max-vcpus 16 --deadline-minutes 120 \\
+        --profile '{"stages": {"feature-extraction": 1800, "data-processing": 600, "model-training": 3600}}'
+
+Profile: {"stages": {<job name or state name>: seconds per job},
+          "results": {<state name>: what the state writes at its ResultPath}}
+Choices see the execution input plus any results given in the profile
+"""
+import argparse
+import heapq
+import itertools
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+
+from tools.workflow_simulator import (
+    BATCH_SUBMIT_JOB,
+    SimulationError,
+    StatesError,
+    StepTiming,
+    _json_argument,
+    _synthesize,
+    critical_path,
+    evaluate_intrinsic,
+    evaluate_rule,
+    read_path,
+    render_definition,
+    state_machines,
+    write_path
+)
+
+
+# eu-central-1 Fargate on-demand list prices (USD); pass prices= for other regions
+FARGATE_PRICES = {
+    "X86_64": {"vcpu_hour": 0.04656, "gib_hour": 0.00511},
+    "ARM64": {"vcpu_hour": 0.03725, "gib_hour": 0.00409}
+}
+
+# Typical Fargate Spot discount; the actual price moves with spare capacity
+FARGATE_SPOT_DISCOUNT = 0.7
+
+# A state entered more often than this in one branch is treated as an endless polling loop
+MAX_STATE_VISITS = 100
+
+
+@dataclass
+class ComputeEnvironment:
+    name: str
+    type: str
+    max_vcpus: float
+    used: float = 0.0
+
+
+@dataclass
+class JobEstimate:
+    """One Batch submission; array jobs count all their children"""
+    state: str
+    job_name: str
+    job_definition: str
+    vcpus: float
+    memory_gib: float
+    count: int
+    seconds: float
+    submitted: float
+    started: float = 0.0
+    finished: float = 0.0
+    queue_delay: float = 0.0        # Longest wait of any child for capacity
+    vcpu_hours: float = 0.0
+    gib_hours: float = 0.0
+    cost: float = 0.0
+    unpriced_vcpu_hours: float = 0.0    # EC2 capacity, priced by instance outside this estimate
+
+
+@dataclass
+class CapacityEstimate:
+    status: str
+    wall_clock_seconds: float
+    peak_vcpus: float
+    capacity_vcpus: float
+    jobs: List[JobEstimate]
+    trace: List[StepTiming]
+    error: Optional[str] = None
+
+    @property
+    def queue_delay_seconds(self) -> float:
+        """Longest wait of any job for capacity"""
+        return max((job.queue_delay for job in self.jobs), default=0.0)
+
+    @property
+    def vcpu_hours(self) -> float:
+        return sum(job.vcpu_hours for job in self.jobs)
+
+    @property
+    def cost(self) -> float:
+        return sum(job.cost for job in self.jobs)
+
+    @property
+    def critical_path(self) -> List[StepTiming]:
+        return critical_path(self.trace)
+
+    def fits(self, deadline_seconds: float) -> bool:
+        return self.status == "SUCCEEDED" and self.wall_clock_seconds <= deadline_seconds
+
+    def format_report(self) -> str:
+        lines = [
+            f"Estimated {self.status} in {self.wall_clock_seconds / 60:.1f} min "
+            f"(peak {self.peak_vcpus:g} of {self.capacity_vcpus:g} vCPU)",
+            f"  longest queue delay {self.queue_delay_seconds / 60:.1f} min, "
+            f"{self.vcpu_hours:.2f} vCPU-hours, ${self.cost:.2f}"
+        ]
+        unpriced = sum(job.unpriced_vcpu_hours for job in self.jobs)
+        if unpriced:
+            lines.append(f"  {unpriced:.2f} vCPU-hours on EC2 are not priced")
+        if self.error:
+            lines.append(f"  {self.error}")
+        lines.append("")
+        width = max([len("job")] + [len(job.state) for job in self.jobs])
+        lines.append(
+            f"{'job':<{width}} {'size':<20} {'count':>5} {'vcpus':>6} {'submit':>8} {'start':>8} {'end':>8} {'cost':>8}"
+        )
+        for job in self.jobs:
+            lines.append(
+                f"{job.state:<{width}} {job.job_definition:<20} {job.count:>5} {job.vcpus:>6g} "
+                f"{job.submitted / 60:>8.1f} {job.started / 60:>8.1f} {job.finished / 60:>8.1f} {job.cost:>8.2f}"
+            )
+        critical = [step for step in self.critical_path if step.type in ("Task", "Parallel", "Map")]
+        lines.append("")
+        lines.append("Critical path: " + " -> ".join(step.state for step in critical))
+        return "\n".join(lines)
+
+
+class _Failure:
+    def __init__(self, error: str, cause: str = "") -> None:
+        self.error = error
+        self.cause = cause
+
+
+class _Pool:
+    """Compute environments behind a queue, filled in queue order"""
+
+    def __init__(self, engine: "_Engine", environments: List[ComputeEnvironment]) -> None:
+        self.engine = engine
+        self.environments = environments
+        self.pending: List[Tuple[float, Callable[[ComputeEnvironment], None]]] = []
+
+    @property
+    def capacity(self) -> float:
+        return sum(environment.max_vcpus for environment in self.environments)
+
+    def submit(self, vcpus: float, start: Callable[[ComputeEnvironment], None]) -> None:
+        if vcpus > max(environment.max_vcpus for environment in self.environments):
+            raise ValueError(
+                f"A {vcpus:g} vCPU job never fits in compute environments of "
+                f"{[environment.max_vcpus for environment in self.environments]} vCPUs"
+            )
+        self.pending.append((vcpus, start))
+        self.schedule()
+
+    def release(self, environment: ComputeEnvironment, vcpus: float) -> None:
+        environment.used -= vcpus
+        self.engine.allocated -= vcpus
+        self.schedule()
+
+    def schedule(self) -> None:
+        waiting = []
+        for vcpus, start in self.pending:
+            environment = next(
+                (environment for environment in self.environments if environment.max_vcpus - environment.used >= vcpus),
+                None
+            )
+            if environment is None:
+                waiting.append((vcpus, start))
+                continue
+            environment.used += vcpus
+            self.engine.allocated += vcpus
+            self.engine.peak = max(self.engine.peak, self.engine.allocated)
+            start(environment)
+        self.pending = waiting
+
+
+class _Engine:
+    """Discrete-event loop driving the state machine's branches as generators"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.allocated = 0.0
+        self.peak = 0.0
+        self._events: List[Tuple[float, int, Callable[[], None]]] = []
+        self._sequence = itertools.count()
+
+    def at(self, time: float, callback: Callable[[], None]) -> None:
+        heapq.heappush(self._events, (time, next(self._sequence), callback))
+
+    def run(self) -> None:
+        while self._events:
+            self.now, _, callback = heapq.heappop(self._events)
+            callback()
+
+    def spawn(self, process: Generator, done: Callable[[Any], None]) -> None:
+        self._step(process, None, done)
+
+    def _step(self, process: Generator, value: Any, done: Callable[[Any], None]) -> None:
+        try:
+            action = process.send(value)
+        except StopIteration as stop:
+            done(stop.value)
+            return
+        action(lambda result=None: self._step(process, result, done))
+
+
+class CapacityEstimator:
+    """
+    Estimate a pipeline run from a synthesized compute stack template
+    max_vcpus caps each queue's capacity, filling its compute environments in order
+    """
+
+    def __init__(
+        self,
+        template: dict,
+        state_machine: Optional[str] = None,
+        max_vcpus: Optional[float] = None,
+        prices: Optional[Dict[str, Dict[str, float]]] = None,
+        spot_discount: float = FARGATE_SPOT_DISCOUNT
+    ) -> None:
+        machines = state_machines(template)
+        if not machines:
+            raise SimulationError("The template has no state machine")
+        if state_machine is None:
+            state_machine = next((name for name in machines if "orchestrator" in name), next(iter(machines)))
+        if state_machine not in machines:
+            raise SimulationError(f"Unknown state machine '{state_machine}', expected one of {sorted(machines)}")
+
+        self.definition = render_definition(machines[state_machine]["Properties"]["DefinitionString"])
+        resources = template.get("Resources", {})
+        self.job_definitions = {
+            logical_id: resource["Properties"]
+            for logical_id, resource in resources.items()
+            if resource["Type"] == "AWS::Batch::JobDefinition"
+        }
+        self.compute_environments = {
+            logical_id: resource["Properties"]
+            for logical_id, resource in resources.items()
+            if resource["Type"] == "AWS::Batch::ComputeEnvironment"
+        }
+        self.queues = {
+            logical_id: [
+                self._logical_id(entry["ComputeEnvironment"])
+                for entry in sorted(resource["Properties"]["ComputeEnvironmentOrder"], key=lambda entry: entry["Order"])
+            ]
+            for logical_id, resource in resources.items()
+            if resource["Type"] == "AWS::Batch::JobQueue"
+        }
+        self.max_vcpus = max_vcpus
+        self.prices = prices or FARGATE_PRICES
+        self.spot_discount = spot_discount
+
+    @staticmethod
+    def _logical_id(reference: Any) -> str:
+        if isinstance(reference, dict):
+            return reference["Ref"] if "Ref" in reference else reference["Fn::GetAtt"][0]
+        return reference
+
+    def estimate(self, profile: dict, execution_input: Optional[dict] = None) -> CapacityEstimate:
+        self._engine = _Engine()
+        self._profile = profile
+        self._pools: Dict[Tuple[str, ...], _Pool] = {}
+        self._jobs: List[JobEstimate] = []
+        trace: List[StepTiming] = []
+        data = execution_input or {}
+        context = {"Execution": {"Name": "estimate", "Input": data}}
+        outcome = []
+        self._engine.spawn(self._run_states(self.definition, data, context, trace, ""), outcome.append)
+        self._engine.run()
+
+        failure = outcome[0] if outcome and isinstance(outcome[0], _Failure) else None
+        capacity = max((pool.capacity for pool in self._pools.values()), default=0.0)
+        return CapacityEstimate(
+            status="FAILED" if failure else "SUCCEEDED",
+            wall_clock_seconds=self._engine.now,
+            peak_vcpus=self._engine.peak,
+            capacity_vcpus=capacity,
+            jobs=self._jobs,
+            trace=trace,
+            error=f"{failure.error}: {failure.cause}" if failure else None
+        )
+
+    # ===== Actions the state generators yield =====
+
+    def _delay(self, seconds: float) -> Callable:
+        return lambda resume: self._engine.at(self._engine.now + seconds, resume)
+
+    def _fork(self, processes: List[Callable[[], Generator]], max_concurrency: int = 0) -> Callable:
+        def action(resume):
+            results: List[Any] = [None] * len(processes)
+            if not processes:
+                resume(results)
+                return
+            remaining = [len(processes)]
+            queued = iter(range(len(processes)))
+
+            def start_next():
+                index = next(queued, None)
+                if index is not None:
+                    self._engine.spawn(processes[index](), lambda result, index=index: finished(index, result))
+
+            def finished(index, result):
+                results[index] = result
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    resume(results)
+                else:
+                    start_next()
+
+            for _ in range(max_concurrency or len(processes)):
+                start_next()
+        return action
+
+    def _submit(self, name: str, parameters: dict, step: StepTiming) -> Callable:
+        job_definition = self.job_definitions.get(parameters.get("JobDefinition"))
+        if job_definition is None:
+            raise SimulationError(f"State {name} submits a job definition not in the template")
+        container = job_definition["ContainerProperties"]
+        requirements = {item["Type"]: item["Value"] for item in container.get("ResourceRequirements", [])}
+        job_name = parameters.get("JobName") or name
+        seconds = self._stage_seconds(job_name, name)
+        if seconds is None:
+            raise ValueError(f"The profile has no runtime for job '{job_name}' (state {name})")
+
+        count = int((parameters.get("ArrayProperties") or {}).get("Size") or 1)
+        architecture = (container.get("RuntimePlatform") or {}).get("CpuArchitecture", "X86_64")
+        job = JobEstimate(
+            state=step.path,
+            job_name=job_name,
+            job_definition=job_definition.get("JobDefinitionName", parameters["JobDefinition"]),
+            vcpus=float(requirements.get("VCPU", 1)),
+            memory_gib=int(requirements.get("MEMORY", 2048)) / 1024,
+            count=count,
+            seconds=seconds,
+            submitted=self._engine.now
+        )
+        self._jobs.append(job)
+        step.vcpus = job.vcpus
+        pool = self._pool(parameters.get("JobQueue"))
+
+        def action(resume):
+            remaining = [count]
+            started = []
+
+            def start(environment):
+                started.append(self._engine.now)
+                job.queue_delay = max(job.queue_delay, self._engine.now - job.submitted)
+                self._charge(job, environment, architecture)
+                self._engine.at(self._engine.now + seconds, lambda: finish(environment))
+
+            def finish(environment):
+                pool.release(environment, job.vcpus)
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    job.started = min(started)
+                    job.finished = self._engine.now
+                    step.queue_wait = job.started - job.submitted
+                    resume({"JobName": job_name, "Status": "SUCCEEDED"})
+
+            for _ in range(count):
+                pool.submit(job.vcpus, start)
+        return action
+
+    def _stage_seconds(self, job_name: str, state_name: str) -> Optional[float]:
+        stages = self._profile.get("stages", {})
+        for key in (state_name, job_name):
+            if key in stages:
+                return float(stages[key])
+        return None
+
+    def _pool(self, queue: Optional[str]) -> _Pool:
+        environments = tuple(self.queues.get(queue, ()))
+        if not environments:
+            raise SimulationError(f"Job queue {queue} is not in the template")
+        if environments not in self._pools:
+            budget = self.max_vcpus
+            members = []
+            for logical_id in environments:
+                resources = self.compute_environments[logical_id]["ComputeResources"]
+                max_vcpus = float(resources["MaxvCpus"])
+                if budget is not None:
+                    max_vcpus = min(max_vcpus, budget)
+                    budget -= max_vcpus
+                members.append(ComputeEnvironment(logical_id, resources["Type"], max_vcpus))
+            self._pools[environments] = _Pool(self._engine, [member for member in members if member.max_vcpus > 0])
+        return self._pools[environments]
+
+    def _charge(self, job: JobEstimate, environment: ComputeEnvironment, architecture: str) -> None:
+        hours = job.seconds / 3600
+        job.vcpu_hours += job.vcpus * hours
+        job.gib_hours += job.memory_gib * hours
+        if not environment.type.startswith("FARGATE"):
+            job.unpriced_vcpu_hours += job.vcpus * hours
+            return
+        price = self.prices[architecture]
+        cost = job.vcpus * hours * price["vcpu_hour"] + job.memory_gib * hours * price["gib_hour"]
+        if environment.type == "FARGATE_SPOT":
+            cost *= 1 - self.spot_discount
+        job.cost += cost
+
+    # ===== States =====
+
+    def _run_states(self, machine: dict, data: Any, context: dict, trace: List[StepTiming], prefix: str) -> Generator:
+        name = machine["StartAt"]
+        visits: Dict[str, int] = {}
+        while True:
+            state = machine["States"][name]
+            visits[name] = visits.get(name, 0) + 1
+            if visits[name] > MAX_STATE_VISITS:
+                raise SimulationError(
+                    f"State {name} was entered {MAX_STATE_VISITS} times; give its loop a result in the profile"
+                )
+            step = StepTiming(path=f"{prefix}{name}", state=name, type=state["Type"], start=self._engine.now)
+            trace.append(step)
+            kind = state["Type"]
+            next_name = None if state.get("End") else state.get("Next")
+
+            if kind == "Succeed":
+                step.end = self._engine.now
+                return data
+            if kind == "Fail":
+                step.end = self._engine.now
+                step.status = "FAILED"
+                return _Failure(state.get("Error", "States.Fail"), state.get("Cause", ""))
+            if kind == "Choice":
+                next_name = next(
+                    (rule["Next"] for rule in state["Choices"] if self._matches_rule(rule, data, context)),
+                    state.get("Default")
+                )
+                if next_name is None:
+                    step.end = self._engine.now
+                    return _Failure("States.NoChoiceMatched", f"No choice in {name} matched")
+            elif kind == "Wait":
+                yield self._delay(state.get("Seconds", 0))
+            elif kind == "Pass":
+                data = write_path(state.get("ResultPath", "$"), data, state.get("Result", data))
+            elif kind in ("Task", "Parallel", "Map"):
+                result = yield from self._run_work(name, state, data, context, step)
+                if isinstance(result, _Failure):
+                    catcher = next(
+                        (catcher for catcher in state.get("Catch", [])
+                         if "States.ALL" in catcher["ErrorEquals"] or result.error in catcher["ErrorEquals"]),
+                        None
+                    )
+                    step.end = self._engine.now
+                    if catcher is None:
+                        step.status = "FAILED"
+                        return result
+                    step.status = "CAUGHT"
+                    data = write_path(catcher.get("ResultPath", "$"), data, {"Error": result.error, "Cause": result.cause})
+                    name = catcher["Next"]
+                    continue
+                data = write_path(state.get("ResultPath", "$"), data, result)
+            else:
+                raise SimulationError(f"State type {kind} is not supported")
+
+            step.end = self._engine.now
+            if next_name is None:
+                return data
+            name = next_name
+
+    def _run_work(self, name: str, state: dict, data: Any, context: dict, step: StepTiming) -> Generator:
+        kind = state["Type"]
+        if kind == "Parallel":
+            step.branches = [[] for _ in state["Branches"]]
+            results = yield self._fork([
+                lambda branch=branch, index=index: self._run_states(
+                    branch, data, context, step.branches[index], f"{step.path}/"
+                )
+                for index, branch in enumerate(state["Branches"])
+            ])
+            return next((result for result in results if isinstance(result, _Failure)), results)
+
+        if kind == "Map":
+            if "ItemReader" in state:
+                raise SimulationError(f"Map {name} reads its items from S3; pass them in the execution input")
+            items = self._tolerant(lambda: read_path(state.get("ItemsPath", "$"), data, context)) or []
+            processor = state.get("ItemProcessor") or state["Iterator"]
+            selector = state.get("ItemSelector") or state.get("Parameters")
+            step.branches = [[] for _ in items]
+
+            def iteration(index):
+                item_context = {**context, "Map": {"Item": {"Index": index, "Value": items[index]}}}
+                item = self._resolve(selector, data, item_context) if selector else items[index]
+                return self._run_states(processor, item, item_context, step.branches[index], f"{step.path}[{index}]/")
+
+            results = yield self._fork(
+                [lambda index=index: iteration(index) for index in range(len(items))],
+                state.get("MaxConcurrency", 0)
+            )
+            failures = [result for result in results if isinstance(result, _Failure)]
+            if failures and len(failures) * 100 > state.get("ToleratedFailurePercentage", 0) * len(items):
+                return failures[0]
+            return results
+
+        parameters = self._resolve(state.get("Parameters", {}), data, context)
+        resource = state["Resource"].split(":states:::", 1)[-1]
+        if resource == BATCH_SUBMIT_JOB:
+            result = yield self._submit(name, parameters, step)
+        else:
+            yield self._delay(self._stage_seconds(name, name) or 0)
+            result = {}
+        if "ResultSelector" in state:
+            result = self._resolve(state["ResultSelector"], result, context)
+        # Profile results stand for what the state writes at its ResultPath
+        return self._profile.get("results", {}).get(name, result)
+
+    def _matches_rule(self, rule: dict, data: Any, context: dict) -> bool:
+        return bool(self._tolerant(lambda: evaluate_rule(rule, data, context)))
+
+    @staticmethod
+    def _tolerant(read: Callable[[], Any]) -> Any:
+        try:
+            return read()
+        except StatesError:
+            return None
+
+    def _resolve(self, template: Any, data: Any, context: dict) -> Any:
+        # Fields whose paths are missing (e.g. $.command) resolve to None; only sizes and names matter here
+        if isinstance(template, dict):
+            resolved = {}
+            for key, value in template.items():
+                if key.endswith(".$"):
+                    resolved[key[:-2]] = self._tolerant(
+                        lambda: evaluate_intrinsic(value, data, context) if value.startswith("States.")
+                        else read_path(value, data, context)
+                    )
+                else:
+                    resolved[key] = self._resolve(value, data, context)
+            return resolved
+        if isinstance(template, list):
+            return [self._resolve(value, data, context) for value in template]
+        return template
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--template", help="Synthesized compute stack template; synthesized in-process when omitted")
+    parser.add_argument("--environment", default="dev", choices=["dev", "prod"])
+    parser.add_argument("--context", type=_json_argument, help="Overrides merged into the environment config, as JSON or @file")
+    parser.add_argument("--state-machine", help="StateMachineName to estimate; the orchestrator by default")
+    parser.add_argument("--profile", type=_json_argument, required=True, help="Runtime profile as JSON or @file")
+    parser.add_argument("--input", type=_json_argument, default={}, help="Execution input as JSON or @file")
+    parser.add_argument("--max-vcpus", type=float, help="Cap on each queue's vCPUs; the template's by default")
+    parser.add_argument("--deadline-minutes", type=float, help="Exit non-zero when the run would take longer")
+    args = parser.parse_args(argv)
+
+    if args.template:
+        with open(args.template) as template_file:
+            template = json.load(template_file)
+    else:
+        template = _synthesize(args.environment, args.context)
+
+    estimator = CapacityEstimator(template, state_machine=args.state_machine, max_vcpus=args.max_vcpus)
+    estimate = estimator.estimate(args.profile, args.input)
+    print(estimate.format_report())
+    if args.deadline_minutes is not None and not estimate.fits(args.deadline_minutes * 60):
+        print(f"\nDoes not fit the {args.deadline_minutes:g} minute deadline")
+        return 1
+    return 0 if estimate.status == "SUCCEEDED" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,760 @@
+"""
+Local workflow simulator for the Sanders Customer Platform state machines
+Interprets the synthesized Amazon States Language definition and stands in
+for AWS Batch with local processes: each job runs its ContainerOverrides
+command once enough of a shared vCPU pool is free, weighted by the vCPU of
+its job definition, so Parallel branches and Map iterations contend for
+capacity the way they do on the compute environment
+Reports per-state timings, queue wait and the critical path, e.g.
+
+    python -m tools.workflow_simulator --environment dev --max-vcpus 4 \\
+        --input '{"command": ["python", "-c", "import time; time.sleep(1)"]}'
+
+Tasks other than Batch need a handler (see DEFAULT_TASK_HANDLERS); retries
+are immediate and Wait states do not sleep
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+BATCH_SUBMIT_JOB = "batch:submitJob.sync"
+
+# Values substituted for pseudo parameters when the definition is rendered
+PSEUDO_PARAMETERS = {
+    "AWS::Partition": "aws",
+    "AWS::Region": "local",
+    "AWS::AccountId": "000000000000",
+    "AWS::URLSuffix": "amazonaws.com"
+}
+
+TaskHandler = Callable[[str, Any], Any]
+
+
+def _missing_table(state: str, parameters: dict) -> Any:
+    raise StatesError("DynamoDb.ResourceNotFoundException", f"Table {parameters['TableName']} not found")
+
+
+def _import_description(table_name: str) -> dict:
+    table_arn = f"arn:aws:dynamodb:local:000000000000:table/{table_name}"
+    return {"ImportTableDescription": {
+        "ImportArn": f"{table_arn}/import/local",
+        "ImportStatus": "COMPLETED",
+        "TableArn": table_arn
+    }}
+
+
+# Ledger and memo lookups miss and their writes are dropped, so every stage runs
+# Bulk imports always start from a missing table, complete at once and find an empty
+# table pointer, so the pointer is swapped and no previous table is retired
+DEFAULT_TASK_HANDLERS: Dict[str, TaskHandler] = {
+    "dynamodb:getItem": lambda state, parameters: {},
+    "dynamodb:putItem": lambda state, parameters: {},
+    "aws-sdk:dynamodb:describeTable": _missing_table,
+    "aws-sdk:dynamodb:importTable": lambda state, parameters: _import_description(
+        parameters["TableCreationParameters"]["TableName"]
+    ),
+    "aws-sdk:dynamodb:describeImport": lambda state, parameters: _import_description(
+        parameters["ImportArn"].split("/")[1]
+    ),
+    "aws-sdk:dynamodb:deleteTable": lambda state, parameters: {},
+    "aws-sdk:ssm:getParameter": lambda state, parameters: {
+        "Parameter": {"Name": parameters["Name"], "Value": ""}
+    },
+    "aws-sdk:ssm:putParameter": lambda state, parameters: {}
+}
+
+
+class SimulationError(Exception):
+    """The definition uses something the simulator cannot run locally"""
+
+
+class StatesError(Exception):
+    """A States Language runtime error, matched against Retry and Catch"""
+
+    def __init__(self, error: str, cause: str = "") -> None:
+        super().__init__(f"{error}: {cause}")
+        self.error = error
+        self.cause = cause
+
+
+@dataclass
+class StepTiming:
+    """One state entered during the simulation; Parallel and Map states hold their branches"""
+    path: str
+    state: str
+    type: str
+    start: float
+    end: float = 0.0
+    queue_wait: float = 0.0
+    vcpus: Optional[float] = None
+    status: str = "SUCCEEDED"
+    branches: List[List["StepTiming"]] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def critical_path(trace: List[StepTiming]) -> List[StepTiming]:
+    """The chain of states that determined the wall clock: through each Parallel or Map, the branch that ended last"""
+    path = []
+    for step in trace:
+        path.append(step)
+        finished = [branch for branch in step.branches if branch]
+        if finished:
+            path.extend(critical_path(max(finished, key=lambda branch: branch[-1].end)))
+    return path
+
+
+@dataclass
+class SimulationResult:
+    status: str
+    output: Any
+    error: Optional[str]
+    cause: Optional[str]
+    wall_clock: float
+    trace: List[StepTiming]
+
+    @property
+    def steps(self) -> List[StepTiming]:
+        """Every state entered, depth first"""
+        def walk(trace):
+            for step in trace:
+                yield step
+                for branch in step.branches:
+                    yield from walk(branch)
+        return list(walk(self.trace))
+
+    @property
+    def critical_path(self) -> List[StepTiming]:
+        return critical_path(self.trace)
+
+    def format_report(self) -> str:
+        lines = [f"Execution {self.status} in {self.wall_clock:.2f}s"]
+        if self.error:
+            lines.append(f"  {self.error}: {self.cause}")
+        lines.append("")
+        steps = self.steps
+        width = max([len("state")] + [len(step.path) for step in steps])
+        lines.append(f"{'state':<{width}} {'type':<9} {'start':>8} {'duration':>9} {'queued':>8} {'vcpus':>6}")
+        for step in steps:
+            vcpus = "" if step.vcpus is None else f"{step.vcpus:g}"
+            lines.append(
+                f"{step.path:<{width}} {step.type:<9} {step.start:>8.2f} {step.duration:>9.2f} "
+                f"{step.queue_wait:>8.2f} {vcpus:>6}"
+            )
+        critical = [step for step in self.critical_path if step.type in ("Task", "Parallel", "Map")]
+        busy = sum(step.duration for step in critical if step.type == "Task")
+        lines.append("")
+        lines.append(f"Critical path ({busy:.2f}s in tasks of {self.wall_clock:.2f}s):")
+        lines.append("  " + " -> ".join(step.state for step in critical))
+        return "\n".join(lines)
+
+
+class VcpuPool:
+    """Local stand-in for compute environment capacity; jobs wait until their vCPUs are free"""
+
+    def __init__(self, max_vcpus: float) -> None:
+        if max_vcpus <= 0:
+            raise ValueError("The local vCPU pool needs at least some capacity")
+        self.max_vcpus = max_vcpus
+        self._free = max_vcpus
+        self._condition = threading.Condition()
+
+    def acquire(self, vcpus: float) -> float:
+        # A job larger than the pool runs alone on all of it
+        vcpus = min(vcpus, self.max_vcpus)
+        with self._condition:
+            self._condition.wait_for(lambda: self._free >= vcpus)
+            self._free -= vcpus
+        return vcpus
+
+    def release(self, vcpus: float) -> None:
+        with self._condition:
+            self._free += vcpus
+            self._condition.notify_all()
+
+
+# ===== Rendering =====
+
+def render_definition(definition: Any) -> dict:
+    """Turn a DefinitionString (plain or Fn::Join) into ASL; Ref and GetAtt become logical ids, imports their export"""
+    def render(part):
+        if isinstance(part, str):
+            return part
+        if "Ref" in part:
+            return PSEUDO_PARAMETERS.get(part["Ref"], part["Ref"])
+        if "Fn::GetAtt" in part:
+            return part["Fn::GetAtt"][0]
+        if "Fn::ImportValue" in part and isinstance(part["Fn::ImportValue"], str):
+            return part["Fn::ImportValue"]
+        raise SimulationError(f"Cannot render {part} in the state machine definition")
+
+    if isinstance(definition, dict) and "Fn::Join" in definition:
+        separator, parts = definition["Fn::Join"]
+        definition = separator.join(render(part) for part in parts)
+    return json.loads(definition)
+
+
+def state_machines(template: dict) -> Dict[str, dict]:
+    """State machine resources of a template, keyed by StateMachineName (or logical id)"""
+    return {
+        resource["Properties"].get("StateMachineName", logical_id): resource
+        for logical_id, resource in template.get("Resources", {}).items()
+        if resource["Type"] == "AWS::StepFunctions::StateMachine"
+    }
+
+
+# ===== Paths and payload templates =====
+
+_PATH_TOKEN = re.compile(r"\.([A-Za-z0-9_\-]+)|\[(\d+|\*)\]|\['([^']*)'\]")
+_WILDCARD = "*"
+
+
+def _path_steps(path: str) -> Tuple[bool, List[Any]]:
+    context = path.startswith("$$")
+    rest = path[2:] if context else path[1:]
+    steps = []
+    position = 0
+    while position < len(rest):
+        match = _PATH_TOKEN.match(rest, position)
+        if not match:
+            raise SimulationError(f"Unsupported path '{path}'")
+        name, index, quoted = match.groups()
+        if index is not None:
+            steps.append(_WILDCARD if index == _WILDCARD else int(index))
+        else:
+            steps.append(name if name is not None else quoted)
+        position = match.end()
+    return context, steps
+
+
+def read_path(path: str, data: Any, context: dict) -> Any:
+    is_context, steps = _path_steps(path)
+
+    def select(value, steps):
+        for position, step in enumerate(steps):
+            if step == _WILDCARD:
+                if not isinstance(value, list):
+                    break
+                return [select(item, steps[position + 1:]) for item in value]
+            try:
+                value = value[step]
+            except (KeyError, IndexError, TypeError):
+                break
+        else:
+            return value
+        raise StatesError("States.Runtime", f"Path '{path}' not found in the state input")
+
+    return select(context if is_context else data, steps)
+
+
+def _is_present(path: str, data: Any, context: dict) -> bool:
+    try:
+        read_path(path, data, context)
+        return True
+    except StatesError:
+        return False
+
+
+def write_path(path: Optional[str], data: Any, result: Any) -> Any:
+    if path is None:
+        return data
+    _, steps = _path_steps(path)
+    if not steps:
+        return result
+    data = json.loads(json.dumps(data)) if isinstance(data, dict) else {}
+    target = data
+    for step in steps[:-1]:
+        if not isinstance(target.get(step), dict):
+            target[step] = {}
+        target = target[step]
+    target[steps[-1]] = result
+    return data
+
+
+_INTRINSIC_TOKEN = re.compile(r"\s*(?:(States\.[A-Za-z]+)\(|('(?:\\.|[^'\\])*')|(\$\$?[^,)\s]*)|(-?\d+(?:\.\d+)?)|(\))|(,))")
+
+
+def evaluate_intrinsic(expression: str, data: Any, context: dict) -> Any:
+    tokens = []
+    position = 0
+    while position < len(expression):
+        match = _INTRINSIC_TOKEN.match(expression, position)
+        if not match:
+            if expression[position:].strip():
+                raise SimulationError(f"Cannot parse intrinsic '{expression}'")
+            break
+        tokens.append(match.groups())
+        position = match.end()
+
+    def parse(index):
+        function, string, path, number, _, _ = tokens[index]
+        if string is not None:
+            return re.sub(r"\\(.)", r"\1", string[1:-1]), index + 1
+        if path is not None:
+            return read_path(path, data, context), index + 1
+        if number is not None:
+            return json.loads(number), index + 1
+        if function is None:
+            raise SimulationError(f"Cannot parse intrinsic '{expression}'")
+        arguments = []
+        index += 1
+        while tokens[index][4] is None:
+            if tokens[index][5] is not None:
+                index += 1
+                continue
+            argument, index = parse(index)
+            arguments.append(argument)
+        return _call_intrinsic(function, arguments), index + 1
+
+    value, _ = parse(0)
+    return value
+
+
+def _call_intrinsic(function: str, arguments: List[Any]) -> Any:
+    if function == "States.Format":
+        template, values = arguments[0], arguments[1:]
+        pieces = template.split("{}")
+        if len(pieces) != len(values) + 1:
+            raise StatesError("States.Runtime", f"States.Format expects {len(pieces) - 1} arguments")
+        return "".join(
+            piece + ("" if i == len(values) else (values[i] if isinstance(values[i], str) else json.dumps(values[i])))
+            for i, piece in enumerate(pieces)
+        )
+    if function == "States.JsonToString":
+        return json.dumps(arguments[0], separators=(",", ":"))
+    if function == "States.StringToJson":
+        return json.loads(arguments[0])
+    if function == "States.ArrayLength":
+        return len(arguments[0])
+    if function == "States.Array":
+        return list(arguments)
+    raise SimulationError(f"Intrinsic {function} is not supported locally")
+
+
+def resolve_payload(template: Any, data: Any, context: dict) -> Any:
+    """Evaluate a Parameters/ResultSelector/ItemSelector template against the input"""
+    if isinstance(template, dict):
+        resolved = {}
+        for key, value in template.items():
+            if key.endswith(".$"):
+                resolved[key[:-2]] = (
+                    evaluate_intrinsic(value, data, context) if value.startswith("States.")
+                    else read_path(value, data, context)
+                )
+            else:
+                resolved[key] = resolve_payload(value, data, context)
+        return resolved
+    if isinstance(template, list):
+        return [resolve_payload(value, data, context) for value in template]
+    return template
+
+
+# ===== Choice rules =====
+
+_COMPARISONS = {
+    "Equals": lambda a, b: a == b,
+    "LessThan": lambda a, b: a < b,
+    "GreaterThan": lambda a, b: a > b,
+    "LessThanEquals": lambda a, b: a <= b,
+    "GreaterThanEquals": lambda a, b: a >= b
+}
+
+_TYPE_TESTS = {
+    "String": lambda value: isinstance(value, str),
+    "Numeric": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "Boolean": lambda value: isinstance(value, bool),
+    "Timestamp": lambda value: isinstance(value, str)
+}
+
+
+def evaluate_rule(rule: dict, data: Any, context: dict) -> bool:
+    if "And" in rule:
+        return all(evaluate_rule(inner, data, context) for inner in rule["And"])
+    if "Or" in rule:
+        return any(evaluate_rule(inner, data, context) for inner in rule["Or"])
+    if "Not" in rule:
+        return not evaluate_rule(rule["Not"], data, context)
+
+    variable = rule["Variable"]
+    if "IsPresent" in rule:
+        return _is_present(variable, data, context) == rule["IsPresent"]
+    # Like Step Functions, any other rule on a missing variable fails the state with States.Runtime
+    value = read_path(variable, data, context)
+    for operator, expected in rule.items():
+        if operator in ("Variable", "Next"):
+            continue
+        if operator == "IsNull":
+            return (value is None) == expected
+        if operator.startswith("Is") and operator[2:] in _TYPE_TESTS:
+            return _TYPE_TESTS[operator[2:]](value) == expected
+        if operator == "StringMatches":
+            pattern = re.escape(expected).replace(r"\*", ".*")
+            return isinstance(value, str) and re.fullmatch(pattern, value) is not None
+        if operator == "BooleanEquals" or operator == "BooleanEqualsPath":
+            other = read_path(expected, data, context) if operator.endswith("Path") else expected
+            return value is other
+        for kind in ("String", "Numeric", "Timestamp"):
+            if operator.startswith(kind):
+                comparison = operator[len(kind):]
+                if comparison.endswith("Path"):
+                    comparison = comparison[:-4]
+                    expected = read_path(expected, data, context)
+                if not _TYPE_TESTS[kind](value) or not _TYPE_TESTS[kind](expected):
+                    return False
+                return _COMPARISONS[comparison](value, expected)
+        raise SimulationError(f"Choice operator {operator} is not supported locally")
+    raise SimulationError(f"Choice rule {rule} has no comparison")
+
+
+# ===== Interpreter =====
+
+class WorkflowSimulator:
+    """
+    Run a state machine from a synthesized template with a local Batch stand-in
+    Job definitions are looked up in the same template for their vCPU and
+    attempt timeout; every job runs its command as a local process
+    """
+
+    def __init__(
+        self,
+        template: dict,
+        state_machine: Optional[str] = None,
+        max_vcpus: Optional[float] = None,
+        task_handlers: Optional[Dict[str, TaskHandler]] = None,
+        job_environment: Optional[Dict[str, str]] = None
+    ) -> None:
+        machines = state_machines(template)
+        if not machines:
+            raise SimulationError("The template has no state machine")
+        if state_machine is None:
+            state_machine = next(
+                (name for name in machines if "orchestrator" in name), next(iter(machines))
+            )
+        if state_machine not in machines:
+            raise SimulationError(f"Unknown state machine '{state_machine}', expected one of {sorted(machines)}")
+
+        self.state_machine = state_machine
+        self.definition = render_definition(machines[state_machine]["Properties"]["DefinitionString"])
+        self.job_definitions = {
+            logical_id: resource["Properties"]
+            for logical_id, resource in template.get("Resources", {}).items()
+            if resource["Type"] == "AWS::Batch::JobDefinition"
+        }
+        self.pool = VcpuPool(max_vcpus or os.cpu_count() or 1)
+        self.task_handlers = {**DEFAULT_TASK_HANDLERS, **(task_handlers or {})}
+        self.job_environment = job_environment or {}
+
+    def run(self, execution_input: Optional[dict] = None, execution_name: Optional[str] = None) -> SimulationResult:
+        execution_input = execution_input or {}
+        self._started = time.perf_counter()
+        context = {
+            "Execution": {
+                "Id": f"local:{self.state_machine}:{execution_name or uuid.uuid4()}",
+                "Name": execution_name or f"local-{uuid.uuid4().hex[:12]}",
+                "Input": execution_input,
+                "StartTime": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            },
+            "StateMachine": {"Name": self.state_machine}
+        }
+        trace: List[StepTiming] = []
+        try:
+            output = self._run_states(self.definition, execution_input, context, trace, "")
+            status, error, cause = "SUCCEEDED", None, None
+        except StatesError as failure:
+            output, status, error, cause = None, "FAILED", failure.error, failure.cause
+        return SimulationResult(
+            status=status,
+            output=output,
+            error=error,
+            cause=cause,
+            wall_clock=self._now(),
+            trace=trace
+        )
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._started
+
+    def _run_states(self, machine: dict, data: Any, context: dict, trace: List[StepTiming], prefix: str) -> Any:
+        name = machine["StartAt"]
+        while True:
+            state = machine["States"][name]
+            step = StepTiming(path=f"{prefix}{name}", state=name, type=state["Type"], start=self._now())
+            trace.append(step)
+            context = {**context, "State": {"Name": name, "EnteredTime": step.start, "RetryCount": 0}}
+            try:
+                data, next_name = self._run_state(name, state, data, context, step)
+            except StatesError:
+                step.status = "FAILED"
+                step.end = self._now()
+                raise
+            step.end = self._now()
+            if next_name is None:
+                return data
+            name = next_name
+
+    def _run_state(self, name: str, state: dict, data: Any, context: dict, step: StepTiming) -> Tuple[Any, Optional[str]]:
+        kind = state["Type"]
+        if kind == "Succeed":
+            return self._output(state, self._input(state, data, context), context), None
+        if kind == "Fail":
+            raise StatesError(state.get("Error", "States.Fail"), state.get("Cause", ""))
+        if kind == "Choice":
+            effective = self._input(state, data, context)
+            for rule in state["Choices"]:
+                if evaluate_rule(rule, effective, context):
+                    return self._output(state, effective, context), rule["Next"]
+            if "Default" not in state:
+                raise StatesError("States.NoChoiceMatched", f"No choice in {name} matched")
+            return self._output(state, effective, context), state["Default"]
+        if kind == "Wait":
+            return self._output(state, self._input(state, data, context), context), self._next(state)
+
+        effective = self._input(state, data, context)
+        if "Parameters" in state and kind != "Map":
+            effective = resolve_payload(state["Parameters"], effective, context)
+        if kind == "Pass":
+            result = state.get("Result", effective)
+        elif kind in ("Task", "Parallel", "Map"):
+            try:
+                result = self._with_retries(state, lambda: self._execute(name, state, effective, data, context, step))
+            except StatesError as failure:
+                for catcher in state.get("Catch", []):
+                    if self._matches(catcher["ErrorEquals"], failure.error):
+                        error_output = {"Error": failure.error, "Cause": failure.cause}
+                        step.status = "CAUGHT"
+                        return write_path(catcher.get("ResultPath", "$"), data, error_output), catcher["Next"]
+                raise
+            if "ResultSelector" in state:
+                result = resolve_payload(state["ResultSelector"], result, context)
+        else:
+            raise SimulationError(f"State type {kind} is not supported locally")
+
+        combined = write_path(state.get("ResultPath", "$"), data, result)
+        return self._output(state, combined, context), self._next(state)
+
+    @staticmethod
+    def _input(state: dict, data: Any, context: dict) -> Any:
+        if "InputPath" not in state:
+            return data
+        return {} if state["InputPath"] is None else read_path(state["InputPath"], data, context)
+
+    @staticmethod
+    def _output(state: dict, data: Any, context: dict) -> Any:
+        if "OutputPath" not in state:
+            return data
+        return {} if state["OutputPath"] is None else read_path(state["OutputPath"], data, context)
+
+    @staticmethod
+    def _next(state: dict) -> Optional[str]:
+        return None if state.get("End") else state["Next"]
+
+    @staticmethod
+    def _matches(error_equals: List[str], error: str) -> bool:
+        return "States.ALL" in error_equals or error in error_equals
+
+    def _with_retries(self, state: dict, attempt: Callable[[], Any]) -> Any:
+        attempts = {}
+        while True:
+            try:
+                return attempt()
+            except StatesError as failure:
+                retrier = next(
+                    (i for i, retry in enumerate(state.get("Retry", [])) if self._matches(retry["ErrorEquals"], failure.error)),
+                    None
+                )
+                if retrier is None:
+                    raise
+                attempts[retrier] = attempts.get(retrier, 0) + 1
+                if attempts[retrier] > state["Retry"][retrier].get("MaxAttempts", 3):
+                    raise
+
+    def _execute(self, name: str, state: dict, effective: Any, data: Any, context: dict, step: StepTiming) -> Any:
+        kind = state["Type"]
+        if kind == "Parallel":
+            return self._parallel(state, effective, context, step)
+        if kind == "Map":
+            return self._map(name, state, effective, context, step)
+
+        resource = state["Resource"].split(":states:::", 1)[-1]
+        if resource == BATCH_SUBMIT_JOB:
+            return self._submit_job(name, effective, step)
+        handler = self.task_handlers.get(resource)
+        if handler is None:
+            raise SimulationError(
+                f"State {name} calls {resource}, which has no local handler; pass one in task_handlers"
+            )
+        return handler(name, effective)
+
+    def _parallel(self, state: dict, effective: Any, context: dict, step: StepTiming) -> List[Any]:
+        step.branches = [[] for _ in state["Branches"]]
+        with ThreadPoolExecutor(max_workers=len(state["Branches"])) as executor:
+            futures = [
+                executor.submit(self._run_states, branch, effective, context, step.branches[i], f"{step.path}/")
+                for i, branch in enumerate(state["Branches"])
+            ]
+            failures = [future.exception() for future in futures if future.exception() is not None]
+        if failures:
+            raise failures[0]
+        return [future.result() for future in futures]
+
+    def _map(self, name: str, state: dict, effective: Any, context: dict, step: StepTiming) -> List[Any]:
+        if "ItemReader" in state:
+            raise SimulationError(
+                f"Map {name} reads its items from S3, which the simulator cannot list; "
+                f"pass the items in the execution input instead"
+            )
+        items = read_path(state.get("ItemsPath", "$"), effective, context)
+        processor = state.get("ItemProcessor") or state["Iterator"]
+        selector = state.get("ItemSelector") or state.get("Parameters")
+        tolerated = state.get("ToleratedFailurePercentage", 0)
+        step.branches = [[] for _ in items]
+
+        def iterate(index):
+            item_context = {**context, "Map": {"Item": {"Index": index, "Value": items[index]}}}
+            item = resolve_payload(selector, effective, item_context) if selector else items[index]
+            return self._run_states(processor, item, item_context, step.branches[index], f"{step.path}[{index}]/")
+
+        max_concurrency = state.get("MaxConcurrency") or len(items) or 1
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = [executor.submit(iterate, index) for index in range(len(items))]
+            failures = [future.exception() for future in futures if future.exception() is not None]
+        for failure in failures:
+            if not isinstance(failure, StatesError):
+                raise failure
+        if failures and len(failures) * 100 > tolerated * len(items):
+            if tolerated:
+                raise StatesError(
+                    "States.ExceedToleratedFailureThreshold",
+                    f"{len(failures)} of {len(items)} items failed"
+                )
+            raise failures[0]
+        return [None if future.exception() else future.result() for future in futures]
+
+    def _submit_job(self, name: str, parameters: dict, step: StepTiming) -> dict:
+        job_definition = self.job_definitions.get(parameters["JobDefinition"], {})
+        container = job_definition.get("ContainerProperties", {})
+        requirements = {
+            requirement["Type"]: requirement["Value"] for requirement in container.get("ResourceRequirements", [])
+        }
+        vcpus = float(requirements.get("VCPU", 1))
+        timeout = (job_definition.get("Timeout") or {}).get("AttemptDurationSeconds")
+        overrides = parameters.get("ContainerOverrides", {})
+        command = overrides.get("Command") or container.get("Command")
+        if not command:
+            raise SimulationError(f"State {name} submits a job without a command; set $.command in the input")
+
+        environment = dict(os.environ)
+        environment.update(self.job_environment)
+        for variable in container.get("Environment", []) + overrides.get("Environment", []):
+            if isinstance(variable.get("Value"), str):
+                environment[variable["Name"]] = variable["Value"]
+        job_id = str(uuid.uuid4())
+        environment["AWS_BATCH_JOB_ID"] = job_id
+        environment["AWS_BATCH_JOB_ATTEMPT"] = "1"
+
+        array_size = int((parameters.get("ArrayProperties") or {}).get("Size") or 0)
+        step.vcpus = vcpus
+        submitted = self._now()
+        first_started = []
+
+        def run(index):
+            granted = self.pool.acquire(vcpus)
+            try:
+                first_started.append(self._now())
+                child_environment = environment
+                if array_size:
+                    child_environment = {**environment, "AWS_BATCH_JOB_ARRAY_INDEX": str(index)}
+                try:
+                    completed = subprocess.run(
+                        [str(argument) for argument in command],
+                        env=child_environment,
+                        capture_output=True,
+                        text=True,
+                        timeout=timeout
+                    )
+                    return completed.returncode, completed.stderr
+                except subprocess.TimeoutExpired:
+                    return None, f"Job attempt duration exceeded timeout of {timeout} seconds"
+            finally:
+                self.pool.release(granted)
+
+        if array_size:
+            with ThreadPoolExecutor(max_workers=array_size) as executor:
+                outcomes = list(executor.map(run, range(array_size)))
+        else:
+            outcomes = [run(0)]
+        step.queue_wait = min(first_started) - submitted
+
+        failed = [(code, stderr) for code, stderr in outcomes if code != 0]
+        result = {
+            "JobId": job_id,
+            "JobName": parameters.get("JobName"),
+            "JobQueue": parameters.get("JobQueue"),
+            "JobDefinition": job_definition.get("JobDefinitionName", parameters["JobDefinition"]),
+            "Status": "FAILED" if failed else "SUCCEEDED",
+            "Container": {"ExitCode": failed[0][0] if failed else 0}
+        }
+        if array_size:
+            result["ArrayProperties"] = {"Size": array_size}
+        if failed:
+            code, stderr = failed[0]
+            result["StatusReason"] = stderr[-2000:] if code is not None else stderr
+            raise StatesError("States.TaskFailed", json.dumps(result))
+        return result
+
+
+def _synthesize(environment: str, context: Optional[dict]) -> dict:
+    import aws_cdk as cdk
+    from aws_cdk.assertions import Template
+    from cdk.sanders_customer_platform import SandersCustomerPlatform
+
+    # Jobs run as local commands, so the image the job definitions pin is never pulled
+    app = cdk.App(context={"image_tag": "local", **({"sanders": {environment: context}} if context else {})})
+    platform = SandersCustomerPlatform(app, environment=environment)
+    return Template.from_stack(platform.compute).to_json()
+
+
+def _json_argument(value: str) -> Any:
+    # "@path" reads the JSON from a file
+    if value.startswith("@"):
+        with open(value[1:]) as json_file:
+            return json.load(json_file)
+    return json.loads(value)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--template", help="Synthesized compute stack template; synthesized in-process when omitted")
+    parser.add_argument("--environment", default="dev", choices=["dev", "prod"])
+    parser.add_argument("--context", type=_json_argument, help="Overrides merged into the environment config, as JSON or @file")
+    parser.add_argument("--state-machine", help="StateMachineName to run; the orchestrator by default")
+    parser.add_argument("--input", type=_json_argument, default={}, help="Execution input as JSON or @file")
+    parser.add_argument("--max-vcpus", type=float, help="Local vCPU capacity shared by jobs; all cores by default")
+    args = parser.parse_args(argv)
+
+    if args.template:
+        with open(args.template) as template_file:
+            template = json.load(template_file)
+    else:
+        template = _synthesize(args.environment, args.context)
+
+    simulator = WorkflowSimulator(template, state_machine=args.state_machine, max_vcpus=args.max_vcpus)
+    result = simulator.run(args.input)
+    print(result.format_report())
+    return 0 if result.status == "SUCCEEDED" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())